@@ -0,0 +1,14 @@
+"""
+Gunicorn settings.
+
+    gunicorn -c config/gunicorn.conf.py config.wsgi
+    gunicorn -c config/gunicorn.conf.py -k uvicorn.workers.UvicornWorker config.asgi
+"""
+
+
+def post_worker_init(worker):
+    # Runs in every worker once the application is loaded, after the fork: the warmed caches are per process
+    # and no database connection is shared between workers, with or without --preload
+    from finances.services.warmup import Warmup
+
+    Warmup.run_in_worker()
@@ -1,3 +1,4 @@
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -34,12 +35,26 @@ INSTALLED_APPS = [
 
 AUTH_USER_MODEL = "users.User"
 
+# Caches the logged-in user row between requests (users.backends.CachedModelBackend)
+AUTHENTICATION_BACKENDS = ["users.backends.CachedModelBackend"]
+
+# Sessions are read from the cache and written through to the database, so a request costs no session query.
+# They use the shared cache directly: a session write through the two-tier cache would flush every worker's L1.
+# "django.contrib.sessions.backends.signed_cookies" needs no storage at all, at the price of larger cookies
+# and no server-side logout of other devices
+SESSION_ENGINE = os.environ.get("SESSION_ENGINE", "django.contrib.sessions.backends.cached_db")
+SESSION_CACHE_ALIAS = "shared"
+
 MIDDLEWARE = [
+    "finances.middleware.RequestMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
+    "finances.middleware.StaticFilesMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
+    "finances.routers.ReplicaRoutingMiddleware",
     "django.middleware.common.CommonMiddleware",
     "django.middleware.csrf.CsrfViewMiddleware",
     "django.contrib.auth.middleware.AuthenticationMiddleware",
+    "finances.middleware.ProfilingMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
 ]
@@ -73,9 +88,108 @@ DATABASES = {
     "default": {
         "ENGINE": "django.db.backends.sqlite3",
         "NAME": BASE_DIR / "db.sqlite3",
+        "OPTIONS": {
+            # Seconds to wait for a lock instead of failing with "database is locked"
+            "timeout": 20,
+            # Take the write lock at BEGIN, so a read transaction never has to be upgraded mid-way
+            "transaction_mode": "IMMEDIATE",
+        },
     }
 }
 
+# Read replica for reporting views (finances.routers.ReplicaRouter). Without it everything uses "default".
+# Locally a copy of the database can stand in for it:
+#   cp db.sqlite3 db-replica.sqlite3 && DATABASE_REPLICA=db-replica.sqlite3 python manage.py runserver
+if os.environ.get("DATABASE_REPLICA"):
+    DATABASES["replica"] = {
+        **DATABASES["default"],
+        "NAME": BASE_DIR / os.environ["DATABASE_REPLICA"],
+        "TEST": {"MIRROR": "default"},
+    }
+
+DATABASE_ROUTERS = ["finances.routers.ReplicaRouter"]
+
+# After a write the session reads from the primary for this long, to cover replication lag
+REPLICA_STICKY_SECONDS = 15
+
+# Cache: per-process L1 in front of a cache shared by all workers (finances.cache.TwoTierCache).
+# The shared tier is Redis when REDIS_URL is set, otherwise files under .cache/
+
+CACHES = {
+    "default": {
+        "BACKEND": "finances.cache.TwoTierCache",
+        "LOCATION": "shared",
+        # Each alias over the shared cache needs its own prefix, its keys and invalidations stay apart
+        "KEY_PREFIX": "default",
+        "TIMEOUT": 3600,
+        # Bump to drop every cached value at once, e.g. after changing what is stored under a key
+        "VERSION": 1,
+        "OPTIONS": {"L1_MAX_ENTRIES": 1000, "L1_TIMEOUT": 30, "SYNC_INTERVAL": 1},
+    },
+    # Used by {% cache %}. Fragment keys include what the markup depends on (id, updated_at, tree version),
+    # so entries are never invalidated, only replaced by new keys and left to expire
+    "template_fragments": {
+        "BACKEND": "finances.cache.TwoTierCache",
+        "LOCATION": "shared",
+        "KEY_PREFIX": "fragments",
+        "TIMEOUT": 24 * 3600,
+        "OPTIONS": {"L1_MAX_ENTRIES": 5000, "L1_TIMEOUT": 300, "BROADCAST": False},
+    },
+    "shared": (
+        {"BACKEND": "django.core.cache.backends.redis.RedisCache", "LOCATION": os.environ["REDIS_URL"]}
+        if os.environ.get("REDIS_URL")
+        else {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": BASE_DIR / ".cache",
+            "OPTIONS": {"MAX_ENTRIES": 10000},
+        }
+    ),
+}
+
+# Applied to every new SQLite connection (finances.services.sqlite_tuning)
+SQLITE_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "mmap_size": 256 * 1024 * 1024,
+    "cache_size": -64000,  # Negative means KiB: 64 MB of page cache
+    "temp_store": "MEMORY",
+    "busy_timeout": 20000,
+}
+
+# Seconds between PRAGMA optimize runs; full ANALYZE is done by manage.py sqlite_maintenance
+SQLITE_OPTIMIZE_INTERVAL = 3600
+
+# manage.py archive_transactions moves whole months older than this into the archive table
+# (finances.services.transaction_archive); lists and analytics read it only for date ranges that reach it
+ARCHIVE_AFTER_DAYS = 2 * 365
+
+# Deletions are kept this long for /api/v1/sync/; clients that haven't synced since then start over
+# (manage.py prune_tombstones removes older ones)
+SYNC_TOMBSTONE_DAYS = 90
+# A sync snapshot ends this long before the request, so it can't skip rows of transactions still being committed.
+# Must exceed the longest write transaction: statement imports and archiving commit per batch (500 and 2000 rows),
+# API writes take at most 1000 objects
+SYNC_LAG_SECONDS = 30
+
+# Background jobs (finances.services.jobs): statement imports and archiving, run by manage.py run_workers.
+# Files handed to jobs are kept in JOB_FILES_DIR, which workers on other hosts must share
+JOB_WORKERS = 2
+JOB_FILES_DIR = BASE_DIR / "job_files"
+# A running job that sent no heartbeat for this long lost its worker and is retried
+JOB_LEASE_SECONDS = 300
+# Finished jobs and their idempotency keys are kept this long (manage.py run_workers --prune)
+JOB_RETENTION_DAYS = 7
+
+# Live dashboard updates, streamed from /events/ (finances.services.live_updates). Only under ASGI (config.asgi);
+# under WSGI the pages render without them and /events/ answers 204.
+# InProcessBroker only reaches pages served by the same process (a single worker, tests);
+# CacheBroker goes through the shared cache, so events cross workers at the cost of polling it every second
+LIVE_UPDATES = (
+    {"BROKER": "finances.services.live_updates.CacheBroker", "OPTIONS": {"CACHE": "shared", "POLL_INTERVAL": 1}}
+    if os.environ.get("REDIS_URL")
+    else {"BROKER": "finances.services.live_updates.InProcessBroker"}
+)
+
 
 # Password validation
 # https://docs.djangoproject.com/en/6.0/ref/settings/#auth-password-validators
@@ -113,3 +227,39 @@ USE_TZ = True
 
 STATIC_URL = "static/"
 STATICFILES_DIRS = [BASE_DIR / "static"]
+STATIC_ROOT = BASE_DIR / "staticfiles"
+
+# collectstatic writes content-hashed copies plus .gz/.br variants (finances.storage)
+STORAGES = {
+    "default": {"BACKEND": "django.core.files.storage.FileSystemStorage"},
+    "staticfiles": {"BACKEND": "finances.storage.CompressedManifestStaticFilesStorage"},
+}
+
+# Serve STATIC_ROOT from the app (finances.middleware.StaticFilesMiddleware) with precompressed variants and
+# immutable caching; turn off when a web server serves /static/. In DEBUG runserver serves the sources itself
+SERVE_STATIC = not DEBUG
+
+
+# Warm caches (URLs, templates, category tree, exchange rates) in each server worker after it starts, through
+# the post_worker_init hook in config/gunicorn.conf.py; nothing runs at import, so --preload and management
+# commands don't pay for it. manage.py warmup --measure-startup reports the effect
+
+WARMUP_ON_STARTUP = True
+
+
+# Request profiling: staff send the X-Profile header or ?_profile, results are saved here
+
+PROFILING_DIR = BASE_DIR / "profiles"
+
+
+# Request metrics, scraped by Prometheus from /metrics
+
+METRICS_ALLOWED_IPS = ["127.0.0.1"]
+
+# Maximum SQL queries per view; going over logs a warning
+METRICS_QUERY_BUDGETS = {
+    "finances.views.TransactionListView": 10,
+    "finances.views.dashboard": 6,
+    "finances.views.AnalyticsView": 5,
+    "finances.api.views.TransactionApiView": 20,
+}
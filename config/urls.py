@@ -10,5 +10,6 @@ urlpatterns = [
     path("signup/", SignUpView.as_view(), name="signup"),
     path("signin/", SignInView.as_view(), name="signin"),
     path("logout/", CustomLogoutView.as_view(), name="logout"),
+    path("api/v1/", include("finances.api.urls")),
     path("", include("finances.urls")),
 ]
@@ -1,10 +1,139 @@
 from django import forms
 from django.contrib import admin
-from django.db.models import Q
+from django.contrib.admin.options import IncorrectLookupParameters
+from django.contrib.admin.utils import get_fields_from_path
+from django.contrib.admin.widgets import AutocompleteSelect
+from django.core.paginator import Paginator
+from django.db import connection
+from django.db.models import Count, IntegerField, OuterRef, Q, Subquery
+from django.db.models.functions import Coalesce
 from django.urls import reverse
+from django.utils import timezone
+from django.utils.functional import cached_property
 from django.utils.html import format_html
 
-from .models import Category, Table, Transaction
+from .models import Category, Job, Table, Transaction
+
+
+class AutocompleteFilter(admin.SimpleListFilter):
+    """
+    Sidebar filter by a related object, chosen with the admin's select2 autocomplete instead of a list of
+    every object. The related model's admin needs search_fields; the ModelAdmin needs AutocompleteFilterMixin.
+    """
+
+    template = "admin/finances/autocomplete_filter.html"
+    field_path = None
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Same parameter as the stock related-field filter, so existing changelist links keep working
+        cls.parameter_name = f"{cls.field_path}__id__exact"
+
+    def __init__(self, request, params, model, model_admin):
+        super().__init__(request, params, model, model_admin)
+
+        # The autocomplete view is addressed by the model and name of the last foreign key in the path
+        field = get_fields_from_path(model, self.field_path)[-1]
+        form_field = forms.ModelChoiceField(
+            queryset=field.remote_field.model._default_manager.all(),
+            required=False,
+            widget=AutocompleteSelect(field, model_admin.admin_site, attrs={"style": "width: 100%"}),
+        )
+        self.widget = form_field.widget
+        self.widget.attrs["data-filter-parameter"] = self.parameter_name
+
+    def lookups(self, request, model_admin):
+        # Choices come from the autocomplete view, never from here
+        return ()
+
+    def has_output(self):
+        return True
+
+    def queryset(self, request, queryset):
+        if not self.value():
+            return queryset
+        if not self.value().isdigit():
+            raise IncorrectLookupParameters(f"Некоректне значення фільтра: {self.value()}")
+        return queryset.filter(**{self.field_path: self.value()})
+
+    def choices(self, changelist):
+        yield {
+            "selected": self.value() is None,
+            "query_string": changelist.get_query_string(remove=[self.parameter_name]),
+            "display": "Усі",
+        }
+
+    def render_widget(self):
+        return self.widget.render(self.parameter_name, self.value())
+
+
+class AutocompleteFilterMixin:
+    """ModelAdmin mixin adding the scripts AutocompleteFilter needs on the changelist and allowing its lookups"""
+
+    def lookup_allowed(self, lookup, value, request=None):
+        list_filter = self.get_list_filter(request) if request is not None else self.list_filter
+        for filter_item in list_filter:
+            if isinstance(filter_item, type) and issubclass(filter_item, AutocompleteFilter):
+                if filter_item.parameter_name == lookup:
+                    return True
+        return super().lookup_allowed(lookup, value, request)
+
+    @property
+    def media(self):
+        return (
+            super().media
+            + AutocompleteSelect(None, self.admin_site).media
+            + forms.Media(js=["admin/js/jquery.init.js", "js/finances/admin_filters.js"])
+        )
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator that takes the row count of an unfiltered changelist from planner statistics instead of
+    COUNT(*), which reads the whole table. Filtered lists are counted exactly.
+
+    The estimate comes from ANALYZE (sqlite_stat1, pg_class.reltuples), so the last page number may be
+    slightly off between maintenance runs; without statistics it falls back to COUNT(*).
+    """
+
+    EXACT_BELOW = 10000
+
+    @cached_property
+    def count(self):
+        query = getattr(self.object_list, "query", None)
+        if query is not None and not query.where:
+            estimate = self.get_estimate(self.object_list.model._meta.db_table)
+            if estimate is not None and estimate >= self.EXACT_BELOW:
+                return estimate
+        return super().count
+
+    @staticmethod
+    def get_estimate(db_table):
+        with connection.cursor() as cursor:
+            if connection.vendor == "postgresql":
+                cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE relname = %s", [db_table])
+            elif connection.vendor == "sqlite":
+                cursor.execute("SELECT name FROM sqlite_master WHERE name = 'sqlite_stat1'")
+                if cursor.fetchone() is None:
+                    return None
+                # The first number of a stat row is the number of rows in the table
+                cursor.execute("SELECT CAST(stat AS INTEGER) FROM sqlite_stat1 WHERE tbl = %s LIMIT 1", [db_table])
+            else:
+                return None
+            row = cursor.fetchone()
+        return row[0] if row and row[0] and row[0] > 0 else None
+
+
+def transactions_count_subquery(category_ref="pk"):
+    """Per-category transaction count as a correlated subquery: one index lookup per row, no GROUP BY join"""
+    counts = (
+        Transaction.objects.filter(category=OuterRef(category_ref))
+        .order_by()
+        .values("category")
+        .annotate(count=Count("pk"))
+        .values("count")
+    )
+    return Coalesce(Subquery(counts, output_field=IntegerField()), 0)
 
 
 # Custom form for Category model with parent-child hierarchy support
@@ -88,23 +217,31 @@ class CategoryForm(forms.ModelForm):
             self.fields["name"].label = "Назва підкатегорії"
 
 
-# Inline for displaying transactions within Table admin
-class TransactionInline(admin.TabularInline):
-    model = Transaction
-    extra = 0
-    fields = ("amount", "currency", "date", "category", "description")
-    show_change_link = True
+class UserFilter(AutocompleteFilter):
+    title = "Користувач"
+    field_path = "user"
 
 
-# Admin configuration for Table model
+# Admin configuration for Table model.
+# Transactions are not inlined: a table may hold millions, so the change page links to the paginated list
 @admin.register(Table)
-class TableAdmin(admin.ModelAdmin):
+class TableAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("title", "user", "color", "created_at")
-    list_filter = ("user", "created_at")
+    list_filter = (UserFilter, "created_at")
     search_fields = ("title", "user__email")
     list_select_related = ("user",)
     date_hierarchy = "created_at"
-    inlines = [TransactionInline]
+    autocomplete_fields = ["user"]
+    readonly_fields = ("transactions_link",)
+    show_full_result_count = False
+
+    @admin.display(description="Транзакції")
+    def transactions_link(self, obj):
+        if not obj.pk:
+            return "—"
+        url = reverse("admin:finances_transaction_changelist")
+        count = obj.transactions.count()
+        return format_html('<a href="{}?table__id__exact={}">{} транзакцій →</a>', url, obj.pk, count)
 
 
 # Inline for displaying subcategories within parent category admin
@@ -116,30 +253,43 @@ class CategoryInline(admin.TabularInline):
     readonly_fields = ("transactions_count", "created_at")
     show_change_link = True
 
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(transactions_total=transactions_count_subquery())
+
     def transactions_count(self, obj):
-        # Count transactions for this category
-        return obj.transactions.count()
+        return obj.transactions_total
 
     transactions_count.short_description = "Транзакцій"
 
 
+class ParentCategoryFilter(AutocompleteFilter):
+    title = "Батьківська категорія"
+    field_path = "parent"
+
+
 # Admin configuration for Category model with hierarchical display
 @admin.register(Category)
-class CategoryAdmin(admin.ModelAdmin):
+class CategoryAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     form = CategoryForm
     list_display = ("parent_or_main_display", "name_display", "subcategories_count", "transactions_count", "created_at")
-    list_filter = ("parent", "created_at")
+    list_filter = (ParentCategoryFilter, "created_at")
     search_fields = ("name", "parent__name")
     list_select_related = ("parent",)
     inlines = [CategoryInline]
+    show_full_result_count = False
 
     # Custom admin actions
     actions = ["make_top_level_category"]
 
     @admin.action(description="Зробити основною категорією")
     def make_top_level_category(self, request, queryset):
-        # Action to convert selected categories to top-level
-        updated = queryset.update(parent=None)
+        # Action to convert selected categories to top-level.
+        # Deepest first, so every moved subtree still has an up-to-date path in memory
+        updated = 0
+        for category in queryset.filter(parent__isnull=False).order_by("-depth"):
+            category.parent = None
+            category.save()
+            updated += 1
         self.message_user(request, f"{updated} категорій стало основними")
 
     def parent_or_main_display(self, obj):
@@ -163,16 +313,16 @@ class CategoryAdmin(admin.ModelAdmin):
     name_display.admin_order_field = "name"
 
     def subcategories_count(self, obj):
-        # Count of child categories
-        return obj.children.count()
+        return obj.subcategories_total
 
     subcategories_count.short_description = "Кільк. підкатегорій"
+    subcategories_count.admin_order_field = "subcategories_total"
 
     def transactions_count(self, obj):
-        # Count of transactions in this category
-        return obj.transactions.count()
+        return obj.transactions_total
 
     transactions_count.short_description = "Кільк. транзакцій"
+    transactions_count.admin_order_field = "transactions_total"
 
     # Form layout with two sections
     fieldsets = (
@@ -209,20 +359,62 @@ class CategoryAdmin(admin.ModelAdmin):
         return form
 
     def get_queryset(self, request):
-        # Optimize queries with prefetch_related
-        qs = super().get_queryset(request)
-        return qs.prefetch_related("children")
+        # Counts come with the page query instead of two COUNT queries per row
+        children = (
+            Category.objects.filter(parent=OuterRef("pk"))
+            .order_by()
+            .values("parent")
+            .annotate(count=Count("pk"))
+            .values("count")
+        )
+        return (
+            super()
+            .get_queryset(request)
+            .annotate(
+                subcategories_total=Coalesce(Subquery(children, output_field=IntegerField()), 0),
+                transactions_total=transactions_count_subquery(),
+            )
+        )
+
 
+class TransactionUserFilter(AutocompleteFilter):
+    title = "Користувач"
+    field_path = "user"
 
-# Admin configuration for Transaction model
+
+class TransactionTableFilter(AutocompleteFilter):
+    title = "Таблиця"
+    field_path = "table"
+
+
+class TransactionParentCategoryFilter(AutocompleteFilter):
+    title = "Батьківська категорія"
+    field_path = "category__parent"
+
+
+class TransactionCategoryFilter(AutocompleteFilter):
+    title = "Категорія"
+    field_path = "category"
+
+
+# Admin configuration for Transaction model.
+# No date_hierarchy: its year/month links need a DISTINCT scan of the whole table on every page
 @admin.register(Transaction)
-class TransactionAdmin(admin.ModelAdmin):
+class TransactionAdmin(AutocompleteFilterMixin, admin.ModelAdmin):
     list_display = ("amount", "currency", "date", "table", "category_display", "description")
-    list_filter = ("currency", "date", "table__user", "category__parent", "category")
+    list_filter = (
+        "currency",
+        "date",
+        TransactionUserFilter,
+        TransactionTableFilter,
+        TransactionParentCategoryFilter,
+        TransactionCategoryFilter,
+    )
     search_fields = ("description", "table__title", "category__name", "category__parent__name")
-    date_hierarchy = "date"
-    list_select_related = ("table", "category", "category__parent")
-    autocomplete_fields = ["category"]
+    list_select_related = ("table", "table__user", "category", "category__parent")
+    autocomplete_fields = ["table", "category"]
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
 
     def category_display(self, obj):
         # Display category hierarchy with clickable links
@@ -235,3 +427,29 @@ class TransactionAdmin(admin.ModelAdmin):
 
     category_display.short_description = "Категорія"
     category_display.admin_order_field = "category__name"
+
+
+# Background jobs: read-only apart from retrying; progress of running ones is in the shared cache, not here
+@admin.register(Job)
+class JobAdmin(admin.ModelAdmin):
+    list_display = ("__str__", "status", "priority", "attempts", "user", "created_at", "finished_at")
+    list_filter = ("status", "kind", "created_at")
+    search_fields = ("idempotency_key",)
+    list_select_related = ("user",)
+    date_hierarchy = "created_at"
+    show_full_result_count = False
+    actions = ["retry_jobs"]
+
+    def has_add_permission(self, request):
+        return False
+
+    def has_change_permission(self, request, obj=None):
+        return False
+
+    @admin.action(description="Повторити вибрані завдання")
+    def retry_jobs(self, request, queryset):
+        # Failed jobs keep their files (uploaded statements) until pruned, so a retry has all the first run had
+        updated = queryset.filter(status=Job.FAILED).update(
+            status=Job.QUEUED, attempts=0, run_after=timezone.now(), finished_at=None
+        )
+        self.message_user(request, f"{updated} завдань повернуто до черги")
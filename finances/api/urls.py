@@ -0,0 +1,13 @@
+from django.urls import path
+
+from . import views
+
+app_name = "api_v1"
+
+urlpatterns = [
+    path("tables/", views.TableApiView.as_view(), name="tables"),
+    path("transactions/", views.TransactionApiView.as_view(), name="transactions"),
+    path("categories/", views.CategoryApiView.as_view(), name="categories"),
+    path("sync/", views.SyncApiView.as_view(), name="sync"),
+    path("tokens/", views.TokenApiView.as_view(), name="tokens"),
+]
@@ -0,0 +1,558 @@
+import base64
+import json
+from datetime import datetime, timedelta
+
+from django.conf import settings
+from django.contrib.auth import authenticate
+from django.core import signing
+from django.db import IntegrityError
+from django.db import transaction as db_transaction
+from django.db.models import Q
+from django.forms import modelform_factory
+from django.http import JsonResponse
+from django.middleware.csrf import CsrfViewMiddleware
+from django.utils import timezone
+from django.utils.decorators import method_decorator
+from django.views import View
+from django.views.decorators.csrf import csrf_exempt
+
+from users.models import ApiToken
+
+from ..forms import TableForm, TransactionRowForm
+from ..models import ArchivedTransaction, Category, Table, Tombstone, Transaction
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400, details=None):
+        super().__init__(message)
+        self.message = message
+        self.status = status
+        self.details = details
+
+
+def error_response(message, status=400, details=None):
+    payload = {"error": message}
+    if details is not None:
+        payload["details"] = details
+    return JsonResponse(payload, status=status)
+
+
+class CsrfCheck(CsrfViewMiddleware):
+    """CsrfViewMiddleware's checks, returning the reason of a failure instead of a response"""
+
+    def _reject(self, request, reason):
+        return reason
+
+
+@method_decorator(csrf_exempt, name="dispatch")
+class ApiView(View):
+    """
+    JSON endpoint for authenticated users; ApiError becomes an error response.
+
+    Clients authenticate with an API key ("Authorization: Bearer <key>", see TokenApiView), which involves no
+    cookies and so needs no CSRF token. Pages of the site use the session, and their unsafe requests are checked
+    for the CSRF token as any form is.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        try:
+            self.authenticate(request)
+            return super().dispatch(request, *args, **kwargs)
+        except ApiError as e:
+            return error_response(e.message, status=e.status, details=e.details)
+
+    def authenticate(self, request):
+        header = request.headers.get("Authorization")
+        if header:
+            scheme, _, key = header.partition(" ")
+            token = ApiToken.authenticate(key.strip()) if scheme.lower() == "bearer" and key.strip() else None
+            if token is None:
+                raise ApiError("Недійсний ключ API", status=401)
+            request.user = token.user
+            request.api_token = token
+        elif not request.user.is_authenticated:
+            raise ApiError("Потрібна авторизація", status=401)
+        else:
+            reason = CsrfCheck(lambda request: None).process_view(request, None, (), {})
+            if reason:
+                raise ApiError(f"Перевірка CSRF не пройдена: {reason}", status=403)
+
+    def http_method_not_allowed(self, request, *args, **kwargs):
+        return error_response("Метод не підтримується", status=405)
+
+    def get_limit(self):
+        try:
+            limit = int(self.request.GET.get("limit", self.default_limit))
+        except ValueError:
+            raise ApiError("Параметр limit має бути числом")
+        return max(1, min(limit, self.max_limit))
+
+
+class ResourceApiView(ApiView):
+    """
+    Collection endpoint with cursor pagination, sparse fields and batch writes.
+
+    GET     ?fields=a,b&limit=N&cursor=...   list
+    POST    [{...}, ...]                     batch create
+    PATCH   [{"id": 1, ...}, ...]            batch update
+    DELETE  {"ids": [1, 2, ...]}             batch delete
+
+    Reads go through values() with only the requested columns, so no model instances are built.
+    Writes are all-or-nothing: one invalid item rejects the whole batch.
+    """
+
+    model = None
+    # API field name -> model attribute (also the values() column)
+    fields = {}
+    writable_fields = ()
+    default_limit = 100
+    max_limit = 1000
+    max_batch_size = 1000
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def check_write_permission(self):
+        pass
+
+    # === READ ===
+
+    def get(self, request, *args, **kwargs):
+        fields = self.get_requested_fields()
+        limit = self.get_limit()
+
+        queryset = self.get_queryset().order_by("pk")
+        after = self.decode_cursor(request.GET.get("cursor"))
+        if after is not None:
+            queryset = queryset.filter(pk__gt=after)
+
+        columns = {"pk", *(self.fields[name] for name in fields)}
+        rows = list(queryset.values(*columns)[: limit + 1])
+
+        next_url = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            params = request.GET.copy()
+            params["cursor"] = self.encode_cursor(rows[-1]["pk"])
+            next_url = request.build_absolute_uri(f"{request.path}?{params.urlencode()}")
+
+        results = [{name: row[self.fields[name]] for name in fields} for row in rows]
+        return JsonResponse({"results": results, "next": next_url})
+
+    def get_requested_fields(self):
+        requested = self.request.GET.get("fields")
+        if not requested:
+            return list(self.fields)
+
+        fields = [name.strip() for name in requested.split(",") if name.strip()]
+        unknown = [name for name in fields if name not in self.fields]
+        if unknown:
+            raise ApiError(f"Невідомі поля: {', '.join(unknown)}", details={"available": list(self.fields)})
+        return fields
+
+    @staticmethod
+    def encode_cursor(pk):
+        return base64.urlsafe_b64encode(str(pk).encode()).decode()
+
+    @staticmethod
+    def decode_cursor(cursor):
+        if not cursor:
+            return None
+        try:
+            return int(base64.urlsafe_b64decode(cursor.encode()).decode())
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError("Некоректний cursor")
+
+    def serialize(self, obj):
+        return {name: getattr(obj, attribute) for name, attribute in self.fields.items()}
+
+    # === WRITE ===
+
+    def post(self, request, *args, **kwargs):
+        self.check_write_permission()
+        items = self.parse_batch()
+
+        with db_transaction.atomic():
+            objects = self.create_objects(items)
+
+        return JsonResponse({"results": [self.serialize(obj) for obj in objects]}, status=201)
+
+    def patch(self, request, *args, **kwargs):
+        self.check_write_permission()
+        items = self.parse_batch()
+
+        ids = []
+        for index, item in enumerate(items):
+            if not isinstance(item.get("id"), int):
+                raise ApiError("Кожен елемент має містити числовий id", details={"index": index})
+            ids.append(item["id"])
+
+        # One query for the whole batch; foreign or missing ids are reported as not found
+        instances = self.get_queryset().in_bulk(ids)
+        missing = [pk for pk in ids if pk not in instances]
+        if missing:
+            raise ApiError("Об'єкти не знайдено", status=404, details={"ids": missing})
+
+        with db_transaction.atomic():
+            objects = self.update_objects(instances, items)
+
+        return JsonResponse({"results": [self.serialize(obj) for obj in objects]})
+
+    def delete(self, request, *args, **kwargs):
+        self.check_write_permission()
+        body = self.parse_body()
+        ids = body.get("ids") if isinstance(body, dict) else None
+        if not isinstance(ids, list) or not all(isinstance(pk, int) for pk in ids):
+            raise ApiError('Очікується {"ids": [...]}')
+        if len(ids) > self.max_batch_size:
+            raise ApiError(f"Не більше {self.max_batch_size} елементів за запит")
+
+        _, deleted = self.get_queryset().filter(pk__in=ids).delete()
+        return JsonResponse({"deleted": deleted.get(self.model._meta.label, 0)})
+
+    def parse_body(self):
+        try:
+            return json.loads(self.request.body)
+        except (ValueError, UnicodeDecodeError):
+            raise ApiError("Некоректний JSON")
+
+    def parse_batch(self):
+        items = self.parse_body()
+        if isinstance(items, dict):
+            items = [items]
+        if not isinstance(items, list) or not all(isinstance(item, dict) for item in items):
+            raise ApiError("Очікується об'єкт або список об'єктів")
+        if not items:
+            raise ApiError("Порожній запит")
+        if len(items) > self.max_batch_size:
+            raise ApiError(f"Не більше {self.max_batch_size} елементів за запит")
+        return items
+
+    def validate(self, items, instances=None):
+        """Validate every item with get_form(); returns cleaned data or raises with all errors at once"""
+        cleaned, errors = [], []
+        for index, item in enumerate(items):
+            instance = instances[item["id"]] if instances else None
+            data = self.get_form_data(instance) if instance else {}
+            data.update({key: value for key, value in item.items() if key in self.writable_fields})
+
+            form = self.get_form(data, instance)
+            if form.is_valid():
+                cleaned.append(form.cleaned_data)
+            else:
+                errors.append({"index": index, "errors": form.errors.get_json_data()})
+
+        if errors:
+            raise ApiError("Помилки валідації", details=errors)
+        return cleaned
+
+    def get_form_data(self, instance):
+        return {name: getattr(instance, self.fields[name]) for name in self.writable_fields}
+
+    def get_form(self, data, instance=None):
+        raise NotImplementedError
+
+    def create_objects(self, items):
+        raise NotImplementedError
+
+    def update_objects(self, instances, items):
+        raise NotImplementedError
+
+
+class TableApiView(ResourceApiView):
+    model = Table
+    fields = {"id": "id", "title": "title", "color": "color", "created_at": "created_at", "updated_at": "updated_at"}
+    writable_fields = ("title", "color")
+
+    def get_queryset(self):
+        return Table.objects.owned_by(self.request.user)
+
+    def get_form(self, data, instance=None):
+        return TableForm(data, instance=instance)
+
+    def create_objects(self, items):
+        tables = [Table(user=self.request.user, **data) for data in self.validate(items)]
+        return Table.objects.bulk_create(tables)
+
+    def update_objects(self, instances, items):
+        # bulk_update skips auto_now, so updated_at is set by hand
+        now = timezone.now()
+        tables = []
+        for item, data in zip(items, self.validate(items, instances)):
+            table = instances[item["id"]]
+            for name, value in data.items():
+                setattr(table, name, value)
+            table.updated_at = now
+            tables.append(table)
+
+        Table.objects.bulk_update(tables, [*self.writable_fields, "updated_at"])
+        return tables
+
+
+class TransactionApiView(ResourceApiView):
+    model = Transaction
+    fields = {
+        "id": "id",
+        "table": "table_id",
+        "amount": "amount",
+        "currency": "currency",
+        "date": "date",
+        "category": "category_id",
+        "description": "description",
+        "created_at": "created_at",
+        "updated_at": "updated_at",
+    }
+    writable_fields = ("table", "amount", "currency", "date", "category", "description")
+
+    def get_queryset(self):
+        return Transaction.objects.owned_by(self.request.user)
+
+    def get_form(self, data, instance=None):
+        if not hasattr(self, "form_kwargs"):
+            # Tables and categories are loaded once per batch, rows are validated in memory
+            self.tables = {table.pk: table for table in Table.objects.owned_by(self.request.user)}
+            self.form_kwargs = TransactionRowForm.get_choices(self.tables)
+        return TransactionRowForm(data, **self.form_kwargs)
+
+    def create_objects(self, items):
+        transactions = [
+            Transaction(
+                table=self.tables[data["table"]],
+                amount=data["amount"],
+                currency=data["currency"],
+                date=data["date"],
+                category_id=data["category"],
+                description=data["description"],
+            )
+            for data in self.validate(items)
+        ]
+        return Transaction.objects.bulk_create(transactions)
+
+    def update_objects(self, instances, items):
+        # bulk_update skips auto_now, so updated_at is set by hand
+        now = timezone.now()
+        transactions = []
+        for item, data in zip(items, self.validate(items, instances)):
+            transaction = instances[item["id"]]
+            transaction.table_id = data["table"]
+            transaction.amount = data["amount"]
+            transaction.currency = data["currency"]
+            transaction.date = data["date"]
+            transaction.category_id = data["category"]
+            transaction.description = data["description"]
+            transaction.updated_at = now
+            transactions.append(transaction)
+
+        Transaction.objects.bulk_update(
+            transactions, ["table", "amount", "currency", "date", "category", "description", "updated_at"]
+        )
+        return transactions
+
+
+class CategoryApiView(ResourceApiView):
+    """Categories are shared by all users, so only staff can change them"""
+
+    model = Category
+    fields = {
+        "id": "id",
+        "name": "name",
+        "parent": "parent_id",
+        "path": "path",
+        "depth": "depth",
+        "updated_at": "updated_at",
+    }
+    writable_fields = ("name", "parent")
+
+    def get_queryset(self):
+        return Category.objects.all()
+
+    def check_write_permission(self):
+        if not self.request.user.is_staff:
+            raise ApiError("Недостатньо прав", status=403)
+
+    def get_form(self, data, instance=None):
+        return modelform_factory(Category, fields=["name", "parent"])(data, instance=instance)
+
+    def create_objects(self, items):
+        return self.save_categories([Category(**data) for data in self.validate(items)])
+
+    def update_objects(self, instances, items):
+        categories = []
+        for item, data in zip(items, self.validate(items, instances)):
+            category = instances[item["id"]]
+            category.name = data["name"]
+            category.parent = data["parent"]
+            categories.append(category)
+        return self.save_categories(categories)
+
+    @staticmethod
+    def save_categories(categories):
+        # Saved one by one: the materialized path needs the id and the parent's path
+        try:
+            for category in categories:
+                category.save()
+        except (IntegrityError, ValueError) as e:
+            raise ApiError(f"Не вдалося зберегти категорію: {e}")
+        return categories
+
+
+class TokenApiView(ResourceApiView):
+    """
+    API keys of the user.
+
+    POST    {"email": ..., "password": ..., "name": "..."}   issues a key; the response is the only place it is shown
+    GET, DELETE {"ids": [...]}                              list and revoke keys, as for other resources
+    """
+
+    model = ApiToken
+    fields = {"id": "id", "name": "name", "created_at": "created_at", "last_used_at": "last_used_at"}
+    http_method_names = ["get", "post", "delete", "options"]
+
+    def get_queryset(self):
+        return ApiToken.objects.filter(user=self.request.user)
+
+    def authenticate(self, request):
+        # Issuing a key takes the password instead
+        if request.method != "POST":
+            super().authenticate(request)
+
+    def post(self, request, *args, **kwargs):
+        body = self.parse_body()
+        if not isinstance(body, dict):
+            body = {}
+        credentials = {key: body.get(key) for key in ("email", "password", "name")}
+        missing = [key for key, value in credentials.items() if not isinstance(value, str) or not value.strip()]
+        if missing:
+            raise ApiError("Обов'язкові поля не заповнено", details={"fields": missing})
+        if len(credentials["name"]) > ApiToken._meta.get_field("name").max_length:
+            raise ApiError("Задовга назва ключа")
+
+        user = authenticate(request, username=credentials["email"], password=credentials["password"])
+        if user is None:
+            raise ApiError("Невірний email або пароль", status=401)
+
+        token, key = ApiToken.issue(user, credentials["name"].strip())
+        return JsonResponse({**self.serialize(token), "key": key}, status=201)
+
+
+class SyncApiView(ApiView):
+    """
+    Delta sync for clients that keep a local copy.
+
+    GET ?cursor=...&limit=N   categories, tables and transactions created or changed since the cursor, and the ids
+                              of those deleted since then
+
+    Without a cursor every row is returned, archived transactions included (full sync). While "has_more" is true,
+    request the next page with the returned cursor; the cursor of the last page is the one to keep for the next
+    sync. Rows may be sent again in a later sync, so clients upsert by id.
+
+    Deleting a table also deletes its transactions, without separate ids for them; deleting a category leaves its
+    transactions without a category. "reset": true means the cursor has expired: the client drops its copy and
+    the response starts a full sync.
+    """
+
+    default_limit = 500
+    max_limit = 2000
+    CURSOR_SALT = "finances.api.sync"
+    DELETED_KEYS = {Tombstone.TRANSACTION: "transactions", Tombstone.TABLE: "tables", Tombstone.CATEGORY: "categories"}
+
+    def get(self, request, *args, **kwargs):
+        state, reset = self.get_state()
+        streams = self.get_streams(full_sync=state["since"] is None)
+        remaining = self.get_limit()
+
+        payload = {
+            "categories": [],
+            "tables": [],
+            "transactions": [],
+            "deleted": {key: [] for key in ("categories", "tables", "transactions")},
+        }
+        while state["stream"] < len(streams) and remaining > 0:
+            key, queryset, time_field, fields = streams[state["stream"]]
+            rows = self.read_stream(queryset, time_field, fields, state, remaining + 1)
+
+            if len(rows) > remaining:
+                rows = rows[:remaining]
+                state["after"] = [rows[-1][time_field].isoformat(), rows[-1]["pk"]]
+            else:
+                state["stream"] += 1
+                state["after"] = None
+            remaining -= len(rows)
+
+            for row in rows:
+                self.add_row(payload, key, row, fields)
+
+        has_more = state["stream"] < len(streams)
+        if not has_more:
+            # Caught up: the next sync starts where this snapshot ended
+            state = {"user": request.user.pk, "since": state["until"], "until": None, "stream": 0, "after": None}
+
+        payload.update(
+            {"cursor": signing.dumps(state, salt=self.CURSOR_SALT, compress=True), "has_more": has_more, "reset": reset}
+        )
+        return JsonResponse(payload)
+
+    def get_state(self):
+        """Position of the sync from the cursor; a new sync gets the upper bound of its snapshot"""
+        cursor = self.request.GET.get("cursor")
+        state = {"user": self.request.user.pk, "since": None, "until": None, "stream": 0, "after": None}
+        if cursor:
+            try:
+                state = signing.loads(cursor, salt=self.CURSOR_SALT)
+            except signing.BadSignature:
+                raise ApiError("Некоректний cursor")
+            if state.get("user") != self.request.user.pk:
+                raise ApiError("Некоректний cursor")
+
+        reset = False
+        if state["until"] is None:
+            now = timezone.now()
+            # updated_at is stamped when a row is written, not when its transaction commits: rows newer than the
+            # longest write transaction may still be invisible, so the snapshot stops short of them and the next
+            # sync gets them
+            state["until"] = (now - timedelta(seconds=settings.SYNC_LAG_SECONDS)).isoformat()
+            # Tombstones older than this are pruned, so deletions since then can't be reported
+            expired = now - timedelta(days=settings.SYNC_TOMBSTONE_DAYS)
+            if state["since"] is not None and datetime.fromisoformat(state["since"]) < expired:
+                state["since"], reset = None, True
+        return state, reset
+
+    def get_streams(self, full_sync):
+        """(payload key, queryset, time field, fields) in the order they are read"""
+        user = self.request.user
+        streams = [
+            ("categories", Category.objects.all(), "updated_at", CategoryApiView.fields),
+            ("tables", Table.objects.owned_by(user), "updated_at", TableApiView.fields),
+            ("transactions", Transaction.objects.owned_by(user), "updated_at", TransactionApiView.fields),
+        ]
+        if full_sync:
+            # Archived transactions never change, so only a full sync needs them
+            archived = ArchivedTransaction.objects.owned_by(user)
+            streams.append(("archived_transactions", archived, "updated_at", TransactionApiView.fields))
+        else:
+            tombstones = Tombstone.objects.filter(Q(user=user) | Q(user__isnull=True))
+            streams.append(("deleted", tombstones, "deleted_at", {"kind": "kind", "id": "object_id"}))
+        return streams
+
+    @staticmethod
+    def read_stream(queryset, time_field, fields, state, limit):
+        # Served by the (user, updated_at) indexes; pk breaks ties between rows saved at the same moment
+        queryset = queryset.filter(**{f"{time_field}__lte": state["until"]})
+        if state["since"] is not None:
+            queryset = queryset.filter(**{f"{time_field}__gt": state["since"]})
+        if state["after"] is not None:
+            after_time, after_pk = state["after"]
+            queryset = queryset.filter(**{f"{time_field}__gte": after_time}).filter(
+                Q(**{f"{time_field}__gt": after_time}) | Q(pk__gt=after_pk)
+            )
+
+        columns = {"pk", time_field, *fields.values()}
+        return list(queryset.order_by(time_field, "pk").values(*columns)[:limit])
+
+    def add_row(self, payload, key, row, fields):
+        if key == "deleted":
+            payload["deleted"][self.DELETED_KEYS[row["kind"]]].append(row["object_id"])
+        elif key == "archived_transactions":
+            payload["transactions"].append({**{name: row[column] for name, column in fields.items()}, "archived": True})
+        else:
+            payload[key].append({name: row[column] for name, column in fields.items()})
@@ -3,3 +3,17 @@ from django.apps import AppConfig
 
 class FinancesConfig(AppConfig):
     name = "finances"
+
+    def ready(self):
+        from django.db.backends.signals import connection_created
+
+        from . import jobs, signals  # noqa: F401
+        from .services.metrics import Metrics
+        from .services.profiling import RequestProfiler
+        from .services.sqlite_tuning import SQLiteTuning
+
+        connection_created.connect(SQLiteTuning.configure_connection, dispatch_uid="finances_sqlite_tuning")
+        connection_created.connect(Metrics.install_query_wrapper, dispatch_uid="finances_metrics_query_wrapper")
+        connection_created.connect(
+            RequestProfiler.install_query_wrapper, dispatch_uid="finances_profiler_query_wrapper"
+        )
@@ -0,0 +1,218 @@
+import pickle
+import threading
+import uuid
+import zlib
+from collections import OrderedDict
+from time import monotonic
+
+from django.core.cache import caches
+from django.core.cache.backends.base import DEFAULT_TIMEOUT, BaseCache
+from django.utils.functional import cached_property
+
+_MISSING = object()
+
+
+class TwoTierCache(BaseCache):
+    """
+    Small in-process LRU (L1) in front of a shared cache (L2) that every worker sees.
+
+    LOCATION is the alias of the shared cache in CACHES. Reads are served from L1 when possible, so hot
+    keys (exchange rates, category tree) cost no round trip; misses and all writes go to L2, so a value
+    is computed once per cluster rather than once per worker.
+
+    Invalidation is broadcast per key group: keys are hashed into INVALIDATION_BUCKETS groups, each with a
+    generation token in L2. A write replaces the token of its key's group, and each worker reads all tokens
+    at most once per SYNC_INTERVAL seconds, dropping from L1 only the keys of groups that changed. Other
+    workers may therefore serve a replaced value for up to SYNC_INTERVAL seconds.
+
+    KEY_PREFIX and VERSION apply to both tiers, so aliases sharing one L2 need distinct prefixes. Keys also
+    carry a namespace token kept in L2 and read with the generations: clear() replaces the token instead of
+    clearing L2, which holds sessions and the other aliases too, and the old keys are left to expire.
+
+    OPTIONS:
+        L1_MAX_ENTRIES       entries kept per process (default 1000)
+        L1_TIMEOUT           seconds an entry may live in L1 (default 30)
+        SYNC_INTERVAL        seconds between generation checks (default 1)
+        INVALIDATION_BUCKETS key groups with their own generation (default 64)
+        BROADCAST            False for caches whose keys are derived from the cached content (template
+                             fragments): a key never gets a different value, so writes need no invalidation
+                             and reads check only the namespace (default True)
+    """
+
+    GENERATION_KEY = "two_tier_cache:generation"
+    NAMESPACE_KEY = "two_tier_cache:namespace"
+
+    def __init__(self, location, params):
+        super().__init__(params)
+        options = params.get("OPTIONS", {})
+        self.shared_alias = location
+        self.l1_max_entries = options.get("L1_MAX_ENTRIES", 1000)
+        self.l1_timeout = options.get("L1_TIMEOUT", 30)
+        self.sync_interval = options.get("SYNC_INTERVAL", 1)
+        self.buckets = options.get("INVALIDATION_BUCKETS", 64)
+        self.broadcast = options.get("BROADCAST", True)
+
+        self._l1 = OrderedDict()
+        self._lock = threading.Lock()
+        self._generations = {}
+        self._namespace = None
+        self._synced_at = None
+
+    @cached_property
+    def shared(self):
+        return caches[self.shared_alias]
+
+    @cached_property
+    def namespace_key(self):
+        return self.make_key(self.NAMESPACE_KEY)
+
+    @cached_property
+    def generation_keys(self):
+        return [self.make_key(f"{self.GENERATION_KEY}:{bucket}") for bucket in range(self.buckets)]
+
+    def get_bucket(self, key):
+        return zlib.crc32(key.encode()) % self.buckets
+
+    # === L1 ===
+
+    def _l1_get(self, key):
+        with self._lock:
+            entry = self._l1.get(key)
+            if entry is None:
+                return _MISSING
+            pickled, expires_at, _ = entry
+            if expires_at <= monotonic():
+                del self._l1[key]
+                return _MISSING
+            self._l1.move_to_end(key)
+        return pickle.loads(pickled)
+
+    def _l1_set(self, key, value, timeout=DEFAULT_TIMEOUT):
+        ttl = self.l1_timeout
+        if timeout is not DEFAULT_TIMEOUT and timeout is not None:
+            ttl = min(ttl, timeout)
+        if ttl <= 0:
+            self._l1_delete(key)
+            return
+
+        # Stored pickled, like LocMemCache, so callers can't mutate the cached copy
+        pickled = pickle.dumps(value, pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._l1[key] = (pickled, monotonic() + ttl, self.get_bucket(key))
+            self._l1.move_to_end(key)
+            while len(self._l1) > self.l1_max_entries:
+                self._l1.popitem(last=False)
+
+    def _l1_delete(self, key):
+        with self._lock:
+            self._l1.pop(key, None)
+
+    def _sync(self):
+        """Pick up the namespace, and drop the L1 keys of groups that were written to since the last check"""
+        now = monotonic()
+        if self._synced_at is not None and now - self._synced_at < self.sync_interval:
+            return
+        self._synced_at = now
+
+        values = self.shared.get_many([self.namespace_key, *(self.generation_keys if self.broadcast else [])])
+        namespace = values.get(self.namespace_key)
+        if namespace is None:
+            # First use, or L2 lost the token: a fresh namespace, unless another worker has just started one
+            self.shared.add(self.namespace_key, uuid.uuid4().hex, None)
+            namespace = self.shared.get(self.namespace_key)
+        if namespace != self._namespace:
+            with self._lock:
+                self._l1.clear()
+            self._namespace = namespace
+        if not self.broadcast:
+            return
+
+        changed = {
+            bucket
+            for bucket, key in enumerate(self.generation_keys)
+            if values.get(key) != self._generations.get(bucket)
+        }
+        if not changed:
+            return
+        with self._lock:
+            for key in [key for key, (_, _, bucket) in self._l1.items() if bucket in changed]:
+                del self._l1[key]
+        self._generations = {bucket: values.get(key) for bucket, key in enumerate(self.generation_keys)}
+
+    def _broadcast(self, key):
+        if not self.broadcast:
+            return
+        # Our own generation is left as it was: another worker may have bumped the same group since our last
+        # check, so the next sync drops the group here too (and with it the value just written, a cheap refetch)
+        self.shared.set(self.generation_keys[self.get_bucket(key)], uuid.uuid4().hex, None)
+
+    # === CACHE API ===
+
+    def _key(self, key, version):
+        # The same full key (prefix, version, namespace) in both tiers; the shared cache adds only its own prefix
+        self._sync()
+        return self.make_and_validate_key(f"{self._namespace}:{key}", version=version)
+
+    def _timeout(self, timeout):
+        # Our TIMEOUT applies, not the shared cache's own default
+        return self.default_timeout if timeout is DEFAULT_TIMEOUT else timeout
+
+    def get(self, key, default=None, version=None):
+        key = self._key(key, version)
+        value = self._l1_get(key)
+        if value is not _MISSING:
+            return value
+
+        value = self.shared.get(key, _MISSING)
+        if value is _MISSING:
+            return default
+        self._l1_set(key, value)
+        return value
+
+    def set(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        timeout = self._timeout(timeout)
+        self.shared.set(key, value, timeout)
+        self._l1_set(key, value, timeout)
+        self._broadcast(key)
+
+    def add(self, key, value, timeout=DEFAULT_TIMEOUT, version=None):
+        key = self._key(key, version)
+        timeout = self._timeout(timeout)
+        # The key was absent everywhere, so no other worker can hold a stale copy
+        added = self.shared.add(key, value, timeout)
+        if added:
+            self._l1_set(key, value, timeout)
+        return added
+
+    def touch(self, key, timeout=DEFAULT_TIMEOUT, version=None):
+        return self.shared.touch(self._key(key, version), self._timeout(timeout))
+
+    def delete(self, key, version=None):
+        key = self._key(key, version)
+        deleted = self.shared.delete(key)
+        self._l1_delete(key)
+        self._broadcast(key)
+        return deleted
+
+    def has_key(self, key, version=None):
+        key = self._key(key, version)
+        return self._l1_get(key) is not _MISSING or self.shared.has_key(key)
+
+    def incr(self, key, delta=1, version=None):
+        key = self._key(key, version)
+        value = self.shared.incr(key, delta)
+        self._l1_delete(key)
+        self._broadcast(key)
+        return value
+
+    def clear(self):
+        """Drops this alias only; other workers switch to the new namespace within SYNC_INTERVAL"""
+        namespace = uuid.uuid4().hex
+        self.shared.set(self.namespace_key, namespace, None)
+        with self._lock:
+            self._l1.clear()
+        self._namespace = namespace
+
+    def close(self, **kwargs):
+        self.shared.close(**kwargs)
@@ -0,0 +1,84 @@
+from decimal import ROUND_HALF_UP, Decimal, InvalidOperation
+
+from django import forms
+from django.core import exceptions
+from django.core.validators import DecimalValidator
+from django.db import models
+from django.utils.functional import cached_property
+
+
+class MoneyField(models.BigIntegerField):
+    """
+    Amount stored as an integer number of minor units (kopecks, cents).
+
+    Python code, forms, templates and the API see the same Decimal with decimal_places digits as with a
+    DecimalField; the conversion happens when values are read from and written to the database. Sums, group-bys
+    and comparisons in SQL are therefore integer arithmetic, exact on every backend (SQLite keeps decimals as
+    REAL). Sum, Min and Max keep the field as output, so their results are converted back too; Avg returns a
+    float in minor units.
+    """
+
+    description = "Сума в мінімальних одиницях валюти"
+    default_error_messages = {"invalid": "Значення «%(value)s» має бути числом."}
+
+    def __init__(self, *args, max_digits=None, decimal_places=2, **kwargs):
+        self.max_digits = max_digits
+        self.decimal_places = decimal_places
+        super().__init__(*args, **kwargs)
+
+    def deconstruct(self):
+        name, path, args, kwargs = super().deconstruct()
+        if self.max_digits is not None:
+            kwargs["max_digits"] = self.max_digits
+        if self.decimal_places != 2:
+            kwargs["decimal_places"] = self.decimal_places
+        return name, path, args, kwargs
+
+    @cached_property
+    def validators(self):
+        validators = super().validators
+        if self.max_digits is not None:
+            validators.append(DecimalValidator(self.max_digits, self.decimal_places))
+        return validators
+
+    @cached_property
+    def quantum(self):
+        return Decimal(1).scaleb(-self.decimal_places)
+
+    def from_db_value(self, value, expression, connection):
+        if value is None:
+            return value
+        return Decimal(value).scaleb(-self.decimal_places)
+
+    def to_python(self, value):
+        if value is None or isinstance(value, Decimal):
+            return value
+        try:
+            # Floats through str(), so 0.1 stays 0.1
+            return Decimal(str(value) if isinstance(value, float) else value).quantize(
+                self.quantum, rounding=ROUND_HALF_UP
+            )
+        except (InvalidOperation, TypeError, ValueError):
+            raise exceptions.ValidationError(self.error_messages["invalid"], code="invalid", params={"value": value})
+
+    def get_prep_value(self, value):
+        value = models.Field.get_prep_value(self, value)
+        if value is None:
+            return value
+        value = self.to_python(value)
+        return int(value.scaleb(self.decimal_places).to_integral_value(rounding=ROUND_HALF_UP))
+
+    def get_internal_type(self):
+        return "BigIntegerField"
+
+    def formfield(self, **kwargs):
+        # Entered as a decimal amount, not as minor units
+        return models.Field.formfield(
+            self,
+            **{
+                "form_class": forms.DecimalField,
+                "max_digits": self.max_digits,
+                "decimal_places": self.decimal_places,
+                **kwargs,
+            },
+        )
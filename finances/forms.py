@@ -2,6 +2,7 @@ from django import forms
 from django.utils import timezone
 
 from .models import Category, Table, Transaction
+from .services.category_tree import CategoryTree
 
 
 class TableForm(forms.ModelForm):
@@ -39,26 +40,20 @@ class TransactionForm(forms.ModelForm):
     def __init__(self, user=None, *args, **kwargs):
         super().__init__(*args, **kwargs)
         if user:
-            self.fields["table"].queryset = Table.objects.filter(user=user)
+            self.fields["table"].queryset = Table.objects.owned_by(user)
             self.fields["table"].required = True
             self.fields["table"].empty_label = "Оберіть таблицю"
 
-        if self.instance and self.instance.category:
-            self.fields["category_id"].initial = str(self.instance.category.id)
+        if self.instance and self.instance.category_id:
+            self.fields["category_id"].initial = str(self.instance.category_id)
 
     def save(self, commit=True):
         instance = super().save(commit=False)
 
+        # Check the id against the cached category tree instead of fetching the category
         category_id = self.cleaned_data.get("category_id")
-
-        if category_id:
-            try:
-                category = Category.objects.get(id=category_id)
-                instance.category = category
-            except Category.DoesNotExist:
-                instance.category = None
-        else:
-            instance.category = None
+        category_ids = {node["id"] for node in CategoryTree.get_nodes()}
+        instance.category_id = int(category_id) if category_id.isdigit() and int(category_id) in category_ids else None
 
         if commit:
             instance.save()
@@ -67,6 +62,130 @@ class TransactionForm(forms.ModelForm):
         return instance
 
 
+class TransactionRowForm(forms.Form):
+    """One row of the multi-row entry; choices come from data prefetched by the formset"""
+
+    table = forms.TypedChoiceField(coerce=int, label="Таблиця", widget=forms.Select(attrs={"class": "form-select"}))
+    amount = forms.DecimalField(
+        max_digits=10,
+        decimal_places=2,
+        min_value=0,
+        label="Сума",
+        widget=forms.NumberInput(attrs={"class": "form-control", "placeholder": "0.00", "step": "0.01", "min": "0"}),
+    )
+    currency = forms.ChoiceField(
+        choices=Transaction.CURRENCY_CHOICES,
+        initial="UAH",
+        label="Валюта",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    date = forms.DateField(
+        initial=timezone.localdate,
+        label="Дата",
+        widget=forms.DateInput(attrs={"class": "form-control", "type": "date"}),
+    )
+    category = forms.TypedChoiceField(
+        coerce=int,
+        empty_value=None,
+        required=False,
+        label="Категорія",
+        widget=forms.Select(attrs={"class": "form-select"}),
+    )
+    description = forms.CharField(
+        required=False,
+        label="Опис",
+        widget=forms.TextInput(attrs={"class": "form-control", "placeholder": "Необов'язково"}),
+    )
+
+    def __init__(self, *args, table_choices=(), category_choices=(), **kwargs):
+        super().__init__(*args, **kwargs)
+        self.fields["table"].choices = table_choices
+        self.fields["category"].choices = category_choices
+
+    @staticmethod
+    def get_choices(tables):
+        """Form kwargs with table and category choices, built once and shared by many rows"""
+        return {
+            "table_choices": [("", "Оберіть таблицю")] + [(pk, table.title) for pk, table in tables.items()],
+            "category_choices": [("", "Без категорії")] + CategoryTree.get_choices(),
+        }
+
+
+class BaseTransactionFormSet(forms.BaseFormSet):
+    """Multi-row transaction entry validated against in-memory tables and categories"""
+
+    def __init__(self, *args, user=None, **kwargs):
+        # Two lookups for the whole formset instead of two per row
+        self.tables = {table.pk: table for table in Table.objects.owned_by(user)}
+        kwargs["form_kwargs"] = TransactionRowForm.get_choices(self.tables)
+        super().__init__(*args, **kwargs)
+
+    def save(self):
+        transactions = [
+            Transaction(
+                table=self.tables[form.cleaned_data["table"]],
+                amount=form.cleaned_data["amount"],
+                currency=form.cleaned_data["currency"],
+                date=form.cleaned_data["date"],
+                category_id=form.cleaned_data["category"],
+                description=form.cleaned_data["description"],
+            )
+            for form in self.forms
+            if form.has_changed() and not self._should_delete_form(form)
+        ]
+        return Transaction.objects.bulk_create(transactions)
+
+
+TransactionFormSet = forms.formset_factory(
+    TransactionRowForm,
+    formset=BaseTransactionFormSet,
+    extra=4,
+    min_num=1,
+    validate_min=True,
+    max_num=100,
+    validate_max=True,
+    can_delete=True,
+)
+
+
+class TransactionImportForm(forms.Form):
+    table = forms.ModelChoiceField(
+        queryset=Table.objects.none(),
+        label="Таблиця",
+        empty_label="Оберіть таблицю",
+        widget=forms.Select(attrs={"class": "form-control"}),
+    )
+    file = forms.FileField(
+        label="Файл виписки",
+        help_text=(
+            "CSV (дата, сума, валюта, категорія, опис) або OFX; витрати мають від'ємну суму, надходження пропускаються"
+        ),
+        widget=forms.ClearableFileInput(attrs={"class": "form-control", "accept": ".csv,.txt,.ofx,.qfx"}),
+    )
+    currency = forms.ChoiceField(
+        choices=Transaction.CURRENCY_CHOICES,
+        initial="UAH",
+        label="Валюта за замовчуванням",
+        help_text="Для рядків CSV без колонки валюти",
+        widget=forms.Select(attrs={"class": "form-control"}),
+    )
+
+    FILE_FORMATS = {"csv": "csv", "txt": "csv", "ofx": "ofx", "qfx": "ofx"}
+
+    def __init__(self, user=None, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        if user:
+            self.fields["table"].queryset = Table.objects.owned_by(user)
+
+    def clean_file(self):
+        uploaded_file = self.cleaned_data["file"]
+        extension = uploaded_file.name.rsplit(".", 1)[-1].lower()
+        if extension not in self.FILE_FORMATS:
+            raise forms.ValidationError("Підтримуються лише файли CSV та OFX")
+        self.cleaned_data["file_format"] = self.FILE_FORMATS[extension]
+        return uploaded_file
+
+
 class TransactionFilterForm(forms.Form):
     search = forms.CharField(required=False)
     date_from = forms.DateField(required=False)
@@ -77,3 +196,37 @@ class TransactionFilterForm(forms.Form):
     subcategory = forms.ModelChoiceField(queryset=Category.objects.filter(parent__isnull=False), required=False)
 
     currency = forms.ChoiceField(choices=[("", "Всі валюти")] + Transaction.CURRENCY_CHOICES, required=False)
+
+    def get_date_range(self):
+        """(date_from, date_to) of a valid form, None for a missing bound"""
+        if not self.is_valid():
+            return None, None
+        return self.cleaned_data.get("date_from"), self.cleaned_data.get("date_to")
+
+    def filter_queryset(self, queryset):
+        """Apply the filters to a transaction queryset (shared by the list and the export)"""
+        if not self.is_valid():
+            return queryset
+
+        search = self.cleaned_data.get("search")
+        date_from = self.cleaned_data.get("date_from")
+        date_to = self.cleaned_data.get("date_to")
+        category = self.cleaned_data.get("category")
+        subcategory = self.cleaned_data.get("subcategory")
+        currency = self.cleaned_data.get("currency")
+
+        if search:
+            queryset = queryset.filter(table__title__icontains=search)
+        if date_from:
+            queryset = queryset.filter(date__gte=date_from)
+        if date_to:
+            queryset = queryset.filter(date__lte=date_to)
+        if subcategory:
+            queryset = queryset.filter(category=subcategory)
+        elif category:
+            # Include the category and its whole subtree
+            queryset = queryset.filter(category__path__startswith=category.path)
+        if currency:
+            queryset = queryset.filter(currency=currency)
+
+        return queryset
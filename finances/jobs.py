@@ -0,0 +1,43 @@
+from datetime import date
+
+from .models import Table, Transaction
+from .services.jobs import JobFailed, JobQueue
+from .services.transaction_archive import TransactionArchive
+from .services.transaction_import import TransactionImporter
+
+
+def delete_job_file(job):
+    JobQueue.file_storage.delete(job.payload["file"])
+
+
+@JobQueue.register("import_transactions", cleanup=delete_job_file)
+def import_transactions(job):
+    """Statement saved by TransactionImportView; the result is the import report"""
+    table = Table.objects.filter(pk=job.payload["table_id"]).first()
+    if table is None:
+        raise JobFailed("Таблицю, в яку імпортувалася виписка, видалено")
+    try:
+        statement = JobQueue.file_storage.open(job.payload["file"], "rb")
+    except FileNotFoundError:
+        raise JobFailed("Файл виписки більше не доступний, завантажте його ще раз")
+
+    with statement:
+        importer = TransactionImporter(
+            table,
+            statement,
+            file_format=job.payload["file_format"],
+            default_currency=job.payload["currency"],
+            progress=lambda done, total: JobQueue.set_progress(job, done, total),
+        )
+        return importer.run().to_dict()
+
+
+@JobQueue.register("archive_transactions")
+def archive_transactions(job):
+    """Enqueued by manage.py archive_transactions --enqueue"""
+    before = date.fromisoformat(job.payload["before"])
+    total = Transaction.objects.filter(date__lt=before).count()
+    moved = TransactionArchive.archive(
+        before, job.payload.get("batch_size"), progress=lambda done: JobQueue.set_progress(job, done, total)
+    )
+    return {"moved": moved}
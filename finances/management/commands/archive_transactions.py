@@ -0,0 +1,59 @@
+from datetime import date
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from finances.models import Transaction
+from finances.services.jobs import JobQueue
+from finances.services.transaction_archive import TransactionArchive
+
+
+class Command(BaseCommand):
+    help = (
+        "Переносить старі транзакції в архів, попередньо додавши їх до місячних підсумків; "
+        "межа - ARCHIVE_AFTER_DAYS, для запуску з cron"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Архівувати повні місяці, старші за цю кількість днів")
+        parser.add_argument("--before", help="Архівувати транзакції до цієї дати (РРРР-ММ-ДД)")
+        parser.add_argument("--batch-size", type=int, default=TransactionArchive.BATCH_SIZE)
+        parser.add_argument("--dry-run", action="store_true", help="Лише порахувати транзакції для архівації")
+        parser.add_argument(
+            "--enqueue", action="store_true", help="Додати архівацію до черги фонових завдань замість запуску тут"
+        )
+
+    def handle(self, *args, **options):
+        if options["before"]:
+            try:
+                before = date.fromisoformat(options["before"])
+            except ValueError:
+                raise CommandError("Дата має бути у форматі РРРР-ММ-ДД")
+        else:
+            before = TransactionArchive.get_horizon(options["days"])
+
+        if options["dry_run"]:
+            count = Transaction.objects.filter(date__lt=before).count()
+            self.stdout.write(f"До архіву буде перенесено транзакцій до {before}: {count}")
+            return
+
+        if options["enqueue"]:
+            job, created = JobQueue.enqueue(
+                "archive_transactions",
+                {"before": before.isoformat(), "batch_size": options["batch_size"]},
+                # Below interactive work such as imports
+                priority=-10,
+                idempotency_key=f"archive_transactions:{before}",
+            )
+            state = "додано до черги" if created else f"вже є, стан: {job.get_status_display()}"
+            self.stdout.write(self.style.SUCCESS(f"Завдання {job} {state}"))
+            return
+
+        started = perf_counter()
+        moved = TransactionArchive.archive(before, batch_size=options["batch_size"])
+        self.stdout.write(
+            self.style.SUCCESS(f"Архівовано транзакцій до {before}: {moved} за {perf_counter() - started:.1f} с")
+        )
+        if moved:
+            # Deleted rows leave free pages behind until the file is rebuilt
+            self.stdout.write("Щоб зменшити файл бази SQLite, виконайте manage.py sqlite_maintenance --vacuum")
@@ -0,0 +1,179 @@
+import copy
+import json
+import platform
+import statistics
+import subprocess
+from time import perf_counter
+
+import django
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from finances.models import Transaction
+from finances.services.currency_converter import CurrencyConverter
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Вимірює час відповіді основних сторінок на наборах даних різного розміру (результат у JSON)"
+
+    # name, method, url name, data
+    TARGETS = [
+        ("dashboard", "get", "finances:dashboard", {}),
+        ("transaction_list", "get", "finances:transaction_list", {}),
+        ("transaction_list_filtered", "get", "finances:transaction_list", {"currency": "USD", "page": 2}),
+        ("analytics_30d", "get", "finances:analytics", {"period": "30"}),
+        ("analytics_all", "get", "finances:analytics", {"period": "all"}),
+        ("currency_converter", "get", "finances:currency_converter", {}),
+        ("currency_convert", "post", "finances:currency_converter", {"amount": "100", "from_currency": "USD"}),
+    ]
+    # Fixed rates keep the provider API out of the measurements
+    RATES = {"USD": 1.0, "EUR": 0.92, "UAH": 41.5}
+
+    def add_arguments(self, parser):
+        parser.add_argument("--sizes", default="1000,10000,100000", help="Кількість транзакцій через кому")
+        parser.add_argument("--repeat", type=int, default=5, help="Вимірювань на сторінку")
+        parser.add_argument("--warmup", type=int, default=1, help="Запитів перед вимірюваннями")
+        parser.add_argument("--target", action="append", help="Лише вказані сторінки (можна повторювати)")
+        parser.add_argument("--prefix", default="benchsize", help="Префікс користувачів з даними для бенчмарку")
+        parser.add_argument("--output", help="Файл для JSON-результату (за замовчуванням stdout)")
+        parser.add_argument("--compare", help="Попередній JSON-результат для порівняння")
+
+    def handle(self, *args, **options):
+        try:
+            sizes = [int(size) for size in options["sizes"].split(",") if size.strip()]
+        except ValueError:
+            raise CommandError("--sizes має містити цілі числа через кому")
+
+        targets = self.TARGETS
+        if options["target"]:
+            targets = [target for target in self.TARGETS if target[0] in options["target"]]
+            if not targets:
+                raise CommandError(f"Невідомі сторінки, доступні: {', '.join(t[0] for t in self.TARGETS)}")
+
+        results = []
+        with override_settings(ALLOWED_HOSTS=["*"], CACHES=self.get_cache_settings()):
+            cache.set(CurrencyConverter.CACHE_KEY, self.RATES, CurrencyConverter.CACHE_TIMEOUT)
+            try:
+                for size in sizes:
+                    client = Client()
+                    client.force_login(self.get_user(size, options["prefix"]))
+                    for target in targets:
+                        results.append(self.measure(client, size, target, options["repeat"], options["warmup"]))
+            finally:
+                cache.delete(CurrencyConverter.CACHE_KEY)
+
+        report = {
+            "commit": self.get_commit(),
+            "created_at": timezone.now().isoformat(),
+            "python": platform.python_version(),
+            "django": django.get_version(),
+            "database": connection.vendor,
+            "repeat": options["repeat"],
+            "results": results,
+        }
+
+        output = json.dumps(report, indent=2, ensure_ascii=False)
+        if options["output"]:
+            with open(options["output"], "w", encoding="utf-8") as f:
+                f.write(output)
+            self.stderr.write(f"Результат записано у {options['output']}")
+        else:
+            self.stdout.write(output)
+
+        if options["compare"]:
+            self.compare(options["compare"], results)
+
+    @staticmethod
+    def get_cache_settings():
+        """
+        The configured caches under their own key prefix.
+
+        Pages still go through the real backends, but the fixed rates and everything else the run caches
+        never reach (or invalidate) the entries the site is using.
+        """
+        caches = copy.deepcopy(settings.CACHES)
+        for alias, config in caches.items():
+            config["KEY_PREFIX"] = ":".join(filter(None, ["bench", config.get("KEY_PREFIX")]))
+        return caches
+
+    def get_user(self, size, prefix):
+        """Bench user with exactly `size` transactions, seeded on first use"""
+        seed_prefix = f"{prefix}{size}"
+        user = User.objects.filter(email=f"{seed_prefix}-1@example.com").first()
+        if user is None or Transaction.objects.owned_by(user).count() != size:
+            self.stderr.write(f"Генерація {size} транзакцій...")
+            call_command(
+                "seed_benchmark",
+                users=1,
+                transactions=size,
+                prefix=seed_prefix,
+                clear=True,
+                stdout=self.stderr,
+            )
+            user = User.objects.get(email=f"{seed_prefix}-1@example.com")
+        return user
+
+    def measure(self, client, size, target, repeat, warmup):
+        name, method, url_name, data = target
+        request = getattr(client, method)
+        url = reverse(url_name)
+
+        for _ in range(warmup):
+            request(url, data)
+
+        timings = []
+        for _ in range(max(1, repeat)):
+            with CaptureQueriesContext(connection) as queries:
+                started = perf_counter()
+                response = request(url, data)
+                timings.append((perf_counter() - started) * 1000)
+
+        timings.sort()
+        result = {
+            "size": size,
+            "target": name,
+            "status": response.status_code,
+            "queries": len(queries),
+            "min_ms": round(timings[0], 2),
+            "median_ms": round(statistics.median(timings), 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 2),
+            "max_ms": round(timings[-1], 2),
+        }
+        self.stderr.write(f"  {size:>9} {name:<28} {result['median_ms']:>10.2f} мс  {result['queries']} запитів")
+        return result
+
+    @staticmethod
+    def get_commit():
+        try:
+            return subprocess.run(
+                ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+            ).stdout.strip()
+        except (OSError, subprocess.CalledProcessError):
+            return None
+
+    def compare(self, path, results):
+        with open(path, encoding="utf-8") as f:
+            previous = json.load(f)
+
+        baseline = {(r["size"], r["target"]): r for r in previous.get("results", [])}
+        self.stderr.write(f"\nПорівняння з {previous.get('commit') or path}:")
+        for result in results:
+            old = baseline.get((result["size"], result["target"]))
+            if old is None:
+                continue
+            change = (result["median_ms"] - old["median_ms"]) / old["median_ms"] * 100 if old["median_ms"] else 0
+            self.stderr.write(
+                f"  {result['size']:>9} {result['target']:<28} "
+                f"{old['median_ms']:>10.2f} → {result['median_ms']:>10.2f} мс ({change:+.1f}%), "
+                f"запитів {old['queries']} → {result['queries']}"
+            )
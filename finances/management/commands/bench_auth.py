@@ -0,0 +1,90 @@
+import json
+import statistics
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.contrib.auth.middleware import AuthenticationMiddleware
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.core.management.base import BaseCommand
+from django.db import connection
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, override_settings
+from django.test.utils import CaptureQueriesContext
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Вимірює накладні витрати сесій та автентифікації на запит для різних налаштувань (результат у JSON)"
+
+    EMAIL = "bench-auth@example.com"
+    MODEL_BACKEND = "django.contrib.auth.backends.ModelBackend"
+    CACHED_BACKEND = "users.backends.CachedModelBackend"
+    # name, session engine, auth backend
+    PROFILES = [
+        ("db", "django.contrib.sessions.backends.db", MODEL_BACKEND),
+        ("cached_db", "django.contrib.sessions.backends.cached_db", MODEL_BACKEND),
+        ("cached_db+user_cache", "django.contrib.sessions.backends.cached_db", CACHED_BACKEND),
+        ("signed_cookies+user_cache", "django.contrib.sessions.backends.signed_cookies", CACHED_BACKEND),
+    ]
+
+    def add_arguments(self, parser):
+        parser.add_argument("--repeat", type=int, default=500, help="Запитів на профіль")
+        parser.add_argument("--output", help="Файл для JSON-результату (за замовчуванням stdout)")
+
+    def handle(self, *args, **options):
+        user, _ = User.objects.get_or_create(email=self.EMAIL)
+        results = []
+        try:
+            for name, engine, backend in self.PROFILES:
+                with override_settings(SESSION_ENGINE=engine, AUTHENTICATION_BACKENDS=[backend]):
+                    results.append(self.measure(name, user, options["repeat"]))
+        finally:
+            user.delete()
+
+        report = {
+            "database": connection.vendor,
+            "cache": settings.CACHES.get(settings.SESSION_CACHE_ALIAS, {}).get("BACKEND"),
+            "repeat": options["repeat"],
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output, encoding="utf-8")
+        else:
+            self.stdout.write(output)
+
+    def measure(self, name, user, repeat):
+        """Only the session and authentication middleware, around a view that reads request.user"""
+        client = Client()
+        client.force_login(user, backend=settings.AUTHENTICATION_BACKENDS[0])
+        factory = RequestFactory()
+        factory.cookies = client.cookies
+
+        handler = SessionMiddleware(AuthenticationMiddleware(lambda request: HttpResponse(str(request.user.pk))))
+        # The first request fills the caches
+        handler(factory.get("/"))
+
+        timings = []
+        with CaptureQueriesContext(connection) as queries:
+            for _ in range(max(1, repeat)):
+                started = perf_counter()
+                response = handler(factory.get("/"))
+                timings.append((perf_counter() - started) * 1000)
+        client.logout()
+
+        timings.sort()
+        result = {
+            "profile": name,
+            "authenticated": response.content == str(user.pk).encode(),
+            "queries_per_request": round(len(queries) / len(timings), 2),
+            "median_ms": round(statistics.median(timings), 3),
+            "p95_ms": round(timings[min(len(timings) - 1, int(0.95 * len(timings)))], 3),
+        }
+        self.stderr.write(
+            f"{name:<28} {result['median_ms']:>8.3f} мс  p95 {result['p95_ms']:>8.3f} мс  "
+            f"{result['queries_per_request']} запитів"
+        )
+        return result
@@ -0,0 +1,184 @@
+import json
+import random
+import sqlite3
+import tempfile
+import threading
+from datetime import date, timedelta
+from pathlib import Path
+from time import perf_counter
+
+from django.core.management.base import BaseCommand
+
+from finances.services.sqlite_tuning import SQLiteTuning
+
+
+class Command(BaseCommand):
+    help = "Порівнює пропускну здатність SQLite зі стандартними та налаштованими PRAGMA під змішаним навантаженням"
+
+    SCHEMA = """
+        CREATE TABLE tx (
+            id INTEGER PRIMARY KEY,
+            table_id INTEGER NOT NULL,
+            amount DECIMAL NOT NULL,
+            currency VARCHAR(3) NOT NULL,
+            date DATE NOT NULL,
+            description VARCHAR(255) NOT NULL
+        );
+        CREATE INDEX tx_table_date ON tx (table_id, date);
+    """
+    # Dashboard totals and a transaction list page
+    READS = [
+        "SELECT currency, SUM(amount) FROM tx WHERE table_id = ? GROUP BY currency",
+        "SELECT * FROM tx WHERE table_id = ? ORDER BY date DESC, id DESC LIMIT 20 OFFSET 40",
+    ]
+    WRITE = "INSERT INTO tx (table_id, amount, currency, date, description) VALUES (?, ?, ?, ?, ?)"
+    TABLES = 20
+
+    def add_arguments(self, parser):
+        parser.add_argument("--rows", type=int, default=200_000, help="Початкова кількість рядків")
+        parser.add_argument("--readers", type=int, default=4)
+        parser.add_argument("--writers", type=int, default=2)
+        parser.add_argument("--duration", type=float, default=10, help="Секунд на профіль")
+        parser.add_argument("--output", help="Файл для JSON-результату (за замовчуванням stdout)")
+
+    def handle(self, *args, **options):
+        profiles = {
+            # What Django gets out of the box: rollback journal, 5 s lock timeout
+            "default": {"pragmas": {}, "timeout": 5},
+            "tuned": {"pragmas": SQLiteTuning.get_pragmas(), "timeout": 20},
+        }
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, profile in profiles.items():
+                path = Path(directory) / f"{name}.sqlite3"
+                self.seed(path, options["rows"])
+                results[name] = self.run(path, profile, options)
+                self.stderr.write(
+                    f"{name:<8} читань/с {results[name]['reads_per_second']:>9.1f}  "
+                    f"записів/с {results[name]['writes_per_second']:>8.1f}  "
+                    f"p95 читання {results[name]['read_p95_ms']:>7.2f} мс  "
+                    f"p95 запису {results[name]['write_p95_ms']:>7.2f} мс  "
+                    f"помилок {results[name]['errors']}"
+                )
+
+        report = {
+            "sqlite": sqlite3.sqlite_version,
+            "rows": options["rows"],
+            "readers": options["readers"],
+            "writers": options["writers"],
+            "duration": options["duration"],
+            "results": results,
+        }
+        output = json.dumps(report, indent=2)
+        if options["output"]:
+            Path(options["output"]).write_text(output, encoding="utf-8")
+        else:
+            self.stdout.write(output)
+
+    def seed(self, path, rows):
+        rng = random.Random(42)
+        today = date.today()
+        db = sqlite3.connect(path)
+        db.executescript(self.SCHEMA)
+        db.executemany(
+            self.WRITE,
+            (
+                (
+                    rng.randrange(self.TABLES),
+                    f"{rng.uniform(1, 5000):.2f}",
+                    rng.choice(["UAH", "USD", "EUR"]),
+                    (today - timedelta(days=rng.randrange(730))).isoformat(),
+                    "seed",
+                )
+                for _ in range(rows)
+            ),
+        )
+        db.commit()
+        db.close()
+
+    def connect(self, path, profile):
+        db = sqlite3.connect(path, timeout=profile["timeout"], isolation_level=None)
+        SQLiteTuning.apply_pragmas(db.cursor(), profile["pragmas"])
+        return db
+
+    def run(self, path, profile, options):
+        # The first connection switches the journal mode (persistent in the file) before workers start
+        self.connect(path, profile).close()
+
+        stop = threading.Event()
+        read_timings, write_timings, errors = [], [], []
+        lock = threading.Lock()
+
+        def reader(seed):
+            rng = random.Random(seed)
+            db = self.connect(path, profile)
+            timings = []
+            while not stop.is_set():
+                started = perf_counter()
+                try:
+                    db.execute(rng.choice(self.READS), (rng.randrange(self.TABLES),)).fetchall()
+                    timings.append(perf_counter() - started)
+                except sqlite3.OperationalError as e:
+                    with lock:
+                        errors.append(str(e))
+            db.close()
+            with lock:
+                read_timings.extend(timings)
+
+        def writer(seed):
+            rng = random.Random(seed)
+            db = self.connect(path, profile)
+            timings = []
+            while not stop.is_set():
+                started = perf_counter()
+                try:
+                    db.execute("BEGIN IMMEDIATE")
+                    db.execute(
+                        self.WRITE,
+                        (
+                            rng.randrange(self.TABLES),
+                            f"{rng.uniform(1, 5000):.2f}",
+                            "UAH",
+                            date.today().isoformat(),
+                            "bench",
+                        ),
+                    )
+                    db.execute("COMMIT")
+                    timings.append(perf_counter() - started)
+                except sqlite3.OperationalError as e:
+                    if db.in_transaction:
+                        db.execute("ROLLBACK")
+                    with lock:
+                        errors.append(str(e))
+            db.close()
+            with lock:
+                write_timings.extend(timings)
+
+        threads = [threading.Thread(target=reader, args=(n,)) for n in range(options["readers"])]
+        threads += [threading.Thread(target=writer, args=(100 + n,)) for n in range(options["writers"])]
+        for thread in threads:
+            thread.start()
+        stop.wait(options["duration"])
+        stop.set()
+        for thread in threads:
+            thread.join()
+
+        return {
+            "pragmas": profile["pragmas"],
+            "reads_per_second": round(len(read_timings) / options["duration"], 1),
+            "writes_per_second": round(len(write_timings) / options["duration"], 1),
+            "read_p50_ms": self.percentile(read_timings, 0.5),
+            "read_p95_ms": self.percentile(read_timings, 0.95),
+            "write_p50_ms": self.percentile(write_timings, 0.5),
+            "write_p95_ms": self.percentile(write_timings, 0.95),
+            "errors": len(errors),
+            "error_samples": sorted(set(errors))[:5],
+        }
+
+    @staticmethod
+    def percentile(timings, q):
+        if not timings:
+            return 0.0
+        ordered = sorted(timings)
+        return round(ordered[min(len(ordered) - 1, int(q * len(ordered)))] * 1000, 3)
@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from finances.models import Tombstone
+
+
+class Command(BaseCommand):
+    help = "Видаляє записи про видалені об'єкти, старші за SYNC_TOMBSTONE_DAYS; для запуску з cron"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--days", type=int, help="Зберігати записи за цю кількість днів")
+
+    def handle(self, *args, **options):
+        deleted = Tombstone.prune(options["days"])
+        self.stdout.write(self.style.SUCCESS(f"Видалено записів: {deleted}"))
@@ -0,0 +1,74 @@
+import multiprocessing
+import signal
+import threading
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connections
+
+from finances.services.jobs import JobQueue, JobWorker
+
+
+def run_worker_process(index, stop_event, poll_interval, burst):
+    # Stopping is up to the parent, through stop_event: Ctrl+C and a service manager's SIGTERM reach the whole
+    # process group and must not interrupt a job (nor can the event be set safely from a handler here)
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    signal.signal(signal.SIGTERM, signal.SIG_IGN)
+    JobWorker(JobWorker.get_name(index), stop_event, poll_interval, burst).run()
+
+
+class Command(BaseCommand):
+    help = (
+        "Запускає обробники фонових завдань (імпорт виписок, архівація); "
+        "SIGTERM або Ctrl+C зупиняє їх після поточних завдань"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--workers", type=int, default=settings.JOB_WORKERS, help="Кількість обробників")
+        parser.add_argument(
+            "--processes",
+            action="store_true",
+            help="Обробники в окремих процесах замість потоків (для завдань, що навантажують процесор)",
+        )
+        parser.add_argument("--poll-interval", type=float, default=1.0, help="Секунд між перевірками черги")
+        parser.add_argument("--burst", action="store_true", help="Завершити роботу, коли черга порожня")
+        parser.add_argument("--prune", action="store_true", help="Лише видалити старі завершені завдання")
+
+    def handle(self, *args, **options):
+        if options["prune"]:
+            self.stdout.write(self.style.SUCCESS(f"Видалено завдань: {JobQueue.prune()}"))
+            return
+
+        workers = max(1, options["workers"])
+        worker_args = (options["poll_interval"], options["burst"])
+        if options["processes"]:
+            # fork: the children inherit the loaded project; connections must not be shared with them
+            context = multiprocessing.get_context("fork")
+            stop_event = context.Event()
+            connections.close_all()
+            pool = [
+                context.Process(target=run_worker_process, args=(index, stop_event, *worker_args), daemon=True)
+                for index in range(workers)
+            ]
+        else:
+            stop_event = threading.Event()
+            pool = [
+                threading.Thread(
+                    target=JobWorker(JobWorker.get_name(index), stop_event, *worker_args).run,
+                    name=f"job-worker-{index}",
+                )
+                for index in range(workers)
+            ]
+
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            signal.signal(signum, lambda signum, frame: stop_event.set())
+
+        mode = "процесах" if options["processes"] else "потоках"
+        self.stdout.write(f"Обробників завдань: {workers} в окремих {mode}")
+        for worker in pool:
+            worker.start()
+        # Timed joins, so the signal handlers get to run in the main thread
+        while any(worker.is_alive() for worker in pool):
+            for worker in pool:
+                worker.join(timeout=0.5)
+        self.stdout.write(self.style.SUCCESS("Обробники зупинено"))
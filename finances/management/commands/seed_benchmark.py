@@ -0,0 +1,149 @@
+import math
+import random
+from datetime import timedelta
+from decimal import Decimal
+from time import perf_counter
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction as db_transaction
+from django.utils import timezone
+
+from finances.models import Category, Table, Transaction
+
+User = get_user_model()
+
+
+class Command(BaseCommand):
+    help = "Генерує синтетичних користувачів, таблиці та транзакції для бенчмарків"
+
+    # Currency share and log-normal amount parameters (median, spread)
+    CURRENCIES = {
+        "UAH": (0.82, 250, 1.1),
+        "USD": (0.11, 25, 1.0),
+        "EUR": (0.07, 25, 1.0),
+    }
+    TABLE_TITLES = ["Особисті", "Сімейні", "Робота", "Подорожі", "Ремонт"]
+    DESCRIPTIONS = ["", "", "Картка", "Готівка", "Щомісячний платіж", "Онлайн", "Подарунок", "Знижка"]
+    UNCATEGORIZED_SHARE = 0.05
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=5, help="Кількість користувачів")
+        parser.add_argument("--tables", type=int, default=3, help="Таблиць на користувача")
+        parser.add_argument("--transactions", type=int, default=1_000_000, help="Транзакцій загалом")
+        parser.add_argument("--months", type=int, default=24, help="Глибина історії в місяцях")
+        parser.add_argument("--batch-size", type=int, default=5000)
+        parser.add_argument("--prefix", default="bench", help="Префікс email: <prefix>-<n>@example.com")
+        parser.add_argument("--password", default="bench")
+        parser.add_argument("--seed", type=int, default=42, help="Зерно генератора для відтворюваних даних")
+        parser.add_argument("--clear", action="store_true", help="Видалити попередніх користувачів з цим префіксом")
+
+    def handle(self, *args, **options):
+        self.random = random.Random(options["seed"])
+        self.verbosity = options["verbosity"]
+        prefix = options["prefix"]
+
+        if options["clear"]:
+            deleted, _ = User.objects.filter(email__startswith=f"{prefix}-", email__endswith="@example.com").delete()
+            self.stdout.write(f"Видалено записів: {deleted}")
+
+        categories = self.get_category_weights()
+        if not categories:
+            raise CommandError("Немає категорій, спочатку застосуйте міграції")
+        if options["users"] < 1 or options["tables"] < 1:
+            raise CommandError("Потрібен хоча б один користувач і одна таблиця")
+
+        started = perf_counter()
+        with db_transaction.atomic():
+            users = self.create_users(prefix, options["users"], options["password"])
+            tables = self.create_tables(users, options["tables"])
+        self.stdout.write(f"Користувачів: {len(users)}, таблиць: {len(tables)}")
+
+        created = self.create_transactions(
+            tables, options["tables"], categories, options["transactions"], options["months"], options["batch_size"]
+        )
+
+        elapsed = perf_counter() - started
+        self.stdout.write(
+            self.style.SUCCESS(f"Створено {created} транзакцій за {elapsed:.1f} с ({created / elapsed:.0f} рядків/с)")
+        )
+
+    def get_category_weights(self):
+        # Leaf categories follow a Zipf-like popularity: a few are used all the time, most rarely
+        leaves = list(Category.objects.filter(children__isnull=True).order_by("path").values_list("id", flat=True))
+        self.random.shuffle(leaves)
+        return {category_id: 1 / (rank + 1) for rank, category_id in enumerate(leaves)}
+
+    def create_users(self, prefix, count, password):
+        emails = [f"{prefix}-{n}@example.com" for n in range(1, count + 1)]
+        existing = set(User.objects.filter(email__in=emails).values_list("email", flat=True))
+
+        # Hash the password once: hashing per user would dominate the run
+        password_hash = User(email=emails[0])
+        password_hash.set_password(password)
+        User.objects.bulk_create(
+            [User(email=email, password=password_hash.password) for email in emails if email not in existing]
+        )
+        return list(User.objects.filter(email__in=emails).order_by("pk"))
+
+    def create_tables(self, users, per_user):
+        tables = [
+            Table(
+                user=user,
+                title=self.TABLE_TITLES[n % len(self.TABLE_TITLES)],
+                color=f"#{self.random.randrange(0x1000000):06X}",
+            )
+            for user in users
+            for n in range(per_user)
+        ]
+        return Table.objects.bulk_create(tables)
+
+    def create_transactions(self, tables, tables_per_user, categories, total, months, batch_size):
+        category_ids = list(categories)
+        category_weights = list(categories.values())
+        currencies = list(self.CURRENCIES)
+        currency_weights = [share for share, _, _ in self.CURRENCIES.values()]
+
+        # The first table of every user gets most of the traffic
+        table_weights = [1 / (index % tables_per_user + 1) for index in range(len(tables))]
+
+        today = timezone.localdate()
+        days = max(1, months * 30)
+        # Weekends are busier, and recent months denser than old ones (accounts grow over time)
+        day_weights = [
+            (1.4 if (today - timedelta(days=offset)).weekday() >= 5 else 1.0) * (1 + offset / days) ** -1
+            for offset in range(days)
+        ]
+        offsets = range(days)
+
+        created = 0
+        while created < total:
+            size = min(batch_size, total - created)
+            batch_tables = self.random.choices(tables, table_weights, k=size)
+            batch_currencies = self.random.choices(currencies, currency_weights, k=size)
+            batch_offsets = self.random.choices(offsets, day_weights, k=size)
+            batch_categories = self.random.choices(category_ids, category_weights, k=size)
+
+            batch = []
+            for table, currency, offset, category_id in zip(
+                batch_tables, batch_currencies, batch_offsets, batch_categories
+            ):
+                _, median, sigma = self.CURRENCIES[currency]
+                amount = min(median * math.exp(self.random.gauss(0, sigma)), 99_999_999)
+                batch.append(
+                    Transaction(
+                        table=table,
+                        amount=Decimal(f"{max(amount, 0.01):.2f}"),
+                        currency=currency,
+                        date=today - timedelta(days=offset),
+                        category_id=None if self.random.random() < self.UNCATEGORIZED_SHARE else category_id,
+                        description=self.random.choice(self.DESCRIPTIONS),
+                    )
+                )
+
+            Transaction.objects.bulk_create(batch)
+            created += size
+            if self.verbosity >= 2 or created == total or created % (batch_size * 20) == 0:
+                self.stdout.write(f"  {created}/{total}")
+
+        return created
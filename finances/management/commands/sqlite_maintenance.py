@@ -0,0 +1,28 @@
+from time import perf_counter
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+
+class Command(BaseCommand):
+    help = "Оновлює статистику планувальника SQLite (ANALYZE, PRAGMA optimize) і обрізає WAL; для запуску з cron"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--vacuum", action="store_true", help="Також виконати VACUUM (блокує базу на весь час)")
+
+    def handle(self, *args, **options):
+        if connection.vendor != "sqlite":
+            raise CommandError("Команда призначена лише для SQLite")
+
+        steps = ["ANALYZE", "PRAGMA optimize", "PRAGMA wal_checkpoint(TRUNCATE)"]
+        if options["vacuum"]:
+            steps.append("VACUUM")
+
+        with connection.cursor() as cursor:
+            for statement in steps:
+                started = perf_counter()
+                cursor.execute(statement)
+                self.stdout.write(f"{statement}: {perf_counter() - started:.2f} с")
+
+            cursor.execute("PRAGMA journal_mode")
+            self.stdout.write(self.style.SUCCESS(f"Готово, journal_mode={cursor.fetchone()[0]}"))
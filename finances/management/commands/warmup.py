@@ -0,0 +1,92 @@
+import json
+import subprocess
+import sys
+
+from django.core.management.base import BaseCommand
+
+from finances.services.warmup import Warmup
+
+# Runs in a fresh interpreter, so nothing is imported or cached yet
+STARTUP_PROBE = """
+import json, os, sys
+from time import perf_counter
+started = perf_counter()
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+import django
+django.setup()
+setup_ms = (perf_counter() - started) * 1000
+requests_imported = "requests" in sys.modules
+
+from django.test import Client, override_settings
+warmup = {}
+if sys.argv[1] == "warm":
+    from finances.services.warmup import Warmup
+    warmup = Warmup.run()
+ready_ms = (perf_counter() - started) * 1000
+
+with override_settings(ALLOWED_HOSTS=["*"]):
+    client = Client()
+    first = perf_counter()
+    client.get(sys.argv[2])
+    first_ms = (perf_counter() - first) * 1000
+    second = perf_counter()
+    client.get(sys.argv[2])
+    second_ms = (perf_counter() - second) * 1000
+
+print(json.dumps({
+    "setup_ms": round(setup_ms, 1),
+    "warmup_ms": warmup,
+    "ready_ms": round(ready_ms, 1),
+    "first_response_ms": round(first_ms, 1),
+    "second_response_ms": round(second_ms, 1),
+    "time_to_first_response_ms": round(ready_ms + first_ms, 1),
+    "requests_imported_at_setup": requests_imported,
+}))
+"""
+
+
+class Command(BaseCommand):
+    help = "Прогріває кеші (URL, шаблони, дерево категорій, курси валют) і звітує про час старту"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--measure-startup",
+            action="store_true",
+            help="Виміряти час імпорту та першої відповіді в новому процесі, з прогрівом і без",
+        )
+        parser.add_argument("--url", default="/", help="Сторінка для вимірювання першої відповіді")
+
+    def handle(self, *args, **options):
+        if not options["measure_startup"]:
+            report = Warmup.run()
+            for step, ms in report.items():
+                self.stdout.write(f"{step:<16} {ms:>9.1f} мс")
+            self.stdout.write(self.style.SUCCESS(f"Прогрів завершено за {sum(report.values()):.1f} мс"))
+            return
+
+        results = {mode: self.probe(mode, options["url"]) for mode in ("cold", "warm")}
+        self.stdout.write(json.dumps(results, indent=2))
+
+    def probe(self, mode, url):
+        # -X importtime goes to stderr; the slowest cumulative imports are reported alongside
+        process = subprocess.run(
+            [sys.executable, "-X", "importtime", "-c", STARTUP_PROBE, mode, url],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+        result = json.loads(process.stdout.strip().splitlines()[-1])
+        result["slowest_imports"] = self.parse_importtime(process.stderr)
+        return result
+
+    @staticmethod
+    def parse_importtime(stderr, limit=10):
+        imports = []
+        for line in stderr.splitlines():
+            if not line.startswith("import time:") or "cumulative" in line:
+                continue
+            _, cumulative, name = line[len("import time:") :].split("|")
+            # Top-level packages only: nested entries are already part of their parent's time
+            if not name.startswith("  "):
+                imports.append({"module": name.strip(), "cumulative_ms": round(int(cumulative) / 1000, 1)})
+        return sorted(imports, key=lambda item: item["cumulative_ms"], reverse=True)[:limit]
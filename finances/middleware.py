@@ -0,0 +1,226 @@
+import mimetypes
+import os
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.http import FileResponse, HttpResponseNotModified
+from django.urls import reverse
+from django.utils.functional import cached_property
+from django.utils.http import http_date
+from django.views.static import was_modified_since
+
+from .services.metrics import Metrics
+from .services.profiling import RequestProfiler
+
+
+class RequestMetricsMiddleware:
+    """
+    Records query count, DB time, cache and rate-provider usage and latency for every view.
+
+    Place it first in MIDDLEWARE, so the latency covers the rest of the middleware stack too.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        record, token = Metrics.start_request()
+        try:
+            response = self.get_response(request)
+        finally:
+            Metrics.end_request(token)
+        Metrics.observe(self.get_view_name(request), response.status_code, record)
+        return response
+
+    async def __acall__(self, request):
+        record, token = Metrics.start_request()
+        try:
+            response = await self.get_response(request)
+        finally:
+            Metrics.end_request(token)
+        Metrics.observe(self.get_view_name(request), response.status_code, record)
+        return response
+
+    @staticmethod
+    def get_view_name(request):
+        # Labels are view paths, never raw URLs, so the number of series stays bounded
+        match = getattr(request, "resolver_match", None)
+        if match is None:
+            return "unresolved"
+        view = getattr(match.func, "view_class", match.func)
+        return f"{view.__module__}.{view.__qualname__}"
+
+
+class ProfilingMiddleware:
+    """
+    Profiles a single request for staff users who send the X-Profile header or the ?_profile flag.
+
+    The response gets an X-Profile-Url header pointing at the summary page. cProfile only sees the thread
+    that runs the middleware, so for async views the SQL list is the more complete part of the picture.
+    While another request is being profiled the response is served unprofiled with X-Profile-Skipped.
+    Needs AuthenticationMiddleware before it.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+
+        if not RequestProfiler.is_requested(request) or not request.user.is_staff:
+            return self.get_response(request)
+
+        profiler = RequestProfiler(request)
+        if not profiler.start():
+            return self.busy(self.get_response(request))
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.stop()
+        return self.finish(request, response, profiler)
+
+    async def __acall__(self, request):
+        if not RequestProfiler.is_requested(request):
+            return await self.get_response(request)
+        request.user = await request.auser()
+        if not request.user.is_staff:
+            return await self.get_response(request)
+
+        profiler = RequestProfiler(request)
+        if not profiler.start():
+            return self.busy(await self.get_response(request))
+        try:
+            response = await self.get_response(request)
+        finally:
+            profiler.stop()
+        return self.finish(request, response, profiler)
+
+    @staticmethod
+    def busy(response):
+        response["X-Profile-Skipped"] = "busy"
+        return response
+
+    @staticmethod
+    def finish(request, response, profiler):
+        profile_id = profiler.save(response, RequestMetricsMiddleware.get_view_name(request))
+        response["X-Profile-Url"] = request.build_absolute_uri(reverse("finances:profile_detail", args=[profile_id]))
+        return response
+
+
+class StaticFilesMiddleware:
+    """
+    Serves collected static files from STATIC_ROOT when SERVE_STATIC is on, for deployments without a web
+    server in front of the app.
+
+    The smallest precompressed copy the client accepts (.br, then .gz) is sent. Content-hashed names from
+    the manifest never change content, so they are cached by browsers for a year without revalidation;
+    unhashed names get a short max-age. Requests that match no collected file continue down the stack.
+    """
+
+    ENCODINGS = [("br", ".br"), ("gzip", ".gz")]
+    IMMUTABLE_CACHE_CONTROL = "public, max-age=31536000, immutable"
+    DEFAULT_CACHE_CONTROL = "public, max-age=60"
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.enabled = getattr(settings, "SERVE_STATIC", False) and bool(settings.STATIC_ROOT)
+        self.prefix = settings.STATIC_URL
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        response = self.serve(request)
+        return response if response is not None else self.get_response(request)
+
+    async def __acall__(self, request):
+        response = self.serve(request)
+        return response if response is not None else await self.get_response(request)
+
+    @cached_property
+    def files(self):
+        """Every collected file by name. They don't change while the process runs, so STATIC_ROOT is read once"""
+        files = {}
+        for directory, _, names in os.walk(settings.STATIC_ROOT):
+            present = set(names)
+            for file_name in names:
+                path = os.path.join(directory, file_name)
+                content_type, _ = mimetypes.guess_type(path)
+                files[os.path.relpath(path, settings.STATIC_ROOT).replace(os.sep, "/")] = {
+                    "path": path,
+                    "mtime": os.stat(path).st_mtime,
+                    "content_type": content_type or "application/octet-stream",
+                    "variants": {
+                        encoding: path + suffix for encoding, suffix in self.ENCODINGS if file_name + suffix in present
+                    },
+                }
+        return files
+
+    @cached_property
+    def hashed_names(self):
+        return set(getattr(staticfiles_storage, "hashed_files", {}).values())
+
+    def serve(self, request):
+        if not self.enabled or request.method not in ("GET", "HEAD") or not request.path.startswith(self.prefix):
+            return None
+
+        name = request.path[len(self.prefix) :]
+        # Only names from STATIC_ROOT can match, so paths sent by clients are never looked up on disk
+        static_file = self.files.get(name)
+        if static_file is None:
+            return None
+
+        headers = {
+            "Cache-Control": (
+                self.IMMUTABLE_CACHE_CONTROL if name in self.hashed_names else self.DEFAULT_CACHE_CONTROL
+            ),
+            "Last-Modified": http_date(static_file["mtime"]),
+            "Vary": "Accept-Encoding",
+        }
+        if not was_modified_since(request.META.get("HTTP_IF_MODIFIED_SINCE"), static_file["mtime"]):
+            return HttpResponseNotModified(headers=headers)
+
+        encoding, path = self.negotiate(request, static_file)
+        if encoding:
+            headers["Content-Encoding"] = encoding
+        response = FileResponse(open(path, "rb"), content_type=static_file["content_type"], headers=headers)
+        # FileResponse names the file it opened, which would be the .br/.gz copy
+        del response["Content-Disposition"]
+        return response
+
+    def negotiate(self, request, static_file):
+        accepted = set()
+        for part in request.META.get("HTTP_ACCEPT_ENCODING", "").split(","):
+            coding, _, params = part.partition(";")
+            params = params.replace(" ", "")
+            try:
+                quality = float(params[2:]) if params.startswith("q=") else 1.0
+            except ValueError:
+                quality = 1.0
+            # "gzip;q=0" is an explicit refusal
+            if quality > 0:
+                accepted.add(coding.strip().lower())
+
+        for encoding, _ in self.ENCODINGS:
+            if encoding in static_file["variants"] and encoding in accepted:
+                return encoding, static_file["variants"][encoding]
+        return None, static_file["path"]
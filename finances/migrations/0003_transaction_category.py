@@ -0,0 +1,42 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:15
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0002_add_default_categories"),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name="category",
+            name="description",
+        ),
+        migrations.RemoveField(
+            model_name="category",
+            name="is_default",
+        ),
+        migrations.RemoveField(
+            model_name="transaction",
+            name="categories",
+        ),
+        migrations.AddField(
+            model_name="transaction",
+            name="category",
+            field=models.ForeignKey(
+                blank=True,
+                null=True,
+                on_delete=django.db.models.deletion.SET_NULL,
+                related_name="transactions",
+                to="finances.category",
+                verbose_name="Категорія",
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="category",
+            constraint=models.UniqueConstraint(fields=("name", "parent"), name="unique_category_name_parent"),
+        ),
+    ]
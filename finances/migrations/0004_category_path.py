@@ -0,0 +1,45 @@
+# Generated by Django 6.0.1 on 2026-10-19 10:15
+
+from django.db import migrations, models
+
+
+def build_category_paths(apps, schema_editor):
+    Category = apps.get_model("finances", "Category")
+
+    categories = {category.pk: category for category in Category.objects.all()}
+
+    def build(category):
+        if category.path:
+            return category.path, category.depth
+        if category.parent_id is None:
+            category.path, category.depth = f"{category.pk}/", 0
+        else:
+            parent_path, parent_depth = build(categories[category.parent_id])
+            category.path, category.depth = f"{parent_path}{category.pk}/", parent_depth + 1
+        return category.path, category.depth
+
+    for category in categories.values():
+        build(category)
+
+    Category.objects.bulk_update(categories.values(), ["path", "depth"], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0003_transaction_category"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="category",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False, verbose_name="Рівень вкладеності"),
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="path",
+            field=models.CharField(db_index=True, default="", editable=False, max_length=255, verbose_name="Шлях"),
+        ),
+        migrations.RunPython(build_category_paths, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 6.0.1 on 2026-10-19 11:02
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0004_category_path"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="import_hash",
+            field=models.CharField(blank=True, editable=False, max_length=64, null=True, verbose_name="Хеш імпорту"),
+        ),
+        migrations.AddConstraint(
+            model_name="transaction",
+            constraint=models.UniqueConstraint(fields=("table", "import_hash"), name="unique_transaction_import_hash"),
+        ),
+    ]
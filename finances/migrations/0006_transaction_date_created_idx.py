@@ -0,0 +1,17 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:10
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0005_transaction_import_hash"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["-date", "-created_at"], name="transaction_date_created_idx"),
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 6.0.1 on 2026-10-19 12:40
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def backfill_user(apps, schema_editor):
+    Table = apps.get_model("finances", "Table")
+    Transaction = apps.get_model("finances", "Transaction")
+    # A single UPDATE with a correlated subquery, however many rows there are
+    Transaction.objects.update(user_id=Subquery(Table.objects.filter(pk=OuterRef("table_id")).values("user_id")[:1]))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0006_transaction_date_created_idx"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="transaction",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Користувач",
+            ),
+        ),
+        migrations.RunPython(backfill_user, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name="transaction",
+            name="user",
+            field=models.ForeignKey(
+                db_index=False,
+                editable=False,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="transactions",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Користувач",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["user", "-date", "-created_at"], name="transaction_user_date_idx"),
+        ),
+    ]
@@ -0,0 +1,175 @@
+# Generated by Django 6.0.1 on 2026-10-19 13:10
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0007_transaction_user"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ArchivedTransaction",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "amount",
+                    models.DecimalField(decimal_places=2, max_digits=10, verbose_name="Сума"),
+                ),
+                (
+                    "currency",
+                    models.CharField(
+                        choices=[
+                            ("UAH", "Гривня (₴)"),
+                            ("USD", "Долар США ($)"),
+                            ("EUR", "Євро (€)"),
+                        ],
+                        max_length=3,
+                        verbose_name="Валюта",
+                    ),
+                ),
+                ("date", models.DateField(verbose_name="Дата транзакції")),
+                (
+                    "description",
+                    models.TextField(blank=True, verbose_name="Опис транзакції"),
+                ),
+                (
+                    "import_hash",
+                    models.CharField(blank=True, max_length=64, null=True, verbose_name="Хеш імпорту"),
+                ),
+                ("created_at", models.DateTimeField(verbose_name="Дата створення")),
+                ("updated_at", models.DateTimeField(verbose_name="Дата оновлення")),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="archived_transactions",
+                        to="finances.category",
+                        verbose_name="Категорія",
+                    ),
+                ),
+                (
+                    "table",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_transactions",
+                        to="finances.table",
+                        verbose_name="Таблиця",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="archived_transactions",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Користувач",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Архівна транзакція",
+                "verbose_name_plural": "Архівні транзакції",
+                "ordering": ["-date", "-created_at"],
+                "indexes": [
+                    models.Index(
+                        fields=["user", "-date", "-created_at"],
+                        name="archived_txn_user_date_idx",
+                    ),
+                    models.Index(fields=["table", "import_hash"], name="archived_txn_import_idx"),
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="TransactionRollup",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "currency",
+                    models.CharField(
+                        choices=[
+                            ("UAH", "Гривня (₴)"),
+                            ("USD", "Долар США ($)"),
+                            ("EUR", "Євро (€)"),
+                        ],
+                        max_length=3,
+                        verbose_name="Валюта",
+                    ),
+                ),
+                ("month", models.DateField(verbose_name="Місяць")),
+                (
+                    "total",
+                    models.DecimalField(decimal_places=2, max_digits=14, verbose_name="Сума"),
+                ),
+                (
+                    "transaction_count",
+                    models.PositiveIntegerField(verbose_name="Кількість транзакцій"),
+                ),
+                (
+                    "max_amount",
+                    models.DecimalField(decimal_places=2, max_digits=10, verbose_name="Найбільша сума"),
+                ),
+                (
+                    "category",
+                    models.ForeignKey(
+                        blank=True,
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="transaction_rollups",
+                        to="finances.category",
+                        verbose_name="Категорія",
+                    ),
+                ),
+                (
+                    "table",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transaction_rollups",
+                        to="finances.table",
+                        verbose_name="Таблиця",
+                    ),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        db_index=False,
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="transaction_rollups",
+                        to=settings.AUTH_USER_MODEL,
+                        verbose_name="Користувач",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Підсумок за місяць",
+                "verbose_name_plural": "Підсумки за місяць",
+                "ordering": ["-month"],
+                "indexes": [models.Index(fields=["user", "month"], name="txn_rollup_user_month_idx")],
+            },
+        ),
+    ]
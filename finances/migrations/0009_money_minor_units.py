@@ -0,0 +1,74 @@
+# Generated by Django 6.0.1 on 2026-10-19 15:20
+
+from django.db import migrations, models
+from django.db.models import F, Value
+from django.db.models.functions import Cast, Round
+
+import finances.fields
+
+# model, field, max_digits, verbose_name
+MONEY_FIELDS = [
+    ("transaction", "amount", 10, "Сума"),
+    ("archivedtransaction", "amount", 10, "Сума"),
+    ("transactionrollup", "total", 14, "Сума"),
+    ("transactionrollup", "max_amount", 10, "Найбільша сума"),
+]
+MINOR_UNITS = 100
+
+
+def to_minor_units(apps, schema_editor):
+    for model_name, field_name, _, _ in MONEY_FIELDS:
+        model = apps.get_model("finances", model_name)
+        # A single UPDATE per column; ROUND absorbs the binary error of amounts SQLite keeps as REAL
+        model.objects.update(
+            **{f"{field_name}_minor": Cast(Round(F(field_name) * Value(MINOR_UNITS)), models.BigIntegerField())}
+        )
+
+
+def to_decimal(apps, schema_editor):
+    for model_name, field_name, _, _ in MONEY_FIELDS:
+        model = apps.get_model("finances", model_name)
+        # Through a float, so the division is not an integer one
+        model.objects.update(
+            **{field_name: Cast(f"{field_name}_minor", models.FloatField()) / Value(float(MINOR_UNITS))}
+        )
+
+
+def operations():
+    """Decimal column -> integer copy in minor units -> the copy replaces the column, for every money field"""
+    add, relax, replace = [], [], []
+    for model_name, field_name, max_digits, verbose_name in MONEY_FIELDS:
+        add.append(
+            migrations.AddField(
+                model_name=model_name, name=f"{field_name}_minor", field=models.BigIntegerField(null=True)
+            )
+        )
+        # Nullable, so that reversing can add the column back before the data is copied into it
+        relax.append(
+            migrations.AlterField(
+                model_name=model_name,
+                name=field_name,
+                field=models.DecimalField(
+                    decimal_places=2, max_digits=max_digits, null=True, verbose_name=verbose_name
+                ),
+            )
+        )
+        replace += [
+            migrations.RemoveField(model_name=model_name, name=field_name),
+            migrations.RenameField(model_name=model_name, old_name=f"{field_name}_minor", new_name=field_name),
+            migrations.AlterField(
+                model_name=model_name,
+                name=field_name,
+                field=finances.fields.MoneyField(max_digits=max_digits, verbose_name=verbose_name),
+            ),
+        ]
+    return [*add, *relax, migrations.RunPython(to_minor_units, to_decimal), *replace]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0008_archivedtransaction_transactionrollup"),
+    ]
+
+    operations = operations()
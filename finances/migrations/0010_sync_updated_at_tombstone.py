@@ -0,0 +1,92 @@
+# Generated by Django 6.0.1 on 2026-10-19 16:05
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("finances", "0009_money_minor_units"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Tombstone",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "kind",
+                    models.CharField(
+                        choices=[
+                            ("transaction", "Транзакція"),
+                            ("table", "Таблиця"),
+                            ("category", "Категорія"),
+                        ],
+                        max_length=20,
+                        verbose_name="Тип",
+                    ),
+                ),
+                ("object_id", models.BigIntegerField(verbose_name="Ідентифікатор")),
+                (
+                    "deleted_at",
+                    models.DateTimeField(default=django.utils.timezone.now, verbose_name="Дата видалення"),
+                ),
+            ],
+            options={
+                "verbose_name": "Видалений запис",
+                "verbose_name_plural": "Видалені записи",
+                "ordering": ["deleted_at"],
+            },
+        ),
+        migrations.AddField(
+            model_name="category",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, db_index=True, verbose_name="Дата оновлення"),
+        ),
+        migrations.AddField(
+            model_name="table",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="Дата оновлення"),
+        ),
+        migrations.AddIndex(
+            model_name="archivedtransaction",
+            index=models.Index(fields=["user", "updated_at"], name="archived_txn_user_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="table",
+            index=models.Index(fields=["user", "updated_at"], name="table_user_updated_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="transaction",
+            index=models.Index(fields=["user", "updated_at"], name="transaction_user_updated_idx"),
+        ),
+        migrations.AddField(
+            model_name="tombstone",
+            name="user",
+            field=models.ForeignKey(
+                blank=True,
+                db_index=False,
+                null=True,
+                on_delete=django.db.models.deletion.CASCADE,
+                related_name="tombstones",
+                to=settings.AUTH_USER_MODEL,
+                verbose_name="Користувач",
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="tombstone",
+            index=models.Index(fields=["user", "deleted_at"], name="tombstone_user_deleted_idx"),
+        ),
+    ]
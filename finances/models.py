@@ -1,7 +1,21 @@
+from datetime import timedelta
+
 from django.conf import settings
-from django.db import models
+from django.db import models, transaction
+from django.db.models import F, Value
+from django.db.models.functions import Concat, Substr
+from django.dispatch import Signal
 from django.utils import timezone
 
+from .fields import MoneyField
+
+
+class OwnedQuerySet(models.QuerySet):
+    """QuerySet of rows with a user foreign key"""
+
+    def owned_by(self, user):
+        return self.filter(user=user)
+
 
 class Table(models.Model):
     user = models.ForeignKey(
@@ -12,17 +26,50 @@ class Table(models.Model):
         max_length=7, default="#3B82F6", help_text="Колір у форматі HEX (#RRGGBB)", verbose_name="Колір"
     )
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата оновлення")
+
+    objects = OwnedQuerySet.as_manager()
 
     class Meta:
         verbose_name = "Таблиця"
         verbose_name_plural = "Таблиці"
         ordering = ["-created_at"]
+        # Delta sync reads the user's changes in updated_at order
+        indexes = [models.Index(fields=["user", "updated_at"], name="table_user_updated_idx")]
 
     def __str__(self):
         return f"{self.title} ({self.user.email})"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so save() can tell a change of owner without reading the row again
+        instance._loaded_user_id = instance.__dict__.get("user_id")
+        return instance
+
+    def save(self, *args, **kwargs):
+        previous_user_id = getattr(self, "_loaded_user_id", None)
+        if previous_user_id is None or previous_user_id == self.user_id:
+            super().save(*args, **kwargs)
+            self._loaded_user_id = self.user_id
+            return
+
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # The owner is denormalized on every transaction of the table, archived ones and rollups included;
+            # updated_at is bumped so the new owner's sync picks them up
+            now = timezone.now()
+            self.transactions.update(user_id=self.user_id, updated_at=now)
+            self.archived_transactions.update(user_id=self.user_id, updated_at=now)
+            self.transaction_rollups.update(user_id=self.user_id)
+            # For the previous owner the table is gone
+            Tombstone.record(Tombstone.TABLE, [(self.pk, previous_user_id)])
+        self._loaded_user_id = self.user_id
+
 
 class Category(models.Model):
+    PATH_SEPARATOR = "/"
+
     name = models.CharField(max_length=100, verbose_name="Назва категорії")
     parent = models.ForeignKey(
         "self",
@@ -32,7 +79,11 @@ class Category(models.Model):
         blank=True,
         verbose_name="Батьківська категорія",
     )
+    # Materialized path of ancestor ids, e.g. "3/17/42/" - the category itself is the last segment
+    path = models.CharField(max_length=255, db_index=True, editable=False, default="", verbose_name="Шлях")
+    depth = models.PositiveSmallIntegerField(editable=False, default=0, verbose_name="Рівень вкладеності")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    updated_at = models.DateTimeField(auto_now=True, db_index=True, verbose_name="Дата оновлення")
 
     class Meta:
         verbose_name = "Категорія"
@@ -45,23 +96,116 @@ class Category(models.Model):
             return f"{self.parent.name} → {self.name}"
         return self.name
 
+    def save(self, *args, **kwargs):
+        old_path = self.path
+        if not self.pk:
+            # The path contains our own id, so the row has to exist first
+            super().save(*args, **kwargs)
+            kwargs.pop("force_insert", None)
+            kwargs["update_fields"] = ["path", "depth"]
+        elif kwargs.get("update_fields") is not None:
+            kwargs["update_fields"] = {*kwargs["update_fields"], "path", "depth"}
+
+        self.path, self.depth = self._build_path()
+        super().save(*args, **kwargs)
+
+        if old_path and old_path != self.path:
+            self._move_descendants(old_path)
+
+    def _build_path(self):
+        if self.parent_id is None:
+            return f"{self.pk}{self.PATH_SEPARATOR}", 0
+        parent_path, parent_depth = Category.objects.filter(pk=self.parent_id).values_list("path", "depth").get()
+        if self.path and parent_path.startswith(self.path):
+            raise ValueError("Категорію не можна вкласти саму в себе")
+        return f"{parent_path}{self.pk}{self.PATH_SEPARATOR}", parent_depth + 1
+
+    def _move_descendants(self, old_path):
+        # Rewrite the path prefix of the whole subtree with a single UPDATE
+        depth_delta = self.depth - (old_path.count(self.PATH_SEPARATOR) - 1)
+        Category.objects.filter(path__startswith=old_path).exclude(pk=self.pk).update(
+            path=Concat(Value(self.path), Substr("path", len(old_path) + 1)),
+            depth=F("depth") + depth_delta,
+            updated_at=timezone.now(),
+        )
+
     @property
     def level(self):
-        if self.parent:
-            return self.parent.level + 1
-        return 0
+        return self.depth
 
     @property
     def is_root(self):
-        return self.parent is None
+        return self.parent_id is None
+
+    @property
+    def ancestor_ids(self):
+        return [int(pk) for pk in self.path.split(self.PATH_SEPARATOR)[:-2]]
+
+    def get_ancestors(self):
+        return Category.objects.filter(pk__in=self.ancestor_ids).order_by("depth")
+
+    def get_descendants(self, include_self=False):
+        descendants = Category.objects.filter(path__startswith=self.path)
+        if not include_self:
+            descendants = descendants.exclude(pk=self.pk)
+        return descendants
 
     def get_full_path(self):
-        path = []
-        current = self
-        while current:
-            path.insert(0, current.name)
-            current = current.parent
-        return " → ".join(path)
+        names = list(self.get_ancestors().values_list("name", flat=True))
+        names.append(self.name)
+        return " → ".join(names)
+
+
+# Sent when transactions are created, edited or deleted, by save() and delete() as well as by the bulk queryset
+# methods that skip post_save/post_delete. Arguments: action ("created", "updated" or "deleted"), added and
+# removed (Transaction.summary() of the rows as they count now and as they counted before) and stale (True when
+# the change in totals is unknown). Deleting a table or a user doesn't send it
+transactions_changed = Signal()
+
+
+class TransactionQuerySet(OwnedQuerySet):
+    def delete(self):
+        # Tombstones for sync clients. Not a post_delete receiver: that would make Django load every transaction
+        # of a deleted table; those deletions are covered by the table's tombstone
+        with transaction.atomic(using=self.db):
+            removed = list(self.values_list(*Transaction.SUMMARY_FIELDS))
+            Tombstone.record(Tombstone.TRANSACTION, [row[:2] for row in removed])
+            transactions_changed.send(sender=Transaction, action="deleted", removed=removed)
+            return super().delete()
+
+    delete.alters_data = True
+    delete.queryset_only = True
+
+    def bulk_create(self, objs, *args, **kwargs):
+        # bulk_create skips save(), so the owner is copied from the tables here
+        objs = list(objs)
+        Transaction.assign_users(objs)
+        created = super().bulk_create(objs, *args, **kwargs)
+        transactions_changed.send(
+            sender=Transaction,
+            action="created",
+            added=[obj.summary() for obj in created],
+            # Rows skipped as conflicts can't be told apart from inserted ones
+            stale=bool(kwargs.get("ignore_conflicts") or kwargs.get("update_conflicts")),
+        )
+        for obj in created:
+            obj._loaded_summary = obj.summary()
+        return created
+
+    def bulk_update(self, objs, fields, *args, **kwargs):
+        objs = list(objs)
+        updated = super().bulk_update(objs, fields, *args, **kwargs)
+        removed = [obj._loaded_summary for obj in objs if getattr(obj, "_loaded_summary", None)]
+        transactions_changed.send(
+            sender=Transaction,
+            action="updated",
+            added=[obj.summary() for obj in objs],
+            removed=removed,
+            stale=len(removed) < len(objs),
+        )
+        for obj in objs:
+            obj._loaded_summary = obj.summary()
+        return updated
 
 
 class Transaction(models.Model):
@@ -71,10 +215,20 @@ class Transaction(models.Model):
         ("EUR", "Євро (€)"),
     ]
 
-    amount = models.DecimalField(max_digits=10, decimal_places=2, verbose_name="Сума")
+    # Kopecks/cents in the database, a Decimal everywhere else
+    amount = MoneyField(max_digits=10, verbose_name="Сума")
     currency = models.CharField(max_length=3, choices=CURRENCY_CHOICES, default="UAH", verbose_name="Валюта")
     date = models.DateField(default=timezone.now, verbose_name="Дата транзакції")
     table = models.ForeignKey(Table, on_delete=models.CASCADE, related_name="transactions", verbose_name="Таблиця")
+    # Copy of table.user, so user-scoped queries need no join; indexed by transaction_user_date_idx
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="transactions",
+        editable=False,
+        db_index=False,
+        verbose_name="Користувач",
+    )
     category = models.ForeignKey(
         Category,
         on_delete=models.SET_NULL,
@@ -84,6 +238,8 @@ class Transaction(models.Model):
         verbose_name="Категорія",
     )
     description = models.TextField(blank=True, verbose_name="Опис транзакції")
+    # Content hash of an imported statement row, used to skip rows on re-import
+    import_hash = models.CharField(max_length=64, null=True, blank=True, editable=False, verbose_name="Хеш імпорту")
     created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
     updated_at = models.DateTimeField(auto_now=True, verbose_name="Дата оновлення")
 
@@ -91,10 +247,294 @@ class Transaction(models.Model):
         verbose_name = "Транзакція"
         verbose_name_plural = "Транзакції"
         ordering = ["-date", "-created_at"]
+        constraints = [
+            models.UniqueConstraint(fields=["table", "import_hash"], name="unique_transaction_import_hash"),
+        ]
+        indexes = [
+            # Matches the default ordering, so unfiltered lists (admin) read the first page without sorting
+            models.Index(fields=["-date", "-created_at"], name="transaction_date_created_idx"),
+            # User-scoped lists and date ranges are a range scan of this index, already in display order
+            models.Index(fields=["user", "-date", "-created_at"], name="transaction_user_date_idx"),
+            # Delta sync reads the user's changes in updated_at order
+            models.Index(fields=["user", "updated_at"], name="transaction_user_updated_idx"),
+        ]
+
+    objects = TransactionQuerySet.as_manager()
+
+    is_archived = False
+    # What a transaction contributes to the totals, as sent with transactions_changed
+    SUMMARY_FIELDS = ("id", "user_id", "table_id", "category_id", "currency", "date", "amount")
 
     def __str__(self):
         return f"{self.amount} {self.currency} - {self.date}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remembered so an edit can report what the row counted towards before; deferred fields are not loaded
+        if all(field in instance.__dict__ for field in cls.SUMMARY_FIELDS):
+            instance._loaded_summary = tuple(instance.__dict__[field] for field in cls.SUMMARY_FIELDS)
+        return instance
+
+    def summary(self):
+        # As stored: before a save, date may still be the datetime of the default or a string
+        return tuple(self._meta.get_field(field).to_python(getattr(self, field)) for field in self.SUMMARY_FIELDS)
+
+    def save(self, *args, **kwargs):
+        if self.table_id is not None:
+            self.user_id = self.table.user_id
+            update_fields = kwargs.get("update_fields")
+            if update_fields is not None and "table" in update_fields:
+                kwargs["update_fields"] = {*update_fields, "user"}
+        adding = self._state.adding
+        super().save(*args, **kwargs)
+
+        previous = None if adding else getattr(self, "_loaded_summary", None)
+        transactions_changed.send(
+            sender=Transaction,
+            action="created" if adding else "updated",
+            added=[self.summary()],
+            removed=[previous] if previous else [],
+            stale=not adding and previous is None,
+        )
+        self._loaded_summary = self.summary()
+
+    def delete(self, *args, **kwargs):
+        with transaction.atomic():
+            Tombstone.record(Tombstone.TRANSACTION, [(self.pk, self.user_id)])
+            transactions_changed.send(sender=Transaction, action="deleted", removed=[self.summary()])
+            return super().delete(*args, **kwargs)
+
+    @classmethod
+    def assign_users(cls, transactions):
+        """Sets user from the table on unsaved transactions; one query for tables that aren't loaded"""
+        missing = set()
+        for obj in transactions:
+            if obj.user_id is None and obj.table_id is not None:
+                if cls.table.is_cached(obj):
+                    obj.user_id = obj.table.user_id
+                else:
+                    missing.add(obj.table_id)
+
+        if missing:
+            owners = dict(Table.objects.filter(pk__in=missing).values_list("pk", "user_id"))
+            for obj in transactions:
+                if obj.user_id is None and obj.table_id in owners:
+                    obj.user_id = owners[obj.table_id]
+
+
+class ArchivedTransaction(models.Model):
+    """
+    Transaction moved out of the hot table by manage.py archive_transactions; read-only, keeps the original id.
+    Its amount is already counted in TransactionRollup.
+    """
+
+    is_archived = True
+    COPIED_FIELDS = (
+        "amount",
+        "currency",
+        "date",
+        "table_id",
+        "user_id",
+        "category_id",
+        "description",
+        "import_hash",
+        "created_at",
+        "updated_at",
+    )
+
+    amount = MoneyField(max_digits=10, verbose_name="Сума")
+    currency = models.CharField(max_length=3, choices=Transaction.CURRENCY_CHOICES, verbose_name="Валюта")
+    date = models.DateField(verbose_name="Дата транзакції")
+    # Indexed by archived_txn_import_idx together with import_hash
+    table = models.ForeignKey(
+        Table,
+        on_delete=models.CASCADE,
+        related_name="archived_transactions",
+        db_index=False,
+        verbose_name="Таблиця",
+    )
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="archived_transactions",
+        db_index=False,
+        verbose_name="Користувач",
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        related_name="archived_transactions",
+        null=True,
+        blank=True,
+        verbose_name="Категорія",
+    )
+    description = models.TextField(blank=True, verbose_name="Опис транзакції")
+    import_hash = models.CharField(max_length=64, null=True, blank=True, verbose_name="Хеш імпорту")
+    created_at = models.DateTimeField(verbose_name="Дата створення")
+    updated_at = models.DateTimeField(verbose_name="Дата оновлення")
+
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Архівна транзакція"
+        verbose_name_plural = "Архівні транзакції"
+        ordering = ["-date", "-created_at"]
+        indexes = [
+            models.Index(fields=["user", "-date", "-created_at"], name="archived_txn_user_date_idx"),
+            # Re-imports of old statements are checked against the archive too
+            models.Index(fields=["table", "import_hash"], name="archived_txn_import_idx"),
+            # Full sync reads archived transactions in updated_at order
+            models.Index(fields=["user", "updated_at"], name="archived_txn_user_updated_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.amount} {self.currency} - {self.date}"
+
+    @classmethod
+    def from_transaction(cls, transaction):
+        return cls(pk=transaction.pk, **{field: getattr(transaction, field) for field in cls.COPIED_FIELDS})
+
+
+class TransactionRollup(models.Model):
+    """Permanent monthly totals of archived transactions per table, category and currency"""
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="transaction_rollups",
+        db_index=False,
+        verbose_name="Користувач",
+    )
+    table = models.ForeignKey(
+        Table, on_delete=models.CASCADE, related_name="transaction_rollups", verbose_name="Таблиця"
+    )
+    category = models.ForeignKey(
+        Category,
+        on_delete=models.SET_NULL,
+        related_name="transaction_rollups",
+        null=True,
+        blank=True,
+        verbose_name="Категорія",
+    )
+    currency = models.CharField(max_length=3, choices=Transaction.CURRENCY_CHOICES, verbose_name="Валюта")
+    # First day of the month
+    month = models.DateField(verbose_name="Місяць")
+    total = MoneyField(max_digits=14, verbose_name="Сума")
+    transaction_count = models.PositiveIntegerField(verbose_name="Кількість транзакцій")
+    max_amount = MoneyField(max_digits=10, verbose_name="Найбільша сума")
+
+    objects = OwnedQuerySet.as_manager()
+
+    class Meta:
+        verbose_name = "Підсумок за місяць"
+        verbose_name_plural = "Підсумки за місяць"
+        ordering = ["-month"]
+        indexes = [models.Index(fields=["user", "month"], name="txn_rollup_user_month_idx")]
+
+    def __str__(self):
+        return f"{self.month:%Y-%m}: {self.total} {self.currency}"
+
+
+class Tombstone(models.Model):
+    """Deleted row, kept so sync clients (api/v1/sync/) can drop their copy; pruned after SYNC_TOMBSTONE_DAYS"""
+
+    TRANSACTION = "transaction"
+    TABLE = "table"
+    CATEGORY = "category"
+    KIND_CHOICES = [(TRANSACTION, "Транзакція"), (TABLE, "Таблиця"), (CATEGORY, "Категорія")]
+
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES, verbose_name="Тип")
+    object_id = models.BigIntegerField(verbose_name="Ідентифікатор")
+    # Empty for rows shared by all users (categories)
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="tombstones",
+        null=True,
+        blank=True,
+        db_index=False,
+        verbose_name="Користувач",
+    )
+    deleted_at = models.DateTimeField(default=timezone.now, verbose_name="Дата видалення")
+
+    class Meta:
+        verbose_name = "Видалений запис"
+        verbose_name_plural = "Видалені записи"
+        ordering = ["deleted_at"]
+        indexes = [models.Index(fields=["user", "deleted_at"], name="tombstone_user_deleted_idx")]
+
+    def __str__(self):
+        return f"{self.kind} {self.object_id}"
+
+    @classmethod
+    def record(cls, kind, rows):
+        """rows: (object_id, user_id) pairs"""
+        deleted_at = timezone.now()
+        cls.objects.bulk_create(
+            [cls(kind=kind, object_id=object_id, user_id=user_id, deleted_at=deleted_at) for object_id, user_id in rows]
+        )
+
+    @classmethod
+    def prune(cls, days=None):
+        days = settings.SYNC_TOMBSTONE_DAYS if days is None else days
+        deleted, _ = cls.objects.filter(deleted_at__lt=timezone.now() - timedelta(days=days)).delete()
+        return deleted
+
+
+class Job(models.Model):
+    """Background task run by manage.py run_workers (finances.services.jobs); kept JOB_RETENTION_DAYS when done"""
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+    STATUS_CHOICES = [(QUEUED, "У черзі"), (RUNNING, "Виконується"), (SUCCEEDED, "Виконано"), (FAILED, "Помилка")]
+
+    kind = models.CharField(max_length=50, verbose_name="Тип")
+    payload = models.JSONField(default=dict, blank=True, verbose_name="Параметри")
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="jobs",
+        null=True,
+        blank=True,
+        verbose_name="Користувач",
+    )
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=QUEUED, verbose_name="Статус")
+    # Higher runs first
+    priority = models.SmallIntegerField(default=0, verbose_name="Пріоритет")
+    attempts = models.PositiveSmallIntegerField(default=0, verbose_name="Спроби")
+    max_attempts = models.PositiveSmallIntegerField(default=3, verbose_name="Максимум спроб")
+    run_after = models.DateTimeField(default=timezone.now, verbose_name="Не раніше")
+    # Enqueueing the same key again returns the existing job instead of adding another
+    idempotency_key = models.CharField(
+        max_length=200, unique=True, null=True, blank=True, verbose_name="Ключ ідемпотентності"
+    )
+    result = models.JSONField(null=True, blank=True, verbose_name="Результат")
+    error = models.TextField(blank=True, verbose_name="Помилка")
+    worker = models.CharField(max_length=100, blank=True, verbose_name="Обробник")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    started_at = models.DateTimeField(null=True, blank=True, verbose_name="Початок")
+    finished_at = models.DateTimeField(null=True, blank=True, verbose_name="Завершення")
+
+    class Meta:
+        verbose_name = "Фонове завдання"
+        verbose_name_plural = "Фонові завдання"
+        ordering = ["-created_at"]
+        indexes = [
+            # Partial: only queued jobs, in the order workers take them
+            models.Index(fields=["-priority", "run_after"], condition=models.Q(status="queued"), name="job_queued_idx"),
+            models.Index(fields=["started_at"], condition=models.Q(status="running"), name="job_running_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.kind} #{self.pk}"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.SUCCEEDED, self.FAILED)
+
 
 def create_default_categories(apps, schema_editor):
     Category = apps.get_model("finances", "Category")
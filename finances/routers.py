@@ -0,0 +1,160 @@
+import functools
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+
+# Set while an opted-in view runs, and while a session has recently written
+_read_from_replica = ContextVar("read_from_replica", default=False)
+_pinned_to_primary = ContextVar("pinned_to_primary", default=False)
+
+
+class ReplicaRouter:
+    """
+    Sends reads of opted-in views to the "replica" database alias; everything else uses "default".
+
+    Views opt in with ReplicaReadMixin or @use_replica. Without a "replica" entry in DATABASES the
+    router is a no-op, so development and tests need no extra setup.
+    """
+
+    REPLICA = "replica"
+    SESSION_KEY = "replica_pinned_until"
+
+    @classmethod
+    def is_enabled(cls):
+        return cls.REPLICA in settings.DATABASES
+
+    @classmethod
+    def get_read_alias(cls):
+        if _read_from_replica.get() and not _pinned_to_primary.get() and cls.is_enabled():
+            return cls.REPLICA
+        return DEFAULT_DB_ALIAS
+
+    def db_for_read(self, model, **hints):
+        return self.get_read_alias()
+
+    def db_for_write(self, model, **hints):
+        # Explicit, otherwise Django would write an object back to the database it was read from
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return {obj1._state.db, obj2._state.db} <= {DEFAULT_DB_ALIAS, self.REPLICA}
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica receives its schema through replication
+        return db != self.REPLICA
+
+
+@contextmanager
+def replica_reads():
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+@contextmanager
+def pinned_to_primary(pinned=True):
+    token = _pinned_to_primary.set(pinned)
+    try:
+        yield
+    finally:
+        _pinned_to_primary.reset(token)
+
+
+def use_replica(view):
+    """Decorator for function views (sync or async) whose reads may go to the replica"""
+    if iscoroutinefunction(view):
+
+        @functools.wraps(view)
+        async def wrapper(request, *args, **kwargs):
+            with replica_reads():
+                return await view(request, *args, **kwargs)
+
+    else:
+
+        @functools.wraps(view)
+        def wrapper(request, *args, **kwargs):
+            with replica_reads():
+                return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+class ReplicaReadMixin:
+    """
+    Class-based view mixin routing the view's reads to the replica.
+
+    Querysets consumed after dispatch returns (streaming responses) must pin their alias with
+    .using(ReplicaRouter.get_read_alias()) while the view still runs.
+    """
+
+    def dispatch(self, request, *args, **kwargs):
+        if self.view_is_async:
+            return self._adispatch(request, *args, **kwargs)
+        with replica_reads():
+            return super().dispatch(request, *args, **kwargs)
+
+    async def _adispatch(self, request, *args, **kwargs):
+        with replica_reads():
+            return await super().dispatch(request, *args, **kwargs)
+
+
+class ReplicaRoutingMiddleware:
+    """
+    Read-your-writes for replica routing: after a POST/PUT/PATCH/DELETE the session reads from the
+    primary for REPLICA_STICKY_SECONDS, so users never see a page that misses their own change.
+
+    Needs SessionMiddleware before it.
+    """
+
+    SAFE_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE")
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(self.get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not ReplicaRouter.is_enabled():
+            return self.get_response(request)
+
+        with pinned_to_primary(self.is_pinned(request.session.get(ReplicaRouter.SESSION_KEY))):
+            response = self.get_response(request)
+
+        if self.should_pin(request):
+            request.session[ReplicaRouter.SESSION_KEY] = self.get_pinned_until()
+        return response
+
+    async def __acall__(self, request):
+        if not ReplicaRouter.is_enabled():
+            return await self.get_response(request)
+
+        with pinned_to_primary(self.is_pinned(await request.session.aget(ReplicaRouter.SESSION_KEY))):
+            response = await self.get_response(request)
+
+        if self.should_pin(request):
+            await request.session.aset(ReplicaRouter.SESSION_KEY, self.get_pinned_until())
+        return response
+
+    def should_pin(self, request):
+        # A flushed session (logout) has nothing to read back
+        return request.method not in self.SAFE_METHODS and not request.session.is_empty()
+
+    @staticmethod
+    def is_pinned(pinned_until):
+        return pinned_until is not None and pinned_until > time.time()
+
+    @staticmethod
+    def get_pinned_until():
+        return time.time() + getattr(settings, "REPLICA_STICKY_SECONDS", 15)
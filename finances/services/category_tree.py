@@ -0,0 +1,120 @@
+import logging
+
+from django.core.cache import cache
+
+from .metrics import Metrics
+
+logger = logging.getLogger(__name__)
+
+
+class CategoryTree:
+    """Category hierarchy loaded with one query and cached until a category changes"""
+
+    CACHE_KEY = "category_tree"
+    VERSION_KEY = "category_tree_version"
+    CACHE_TIMEOUT = 24 * 3600  # Invalidated explicitly, so it can live long
+
+    @classmethod
+    def get_version(cls):
+        version = cache.get(cls.VERSION_KEY)
+        if version is None:
+            cache.add(cls.VERSION_KEY, 1, None)
+            version = cache.get(cls.VERSION_KEY, 1)
+        return version
+
+    @classmethod
+    async def aget_version(cls):
+        version = await cache.aget(cls.VERSION_KEY)
+        if version is None:
+            await cache.aadd(cls.VERSION_KEY, 1, None)
+            version = await cache.aget(cls.VERSION_KEY, 1)
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        # Bumping the version orphans every cached copy, including template fragments keyed on it
+        try:
+            cache.incr(cls.VERSION_KEY)
+        except ValueError:
+            cache.set(cls.VERSION_KEY, 1, None)
+
+    @classmethod
+    def get_nodes(cls):
+        """All categories as dicts, ordered by path so every parent precedes its children"""
+        cache_key = f"{cls.CACHE_KEY}:{cls.get_version()}"
+        nodes = cache.get(cache_key)
+        Metrics.track("cache_hits" if nodes is not None else "cache_misses")
+
+        if nodes is None:
+            from ..models import Category
+
+            nodes = list(Category.objects.order_by("path").values("id", "name", "parent_id", "path", "depth"))
+
+            names = {}
+            for node in nodes:
+                parent_name = names.get(node["parent_id"])
+                node["full_name"] = f"{parent_name} → {node['name']}" if parent_name else node["name"]
+                names[node["id"]] = node["full_name"]
+
+            cache.set(cache_key, nodes, cls.CACHE_TIMEOUT)
+            logger.debug("Дерево категорій перебудовано")
+
+        return nodes
+
+    @classmethod
+    def get_hierarchy(cls):
+        """
+        Top-level categories sorted by name, each with its whole subtree as "children": depth-first, siblings
+        sorted by name, "level" 1 for direct children
+        """
+        children = {}
+        for node in cls.get_nodes():
+            children.setdefault(node["parent_id"], []).append(node)
+        for siblings in children.values():
+            siblings.sort(key=lambda node: node["name"])
+
+        def subtree(parent_id, level):
+            for node in children.get(parent_id, []):
+                yield {"id": node["id"], "name": node["name"], "level": level}
+                yield from subtree(node["id"], level + 1)
+
+        return [
+            {"id": root["id"], "name": root["name"], "children": list(subtree(root["id"], 1))}
+            for root in children.get(None, [])
+        ]
+
+    @classmethod
+    def get_choices(cls):
+        """Choices for a select: one group per top-level category with its whole subtree"""
+        groups = {}
+        root_names = {}
+        for node in cls.get_nodes():
+            root_id = int(node["path"].split("/", 1)[0])
+            if node["parent_id"] is None:
+                root_names[root_id] = node["name"]
+            groups.setdefault(root_id, []).append((node["id"], node["full_name"]))
+
+        return [
+            (root_names[root_id], sorted(options, key=lambda option: option[1]))
+            for root_id, options in sorted(groups.items(), key=lambda item: root_names[item[0]])
+        ]
+
+    @classmethod
+    def get_lookup(cls):
+        """Maps lowercased full names ("Продукти → Ринок") and unambiguous leaf names to category ids"""
+        full_names = {}
+        leaf_names = {}
+        ambiguous = set()
+
+        for node in cls.get_nodes():
+            full_names[node["full_name"].lower()] = node["id"]
+
+            name = node["name"].lower()
+            if leaf_names.setdefault(name, node["id"]) != node["id"]:
+                ambiguous.add(name)
+
+        # A leaf name shared by several parents can only be matched by its full name
+        for name in ambiguous:
+            del leaf_names[name]
+
+        return {**leaf_names, **full_names}
@@ -1,44 +1,111 @@
+import asyncio
 import logging
+import weakref
 
-import requests
 from django.conf import settings
 from django.core.cache import cache
 
+from .metrics import Metrics
+
 logger = logging.getLogger(__name__)
 
 
 class CurrencyConverter:
     BASE_CURRENCY = "USD"
+    CACHE_KEY = "openexchangerates_latest"
     CACHE_TIMEOUT = 3600  # 1 hour
+    REQUEST_TIMEOUT = 10
+    _fetch_locks = weakref.WeakKeyDictionary()  # Event loop -> asyncio.Lock
+
+    @classmethod
+    def get_api_url(cls, api_key):
+        return f"https://openexchangerates.org/api/latest.json?app_id={api_key}&base={cls.BASE_CURRENCY}"
 
     @classmethod
     def get_exchange_rates(cls):
-        cache_key = "openexchangerates_latest"
-        rates = cache.get(cache_key)
+        rates = cache.get(cls.CACHE_KEY)
+        Metrics.track("cache_hits" if rates is not None else "cache_misses")
+        if rates is None:
+            rates = cls.fetch_exchange_rates()
+        return rates
 
+    @classmethod
+    async def aget_exchange_rates(cls):
+        """Неблокуюча версія get_exchange_rates для async views"""
+        rates = await cache.aget(cls.CACHE_KEY)
+        Metrics.track("cache_hits" if rates is not None else "cache_misses")
         if rates is None:
-            api_key = getattr(settings, "OPENEXCHANGERATES_API_KEY", None)
-            if not api_key:
-                logger.warning("OPENEXCHANGERATES_API_KEY не налаштовано")
-                return None
+            # Concurrent misses wait for one provider call instead of each making their own
+            async with cls.get_fetch_lock():
+                rates = await cache.aget(cls.CACHE_KEY)
+                if rates is None:
+                    rates = await cls.afetch_exchange_rates()
+        return rates
 
-            try:
-                url = f"https://openexchangerates.org/api/latest.json?app_id={api_key}&base={cls.BASE_CURRENCY}"
-                response = requests.get(url, timeout=10)
-                response.raise_for_status()
-                data = response.json()
+    @classmethod
+    def get_fetch_lock(cls):
+        # An asyncio.Lock belongs to one event loop; under WSGI every async request runs in a loop of its own
+        loop = asyncio.get_running_loop()
+        lock = cls._fetch_locks.get(loop)
+        if lock is None:
+            lock = cls._fetch_locks[loop] = asyncio.Lock()
+        return lock
 
-                rates = data.get("rates", {})
-                cache.set(cache_key, rates, cls.CACHE_TIMEOUT)
-                logger.info("Курси валют отримано з API")
+    @classmethod
+    async def afetch_exchange_rates(cls):
+        """fetch_exchange_rates on a non-blocking client: a slow provider holds no thread, only this coroutine"""
+        api_key = getattr(settings, "OPENEXCHANGERATES_API_KEY", None)
+        if not api_key:
+            logger.warning("OPENEXCHANGERATES_API_KEY не налаштовано")
+            return None
 
-            except requests.exceptions.RequestException as e:
-                logger.error(f"Помилка отримання курсів валют: {e}")
-                return None
-            except ValueError as e:
-                logger.error(f"Помилка парсингу JSON: {e}")
-                return None
+        # Imported on first use, like requests
+        import httpx
 
+        Metrics.track("rate_provider_calls")
+        try:
+            async with httpx.AsyncClient(timeout=cls.REQUEST_TIMEOUT) as client:
+                response = await client.get(cls.get_api_url(api_key))
+            response.raise_for_status()
+            data = response.json()
+        except httpx.HTTPError as e:
+            logger.error(f"Помилка отримання курсів валют: {e}")
+            return None
+        except ValueError as e:
+            logger.error(f"Помилка парсингу JSON: {e}")
+            return None
+
+        rates = data.get("rates", {})
+        await cache.aset(cls.CACHE_KEY, rates, cls.CACHE_TIMEOUT)
+        logger.info("Курси валют отримано з API")
+        return rates
+
+    @classmethod
+    def fetch_exchange_rates(cls):
+        """Rates from the provider, stored in the cache; None when they can't be had"""
+        api_key = getattr(settings, "OPENEXCHANGERATES_API_KEY", None)
+        if not api_key:
+            logger.warning("OPENEXCHANGERATES_API_KEY не налаштовано")
+            return None
+
+        # Imported on first use: requests is slow to import and most processes never call the API
+        import requests
+
+        Metrics.track("rate_provider_calls")
+        try:
+            response = requests.get(cls.get_api_url(api_key), timeout=cls.REQUEST_TIMEOUT)
+            response.raise_for_status()
+            data = response.json()
+        except requests.exceptions.RequestException as e:
+            logger.error(f"Помилка отримання курсів валют: {e}")
+            return None
+        except ValueError as e:
+            logger.error(f"Помилка парсингу JSON: {e}")
+            return None
+
+        rates = data.get("rates", {})
+        cache.set(cls.CACHE_KEY, rates, cls.CACHE_TIMEOUT)
+        logger.info("Курси валют отримано з API")
         return rates
 
     @classmethod
@@ -47,7 +114,11 @@ class CurrencyConverter:
         rates = cls.get_exchange_rates()
         if not rates:
             return None
+        return cls.convert_with_rates(amount, from_currency, to_currency, rates)
 
+    @classmethod
+    def convert_with_rates(cls, amount, from_currency, to_currency, rates):
+        """Конвертує суму за вже отриманими курсами (без звернень до кешу)"""
         try:
             # Convert via USD
             if from_currency.upper() == cls.BASE_CURRENCY:
@@ -74,6 +145,24 @@ class CurrencyConverter:
             logger.error(f"Помилка конвертації: {e}")
             return None
 
+    @classmethod
+    def get_rate(cls, from_currency, to_currency="UAH"):
+        """Повертає коефіцієнт конвертації без округлення (для масової конвертації)"""
+        if from_currency.upper() == to_currency.upper():
+            return 1.0
+
+        rates = cls.get_exchange_rates()
+        if not rates:
+            return None
+
+        from_rate = 1.0 if from_currency.upper() == cls.BASE_CURRENCY else rates.get(from_currency.upper())
+        to_rate = 1.0 if to_currency.upper() == cls.BASE_CURRENCY else rates.get(to_currency.upper())
+        if not from_rate or not to_rate:
+            logger.error(f"Курс для пари {from_currency}/{to_currency} не знайдено")
+            return None
+
+        return to_rate / from_rate
+
     @classmethod
     def get_supported_currencies(cls):
         return {
@@ -0,0 +1,296 @@
+import logging
+import os
+import socket
+import threading
+import traceback
+from datetime import timedelta
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.files.storage import FileSystemStorage
+from django.db import IntegrityError, close_old_connections, connections
+from django.db import transaction as db_transaction
+from django.db.models import F
+from django.utils import timezone
+from django.utils.functional import classproperty
+
+from ..models import Job
+
+logger = logging.getLogger(__name__)
+
+
+class JobFailed(Exception):
+    """Raised by a handler for an error that retrying won't fix; the message is shown to the user"""
+
+
+class JobQueue:
+    """
+    Database-backed queue of background jobs, run by manage.py run_workers.
+
+    Handlers are registered by kind with @JobQueue.register (finances/jobs.py) and called with the Job, whose
+    payload holds the parameters. What a handler returns is saved as the result. An exception retries the job
+    with exponential backoff until max_attempts; JobFailed fails it at once.
+
+    Workers claim a job with a conditional UPDATE, so two workers never take the same one on any backend
+    (SQLite has no SELECT ... FOR UPDATE SKIP LOCKED). Progress and heartbeats of running jobs go to the shared
+    cache rather than the job row: a handler may hold a long database transaction (an import), during which
+    SQLite would block other writers and the handler's own updates would stay invisible. A running job without
+    a heartbeat for JOB_LEASE_SECONDS lost its worker and is retried.
+    """
+
+    RETRY_DELAY = 30  # Seconds before the first retry, doubled on every next one
+    CLAIM_CANDIDATES = 5  # Queued jobs read per claim, so workers racing for the first one still get work
+    # Straight to the shared cache: through TwoTierCache every progress write would invalidate all L1 caches
+    CACHE_ALIAS = "shared"
+    PROGRESS_INTERVAL = 1  # Seconds between progress writes of a job
+    handlers = {}
+
+    @classmethod
+    def register(cls, kind, cleanup=None):
+        """
+        Decorator for the handler of a kind. cleanup(job) runs once the job succeeded; a failed job keeps what
+        it needs to be retried from the admin until prune() deletes it, which runs the cleanup then
+        """
+
+        def decorator(handler):
+            cls.handlers[kind] = (handler, cleanup)
+            return handler
+
+        return decorator
+
+    @classproperty
+    def file_storage(cls):
+        """Files handed to jobs, e.g. uploaded statements"""
+        return FileSystemStorage(location=settings.JOB_FILES_DIR)
+
+    @classproperty
+    def cache(cls):
+        return caches[cls.CACHE_ALIAS]
+
+    # === ENQUEUEING ===
+
+    @classmethod
+    def enqueue(cls, kind, payload=None, user=None, priority=0, idempotency_key=None, max_attempts=3, delay=None):
+        """
+        Adds a job; returns (job, created). With an idempotency key already in use the existing job is returned
+        and created is False.
+        """
+        if kind not in cls.handlers:
+            raise ValueError(f"Невідомий тип завдання: {kind}")
+
+        if idempotency_key is not None:
+            existing = Job.objects.filter(idempotency_key=idempotency_key).first()
+            if existing is not None:
+                return existing, False
+
+        job = Job(
+            kind=kind,
+            payload=payload or {},
+            user=user,
+            priority=priority,
+            idempotency_key=idempotency_key,
+            max_attempts=max_attempts,
+            run_after=timezone.now() + (delay or timedelta()),
+        )
+        try:
+            with db_transaction.atomic():
+                job.save()
+        except IntegrityError:
+            # The same key enqueued concurrently
+            if idempotency_key is None:
+                raise
+            return Job.objects.get(idempotency_key=idempotency_key), False
+
+        logger.info(f"Завдання {job} додано до черги")
+        return job, True
+
+    # === PROGRESS ===
+
+    @classmethod
+    def set_progress(cls, job, done, total=None, message=None):
+        """For handlers: done out of total, or a percentage without total. Written at most once a second"""
+        percent = min(100, int(done * 100 / total)) if total else min(100, int(done))
+        now = monotonic()
+        written_at = getattr(job, "_progress_written_at", None)
+        if percent < 100 and written_at is not None and now - written_at < cls.PROGRESS_INTERVAL:
+            return
+        job._progress_written_at = now
+        cls.cache.set(f"job:{job.pk}:progress", {"percent": percent, "message": message}, settings.JOB_LEASE_SECONDS)
+
+    @classmethod
+    def get_status(cls, job):
+        """What the UI polls"""
+        status = {"id": job.pk, "kind": job.kind, "status": job.status, "finished": job.is_finished}
+        if job.status == Job.RUNNING:
+            status["progress"] = cls.cache.get(f"job:{job.pk}:progress") or {"percent": 0, "message": None}
+        elif job.status == Job.SUCCEEDED:
+            status["result"] = job.result
+        elif job.status == Job.FAILED:
+            # The traceback in job.error is for the admin; users see what the handler meant for them
+            status["error"] = (job.result or {}).get("error") or "Не вдалося виконати завдання"
+        return status
+
+    # === RUNNING ===
+
+    @classmethod
+    def claim(cls, worker):
+        """Takes the next due job, highest priority first; None when there is nothing to do"""
+        now = timezone.now()
+        candidates = (
+            Job.objects.filter(status=Job.QUEUED, run_after__lte=now)
+            .order_by("-priority", "run_after")
+            .values_list("pk", flat=True)[: cls.CLAIM_CANDIDATES]
+        )
+        for pk in list(candidates):
+            claimed = Job.objects.filter(pk=pk, status=Job.QUEUED).update(
+                status=Job.RUNNING, worker=worker, started_at=now, attempts=F("attempts") + 1
+            )
+            if claimed:
+                return Job.objects.get(pk=pk)
+        return None
+
+    @classmethod
+    def execute(cls, job):
+        """Runs a claimed job and records the outcome"""
+        handler, cleanup = cls.handlers.get(job.kind, (None, None))
+        heartbeat = Heartbeat(job.pk)
+        heartbeat.start()
+        try:
+            if handler is None:
+                raise JobFailed(f"Невідомий тип завдання: {job.kind}")
+            result = handler(job)
+        except Exception as e:
+            heartbeat.stop()
+            retry = not isinstance(e, JobFailed) and job.attempts < job.max_attempts
+            cls.finish_failed(job, e, retry)
+            return job
+        heartbeat.stop()
+
+        job.status, job.result, job.error = Job.SUCCEEDED, result, ""
+        job.finished_at = timezone.now()
+        job.save(update_fields=["status", "result", "error", "finished_at"])
+        logger.info(f"Завдання {job} виконано за {(job.finished_at - job.started_at).total_seconds():.1f} с")
+        if cleanup is not None:
+            cleanup(job)
+        return job
+
+    @classmethod
+    def finish_failed(cls, job, error, retry):
+        job.error = "".join(traceback.format_exception(error))
+        job.result = {"error": str(error)} if isinstance(error, JobFailed) else None
+        if retry:
+            job.status = Job.QUEUED
+            job.run_after = timezone.now() + timedelta(seconds=cls.RETRY_DELAY * 2 ** (job.attempts - 1))
+            logger.warning(f"Завдання {job} (спроба {job.attempts}) завершилося помилкою, повтор о {job.run_after}")
+        else:
+            job.status = Job.FAILED
+            job.finished_at = timezone.now()
+            logger.error(f"Завдання {job} не виконано: {error!r}")
+        job.save(update_fields=["status", "error", "result", "run_after", "finished_at"])
+
+    @classmethod
+    def beat(cls, job_id):
+        cls.cache.set(f"job:{job_id}:heartbeat", True, settings.JOB_LEASE_SECONDS)
+
+    @classmethod
+    def recover_lost(cls):
+        """Retries running jobs whose worker stopped sending heartbeats; returns how many were found"""
+        started_before = timezone.now() - timedelta(seconds=settings.JOB_LEASE_SECONDS)
+        running = list(Job.objects.filter(status=Job.RUNNING, started_at__lt=started_before))
+        alive = cls.cache.get_many([f"job:{job.pk}:heartbeat" for job in running])
+        lost = [job for job in running if f"job:{job.pk}:heartbeat" not in alive]
+
+        for job in lost:
+            retry = job.attempts < job.max_attempts
+            # Conditional, so a job another worker already recovered is left alone
+            updated = Job.objects.filter(pk=job.pk, status=Job.RUNNING, attempts=job.attempts).update(
+                status=Job.QUEUED if retry else Job.FAILED,
+                error="Обробник завдання зупинився",
+                run_after=timezone.now(),
+                finished_at=None if retry else timezone.now(),
+            )
+            if updated:
+                logger.warning(f"Завдання {job} втратило обробника, {'повтор' if retry else 'спроби вичерпано'}")
+        return len(lost)
+
+    @classmethod
+    def prune(cls, days=None):
+        """
+        Deletes finished jobs older than JOB_RETENTION_DAYS, which also frees their idempotency keys; failed ones
+        are cleaned up first
+        """
+        days = settings.JOB_RETENTION_DAYS if days is None else days
+        finished = Job.objects.filter(
+            status__in=[Job.SUCCEEDED, Job.FAILED], finished_at__lt=timezone.now() - timedelta(days=days)
+        )
+        # Failed jobs kept their files for a retry; succeeded ones were cleaned up when they finished
+        cleanups = {kind: cleanup for kind, (_, cleanup) in cls.handlers.items() if cleanup is not None}
+        for job in finished.filter(status=Job.FAILED, kind__in=cleanups).iterator():
+            cleanups[job.kind](job)
+        deleted, _ = finished.delete()
+        return deleted
+
+
+class Heartbeat:
+    """Marks a running job as alive every third of the lease, from a thread beside the handler"""
+
+    def __init__(self, job_id):
+        self.job_id = job_id
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.run, name=f"job-heartbeat-{job_id}", daemon=True)
+
+    def start(self):
+        self.thread.start()
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def run(self):
+        while True:
+            try:
+                JobQueue.beat(self.job_id)
+            except Exception:
+                # The next beat may get through; the lease is three beats long
+                logger.exception(f"Не вдалося оновити стан завдання {self.job_id}")
+            if self.stopped.wait(settings.JOB_LEASE_SECONDS / 3):
+                return
+
+
+class JobWorker:
+    """Loop of one worker thread or process: claim a job, run it, wait when the queue is empty"""
+
+    def __init__(self, name, stop_event, poll_interval=1.0, burst=False):
+        self.name = name
+        self.stop_event = stop_event
+        self.poll_interval = poll_interval
+        self.burst = burst
+        self.recovered_at = None
+
+    @classmethod
+    def get_name(cls, index):
+        return f"{socket.gethostname()}:{os.getpid()}:{index}"
+
+    def run(self):
+        logger.info(f"Обробник {self.name} запущено")
+        try:
+            while not self.stop_event.is_set():
+                close_old_connections()
+                self.recover_lost()
+                job = JobQueue.claim(self.name)
+                if job is not None:
+                    JobQueue.execute(job)
+                elif self.burst:
+                    break
+                else:
+                    self.stop_event.wait(self.poll_interval)
+        finally:
+            connections.close_all()
+            logger.info(f"Обробник {self.name} зупинено")
+
+    def recover_lost(self):
+        now = monotonic()
+        if self.recovered_at is None or now - self.recovered_at > settings.JOB_LEASE_SECONDS / 3:
+            JobQueue.recover_lost()
+            self.recovered_at = now
@@ -0,0 +1,288 @@
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from datetime import date
+from decimal import Decimal
+from time import monotonic
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction as db_transaction
+from django.utils.functional import classproperty
+from django.utils.module_loading import import_string
+
+from .category_tree import CategoryTree
+from .currency_converter import CurrencyConverter
+
+logger = logging.getLogger(__name__)
+
+
+class InProcessBroker:
+    """
+    Delivers events to the subscribers of this process only: a single ASGI worker, tests.
+    publish() may be called from any thread; events are handed to each subscriber's event loop.
+    """
+
+    def __init__(self, options=None):
+        self._subscribers = defaultdict(set)
+        self._lock = threading.Lock()
+
+    def has_subscribers(self, user_id):
+        return bool(self._subscribers.get(user_id))
+
+    def publish(self, user_id, event):
+        with self._lock:
+            subscribers = list(self._subscribers.get(user_id, ()))
+        for loop, queue in subscribers:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    def subscribe(self, user_id):
+        return InProcessSubscription(self, user_id)
+
+
+class InProcessSubscription:
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.subscriber = (asyncio.get_running_loop(), asyncio.Queue())
+        with broker._lock:
+            broker._subscribers[user_id].add(self.subscriber)
+
+    async def get(self, timeout):
+        """The next event, None if there was none within timeout seconds"""
+        try:
+            return await asyncio.wait_for(self.subscriber[1].get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self):
+        with self.broker._lock:
+            subscribers = self.broker._subscribers[self.user_id]
+            subscribers.discard(self.subscriber)
+            if not subscribers:
+                del self.broker._subscribers[self.user_id]
+
+
+class CacheBroker:
+    """
+    Delivers events between processes through a shared cache (Redis in production).
+
+    Each user has a sequence counter and one short-lived key per event; subscribers poll the counter every
+    POLL_INTERVAL seconds and read the events they haven't seen. Subscribers also keep a "listening" key alive,
+    so writes by users with no open page publish nothing.
+
+    OPTIONS:
+        CACHE           alias of the cache to use; not a TwoTierCache, whose L1 would hide new events and whose
+                        invalidation broadcast every publish would trigger (default "shared")
+        POLL_INTERVAL   seconds between counter reads (default 1)
+        EVENT_TIMEOUT   seconds an event is kept for subscribers to read (default 60)
+    """
+
+    KEY_PREFIX = "live_updates"
+    LISTENING_TIMEOUT = 60
+
+    def __init__(self, options=None):
+        options = options or {}
+        self.cache_alias = options.get("CACHE", "shared")
+        self.poll_interval = options.get("POLL_INTERVAL", 1)
+        self.event_timeout = options.get("EVENT_TIMEOUT", 60)
+
+    @property
+    def cache(self):
+        return caches[self.cache_alias]
+
+    def key(self, user_id, suffix):
+        return f"{self.KEY_PREFIX}:{user_id}:{suffix}"
+
+    def has_subscribers(self, user_id):
+        return self.cache.get(self.key(user_id, "listening")) is not None
+
+    def publish(self, user_id, event):
+        seq_key = self.key(user_id, "seq")
+        self.cache.add(seq_key, 0, None)
+        seq = self.cache.incr(seq_key)
+        self.cache.set(self.key(user_id, seq), event, self.event_timeout)
+
+    def subscribe(self, user_id):
+        return CacheSubscription(self, user_id)
+
+
+class CacheSubscription:
+    # A counted event whose key is not readable yet is retried for this long, then skipped
+    MISSING_GRACE = 5
+
+    def __init__(self, broker, user_id):
+        self.broker = broker
+        self.user_id = user_id
+        self.seq = None
+        self.listening_at = None
+        self.missing_since = None
+        self.pending = []
+
+    async def get(self, timeout):
+        """The next event, None if there was none within timeout seconds"""
+        deadline = monotonic() + timeout
+        while not self.pending:
+            await self.poll()
+            if self.pending:
+                break
+            remaining = deadline - monotonic()
+            if remaining <= 0:
+                return None
+            await asyncio.sleep(min(self.broker.poll_interval, remaining))
+        return self.pending.pop(0)
+
+    async def poll(self):
+        cache = self.broker.cache
+        now = monotonic()
+        if self.listening_at is None or now - self.listening_at > self.broker.LISTENING_TIMEOUT / 3:
+            await cache.aset(self.broker.key(self.user_id, "listening"), True, self.broker.LISTENING_TIMEOUT)
+            self.listening_at = now
+
+        seq = await cache.aget(self.broker.key(self.user_id, "seq"), 0)
+        if self.seq is None or seq < self.seq:
+            # Events before the subscription are not replayed; a counter that went back was evicted
+            self.seq = seq
+            return
+        if seq == self.seq:
+            return
+
+        keys = {self.broker.key(self.user_id, number): number for number in range(self.seq + 1, seq + 1)}
+        events = await cache.aget_many(keys)
+        for key, number in keys.items():
+            if key not in events:
+                # Counted but not written yet, or already expired
+                self.missing_since = self.missing_since or now
+                if now - self.missing_since < self.MISSING_GRACE:
+                    return
+                logger.warning(f"Подію {number} для користувача {self.user_id} втрачено")
+            else:
+                self.pending.append(events[key])
+            self.seq = number
+            self.missing_since = None
+
+    def close(self):
+        pass
+
+
+class LiveUpdates:
+    """
+    Change events for pages that are open while the user's transactions change (dashboard, analytics).
+
+    Models send transactions_changed for every create, edit and delete, bulk ones included; the event goes to the
+    broker once the database transaction commits, and /events/ streams it to the browser as server-sent events.
+    An event carries the changed ids and the change of the totals per table, category, currency and date, so a
+    page patches its numbers and charts instead of reloading. "stale" means the change could not be measured
+    (e.g. rows inserted with ignore_conflicts): the page has to reload its data.
+    """
+
+    KEEPALIVE = 15  # Seconds between comment lines that keep proxies from closing an idle stream
+    RETRY = 5000  # Milliseconds before the browser reconnects
+    _broker = None
+
+    @classproperty
+    def broker(cls):
+        if cls._broker is None:
+            config = settings.LIVE_UPDATES
+            cls._broker = import_string(config["BROKER"])(config.get("OPTIONS"))
+        return cls._broker
+
+    # === PUBLISHING ===
+
+    @classmethod
+    def transactions_changed(cls, action, added=(), removed=(), stale=False):
+        """added/removed: summaries (Transaction.SUMMARY_FIELDS) of the rows as they count now and as they did"""
+        by_user = defaultdict(lambda: ([], []))
+        for index, rows in enumerate((added, removed)):
+            for row in rows:
+                by_user[row[1]][index].append(row)
+
+        for user_id, (user_added, user_removed) in by_user.items():
+            if user_id is None or not cls.broker.has_subscribers(user_id):
+                continue
+            event = cls.get_event(action, user_added, user_removed, stale)
+            db_transaction.on_commit(lambda user_id=user_id, event=event: cls.publish(user_id, event))
+
+    @classmethod
+    def publish(cls, user_id, event):
+        try:
+            cls.broker.publish(user_id, event)
+        except Exception:
+            # Open pages miss an update; the write that caused it must not fail
+            logger.exception("Не вдалося надіслати подію оновлення")
+
+    @staticmethod
+    def get_event(action, added, removed, stale):
+        ids = sorted({row[0] for row in added + removed if row[0] is not None})
+        if stale:
+            return {"action": action, "ids": ids, "stale": True, "deltas": []}
+
+        from ..models import Table
+
+        deltas = {}
+        for sign, rows in ((1, added), (-1, removed)):
+            for _, _, table_id, category_id, currency, day, amount in rows:
+                delta = deltas.setdefault((table_id, category_id, currency, day), [Decimal(0), 0])
+                delta[0] += sign * amount
+                delta[1] += sign
+
+        # An edit that doesn't move the amount leaves zero deltas behind
+        deltas = {key: value for key, value in deltas.items() if any(value)}
+        titles = dict(Table.objects.filter(pk__in={key[0] for key in deltas}).values_list("pk", "title"))
+        # Subcategories count towards their parent, like on the analytics page
+        nodes = {node["id"]: node for node in CategoryTree.get_nodes()}
+        categories = {
+            pk: nodes[node["parent_id"]]["name"] if node["parent_id"] else node["name"] for pk, node in nodes.items()
+        }
+
+        return {
+            "action": action,
+            "ids": ids,
+            "stale": False,
+            "deltas": [
+                {
+                    "table": table_id,
+                    "table_title": titles.get(table_id),
+                    "category": categories.get(category_id),
+                    "currency": currency,
+                    "date": day.isoformat(),
+                    "amount": str(amount),
+                    "count": count,
+                }
+                for (table_id, category_id, currency, day), (amount, count) in deltas.items()
+            ],
+        }
+
+    # === STREAMING ===
+
+    @staticmethod
+    def can_stream(request):
+        """
+        Whether /events/ is served for this request. Under WSGI an async stream is read to the end before
+        anything is sent, which for an endless stream means never, while the worker is held
+        """
+        return isinstance(request, ASGIRequest)
+
+    @classmethod
+    def subscribe(cls, user_id):
+        return cls.broker.subscribe(user_id)
+
+    @classmethod
+    async def aformat(cls, event):
+        """An event as an SSE message, with amounts converted to UAH at the current rates"""
+        from ..models import Transaction
+
+        if event["deltas"]:
+            rates = await CurrencyConverter.aget_exchange_rates()
+            currency_labels = dict(Transaction.CURRENCY_CHOICES)
+            for delta in event["deltas"]:
+                amount = Decimal(delta["amount"])
+                converted = rates and CurrencyConverter.convert_with_rates(amount, delta["currency"], "UAH", rates)
+                delta["amount_uah"] = round(converted or float(amount), 2)
+                delta["currency_label"] = currency_labels.get(delta["currency"], delta["currency"])
+                # Labels as the analytics charts have them
+                delta["month_label"] = date.fromisoformat(delta["date"]).strftime("%b %Y")
+        return f"event: transactions\ndata: {json.dumps(event, ensure_ascii=False)}\n\n"
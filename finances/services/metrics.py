@@ -0,0 +1,194 @@
+import logging
+import math
+import threading
+from collections import defaultdict, deque
+from contextvars import ContextVar
+from time import perf_counter
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+# Metrics of the request being served; contextvars follow the request into sync_to_async threads,
+# so queries made by async views are counted too
+_current_request = ContextVar("request_metrics", default=None)
+
+
+class RequestRecord:
+    """Counters collected while one request is served"""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.counters = defaultdict(int)
+
+    @property
+    def duration(self):
+        return perf_counter() - self.started
+
+
+class Histogram:
+    """Sample window for one series; quantiles are computed over the most recent observations"""
+
+    WINDOW = 1000
+
+    def __init__(self):
+        self.samples = deque(maxlen=self.WINDOW)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value):
+        self.samples.append(value)
+        self.count += 1
+        self.sum += value
+
+    def snapshot(self):
+        return sorted(self.samples), self.count, self.sum
+
+    @staticmethod
+    def quantile(ordered, q):
+        if not ordered:
+            return math.nan
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class Metrics:
+    """
+    In-process request metrics exported in Prometheus text format.
+
+    Every worker process keeps its own numbers, so scrape each worker (or run a single one)
+    to get the full picture.
+    """
+
+    PREFIX = "finances"
+    QUANTILES = (0.5, 0.95, 0.99)
+    HISTOGRAMS = {
+        "request_duration_seconds": "Повний час обробки запиту",
+        "db_queries": "Кількість SQL-запитів на запит",
+        "db_duration_seconds": "Час у базі даних на запит",
+    }
+    COUNTERS = {
+        "requests_total": "Кількість запитів",
+        "cache_hits_total": "Влучання в кеш",
+        "cache_misses_total": "Промахи кешу",
+        "rate_provider_calls_total": "Звернення до API курсів валют",
+        "query_budget_exceeded_total": "Перевищення бюджету SQL-запитів",
+    }
+
+    _lock = threading.Lock()
+    _histograms = defaultdict(Histogram)
+    _counters = defaultdict(int)
+
+    # === COLLECTING ===
+
+    @classmethod
+    def start_request(cls):
+        record = RequestRecord()
+        return record, _current_request.set(record)
+
+    @classmethod
+    def end_request(cls, token):
+        _current_request.reset(token)
+
+    @classmethod
+    def track(cls, name, amount=1):
+        """Count an event (cache hit, provider call, ...) against the current request, if any"""
+        record = _current_request.get()
+        if record is not None:
+            record.counters[name] += amount
+
+    @staticmethod
+    def query_wrapper(execute, sql, params, many, context):
+        """Database execute wrapper timing every query of the current request"""
+        record = _current_request.get()
+        if record is None:
+            return execute(sql, params, many, context)
+
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            record.queries += 1
+            record.db_time += perf_counter() - started
+
+    @classmethod
+    def install_query_wrapper(cls, sender, connection, **kwargs):
+        """connection_created receiver"""
+        if cls.query_wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(cls.query_wrapper)
+
+    @classmethod
+    def observe(cls, view, status, record):
+        duration = record.duration
+        with cls._lock:
+            cls._counters[("requests_total", view, str(status))] += 1
+            cls._histograms[("request_duration_seconds", view)].observe(duration)
+            cls._histograms[("db_queries", view)].observe(record.queries)
+            cls._histograms[("db_duration_seconds", view)].observe(record.db_time)
+            for name, amount in record.counters.items():
+                cls._counters[(f"{name}_total", view, None)] += amount
+
+        budget = cls.get_query_budget(view)
+        if budget is not None and record.queries > budget:
+            with cls._lock:
+                cls._counters[("query_budget_exceeded_total", view, None)] += 1
+            logger.warning(
+                f"{view}: {record.queries} SQL-запитів при бюджеті {budget} "
+                f"({record.db_time * 1000:.1f} мс у БД, {duration * 1000:.1f} мс загалом)"
+            )
+
+    @staticmethod
+    def get_query_budget(view):
+        return getattr(settings, "METRICS_QUERY_BUDGETS", {}).get(view)
+
+    @classmethod
+    def reset(cls):
+        with cls._lock:
+            cls._histograms.clear()
+            cls._counters.clear()
+
+    # === EXPORT ===
+
+    @classmethod
+    def render(cls):
+        """All metrics in Prometheus text exposition format"""
+        with cls._lock:
+            histograms = {key: histogram.snapshot() for key, histogram in cls._histograms.items()}
+            counters = dict(cls._counters)
+
+        lines = []
+        for name, help_text in cls.COUNTERS.items():
+            series = sorted((key, value) for key, value in counters.items() if key[0] == name)
+            if not series:
+                continue
+            lines.append(f"# HELP {cls.PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {cls.PREFIX}_{name} counter")
+            for (_, view, status), value in series:
+                labels = {"view": view} if status is None else {"view": view, "status": status}
+                lines.append(f"{cls.PREFIX}_{name}{cls.format_labels(labels)} {value}")
+
+        for name, help_text in cls.HISTOGRAMS.items():
+            series = sorted((key[1], value) for key, value in histograms.items() if key[0] == name)
+            if not series:
+                continue
+            # Exported as a summary: the quantiles come from the recent sample window
+            lines.append(f"# HELP {cls.PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {cls.PREFIX}_{name} summary")
+            for view, (ordered, count, total) in series:
+                for q in cls.QUANTILES:
+                    labels = cls.format_labels({"view": view, "quantile": str(q)})
+                    lines.append(f"{cls.PREFIX}_{name}{labels} {Histogram.quantile(ordered, q):.6g}")
+                labels = cls.format_labels({"view": view})
+                lines.append(f"{cls.PREFIX}_{name}_sum{labels} {total:.6g}")
+                lines.append(f"{cls.PREFIX}_{name}_count{labels} {count}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def format_labels(labels):
+        pairs = []
+        for key, value in labels.items():
+            value = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+            pairs.append(f'{key}="{value}"')
+        return "{" + ",".join(pairs) + "}"
@@ -0,0 +1,200 @@
+import cProfile
+import json
+import logging
+import re
+import threading
+import traceback
+import uuid
+from contextvars import ContextVar
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+_current_profiler = ContextVar("request_profiler", default=None)
+
+
+class RequestProfiler:
+    """
+    cProfile run of a single request plus every SQL query it made, with the code that issued it.
+
+    Saved as <id>.prof (open with snakeviz, pstats, ...) and <id>.json (request info and queries).
+
+    One request is profiled at a time per process: a profiler is process-wide (on Python 3.12+ enabling a
+    second one raises ValueError), so a request asking while another is profiled is served unprofiled.
+    Calls made by other threads meanwhile land in the profile too; profile on a single-threaded server
+    for a clean picture.
+    """
+
+    QUERY_PARAM = "_profile"
+    HEADER = "HTTP_X_PROFILE"
+    MAX_QUERIES = 5000
+    STACK_DEPTH = 6
+    TOP_FUNCTIONS = 40
+    PROFILE_ID = re.compile(r"^[\w-]+$")
+
+    _lock = threading.Lock()
+
+    def __init__(self, request):
+        self.request = request
+        self.profile = cProfile.Profile()
+        self.queries = []
+        self.duration = None
+
+    @classmethod
+    def is_requested(cls, request):
+        return cls.QUERY_PARAM in request.GET or bool(request.META.get(cls.HEADER))
+
+    @classmethod
+    def get_directory(cls):
+        return Path(getattr(settings, "PROFILING_DIR", settings.BASE_DIR / "profiles"))
+
+    # === RECORDING ===
+
+    def start(self):
+        """Start profiling; False when another request is being profiled"""
+        if not self._lock.acquire(blocking=False):
+            return False
+        try:
+            self.profile.enable()
+        except BaseException:
+            self._lock.release()
+            raise
+        self.started = perf_counter()
+        self.token = _current_profiler.set(self)
+        return True
+
+    def stop(self):
+        try:
+            self.profile.disable()
+        finally:
+            self._lock.release()
+        _current_profiler.reset(self.token)
+        self.duration = perf_counter() - self.started
+
+    @staticmethod
+    def query_wrapper(execute, sql, params, many, context):
+        """Database execute wrapper; records queries while a profiled request is running"""
+        profiler = _current_profiler.get()
+        if profiler is None:
+            return execute(sql, params, many, context)
+
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            if len(profiler.queries) < profiler.MAX_QUERIES:
+                profiler.queries.append(
+                    {
+                        "sql": sql,
+                        "duration_ms": round((perf_counter() - started) * 1000, 3),
+                        "many": many,
+                        "origin": profiler.get_origin(),
+                    }
+                )
+
+    @classmethod
+    def install_query_wrapper(cls, sender, connection, **kwargs):
+        """connection_created receiver"""
+        if cls.query_wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(cls.query_wrapper)
+
+    def get_origin(self):
+        # Innermost project frames only: Django internals say nothing about which line is slow
+        base_dir = str(settings.BASE_DIR)
+        frames = [
+            f"{Path(frame.filename).relative_to(base_dir)}:{frame.lineno} in {frame.name}"
+            for frame in traceback.extract_stack()
+            if frame.filename.startswith(base_dir)
+            and "site-packages" not in frame.filename
+            and frame.filename != __file__
+            and frame.name != "query_wrapper"
+        ]
+        return frames[-self.STACK_DEPTH :]
+
+    def save(self, response, view_name):
+        directory = self.get_directory()
+        directory.mkdir(parents=True, exist_ok=True)
+
+        created_at = timezone.now()
+        profile_id = f"{created_at:%Y%m%d-%H%M%S}-{uuid.uuid4().hex[:8]}"
+        self.profile.dump_stats(directory / f"{profile_id}.prof")
+
+        meta = {
+            "id": profile_id,
+            "created_at": created_at.isoformat(),
+            "method": self.request.method,
+            "path": self.request.get_full_path(),
+            "view": view_name,
+            "user": self.request.user.get_username(),
+            "status": response.status_code,
+            "duration_ms": round(self.duration * 1000, 2),
+            "queries": self.queries,
+        }
+        with open(directory / f"{profile_id}.json", "w", encoding="utf-8") as f:
+            json.dump(meta, f, ensure_ascii=False)
+
+        logger.info(f"Профіль запиту {meta['path']} збережено: {profile_id}")
+        return profile_id
+
+    # === READING ===
+
+    @classmethod
+    def get_prof_path(cls, profile_id):
+        if not cls.PROFILE_ID.match(profile_id):
+            return None
+        path = cls.get_directory() / f"{profile_id}.prof"
+        return path if path.exists() else None
+
+    @classmethod
+    def load(cls, profile_id):
+        """Summary of a saved profile: request info, hottest functions and queries grouped by SQL"""
+        # Only the summary page needs pstats, so workers don't pay for importing it
+        import pstats
+
+        prof_path = cls.get_prof_path(profile_id)
+        if prof_path is None:
+            return None
+
+        with open(prof_path.with_suffix(".json"), encoding="utf-8") as f:
+            meta = json.load(f)
+
+        stats = pstats.Stats(str(prof_path))
+        functions = sorted(stats.stats.items(), key=lambda item: item[1][3], reverse=True)
+        meta["functions"] = [
+            {
+                "function": pstats.func_std_string(function),
+                "calls": calls,
+                "tottime_ms": round(tottime * 1000, 2),
+                "cumtime_ms": round(cumtime * 1000, 2),
+            }
+            for function, (_, calls, tottime, cumtime, _) in functions[: cls.TOP_FUNCTIONS]
+        ]
+
+        # Repeated statements from the same place are the usual N+1 suspects
+        groups = {}
+        for query in meta["queries"]:
+            origin = query["origin"][-1] if query["origin"] else ""
+            group = groups.setdefault((query["sql"], origin), {**query, "count": 0, "total_ms": 0})
+            group["count"] += 1
+            group["total_ms"] = round(group["total_ms"] + query["duration_ms"], 3)
+        meta["query_groups"] = sorted(groups.values(), key=lambda group: group["total_ms"], reverse=True)
+        meta["db_time_ms"] = round(sum(query["duration_ms"] for query in meta["queries"]), 2)
+        return meta
+
+    @classmethod
+    def list_profiles(cls, limit=50):
+        directory = cls.get_directory()
+        if not directory.exists():
+            return []
+
+        profiles = []
+        for path in sorted(directory.glob("*.json"), reverse=True)[:limit]:
+            with open(path, encoding="utf-8") as f:
+                meta = json.load(f)
+            meta["query_count"] = len(meta.pop("queries"))
+            profiles.append(meta)
+        return profiles
@@ -0,0 +1,66 @@
+import logging
+import re
+import threading
+from time import monotonic
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+
+class SQLiteTuning:
+    """
+    Applies settings.SQLITE_PRAGMAS to every new SQLite connection and keeps the query planner statistics fresh.
+
+    WAL lets readers work while a write is in progress, synchronous=NORMAL is durable in WAL mode except on
+    power loss, and mmap/cache_size keep hot pages out of read() calls.
+    """
+
+    PRAGMA_NAME = re.compile(r"^[a-z_]+$")
+    DEFAULT_OPTIMIZE_INTERVAL = 3600
+
+    _lock = threading.Lock()
+    _last_optimize = None
+
+    @staticmethod
+    def get_pragmas():
+        return getattr(settings, "SQLITE_PRAGMAS", {})
+
+    @classmethod
+    def apply_pragmas(cls, cursor, pragmas):
+        for name, value in pragmas.items():
+            if not cls.PRAGMA_NAME.match(name):
+                raise ValueError(f"Некоректна назва PRAGMA: {name}")
+            cursor.execute(f"PRAGMA {name} = {value}")
+
+    @classmethod
+    def configure_connection(cls, sender, connection, **kwargs):
+        """connection_created receiver"""
+        if connection.vendor != "sqlite":
+            return
+
+        pragmas = cls.get_pragmas()
+        with connection.cursor() as cursor:
+            if pragmas:
+                cls.apply_pragmas(cursor, pragmas)
+            if cls.optimize_due():
+                # Only re-analyzes tables whose statistics are stale, usually a no-op taking microseconds
+                cursor.execute("PRAGMA optimize")
+                logger.debug("PRAGMA optimize виконано")
+
+    @classmethod
+    def optimize_due(cls):
+        interval = getattr(settings, "SQLITE_OPTIMIZE_INTERVAL", cls.DEFAULT_OPTIMIZE_INTERVAL)
+        if not interval:
+            return False
+
+        now = monotonic()
+        with cls._lock:
+            # The first connection of a process only starts the clock
+            if cls._last_optimize is None:
+                cls._last_optimize = now
+                return False
+            if now - cls._last_optimize < interval:
+                return False
+            cls._last_optimize = now
+        return True
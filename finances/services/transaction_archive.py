@@ -0,0 +1,240 @@
+import heapq
+import logging
+from datetime import timedelta
+from decimal import Decimal
+from itertools import islice
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction as db_transaction
+from django.db.models import Max, QuerySet, Sum, Value
+from django.utils import timezone
+
+from ..models import ArchivedTransaction, Transaction, TransactionRollup
+
+logger = logging.getLogger(__name__)
+
+
+class TransactionArchive:
+    """
+    Cold storage for old transactions.
+
+    archive() folds transactions dated before the horizon into monthly TransactionRollup rows and moves them to
+    ArchivedTransaction, so the hot table and its indexes only hold recent history. Readers look at the archive
+    only when their date range reaches the newest archived date, and use the rollups for whole-history totals.
+    """
+
+    CACHE_KEY = "transaction_archive"
+    CACHE_TIMEOUT = 24 * 3600  # Invalidated by archive()
+    BATCH_SIZE = 2000
+
+    @classmethod
+    def get_horizon(cls, days=None):
+        """Transactions before this date are archived: whole months older than ARCHIVE_AFTER_DAYS"""
+        days = settings.ARCHIVE_AFTER_DAYS if days is None else days
+        return (timezone.localdate() - timedelta(days=days)).replace(day=1)
+
+    # === READING ===
+
+    @classmethod
+    def get_cache_key(cls, user_id):
+        return f"{cls.CACHE_KEY}:{user_id}"
+
+    @classmethod
+    def get_archived_until(cls, user):
+        """Date of the user's newest archived transaction, None when nothing is archived"""
+        key = cls.get_cache_key(user.pk)
+        archived_until = cache.get(key)
+        if archived_until is None:
+            # False marks "nothing archived", so that answer is cached too
+            archived_until = ArchivedTransaction.objects.owned_by(user).aggregate(date=Max("date"))["date"] or False
+            cache.add(key, archived_until, cls.CACHE_TIMEOUT)
+        return archived_until or None
+
+    @classmethod
+    async def aget_archived_until(cls, user):
+        key = cls.get_cache_key(user.pk)
+        archived_until = await cache.aget(key)
+        if archived_until is None:
+            newest = await ArchivedTransaction.objects.owned_by(user).aaggregate(date=Max("date"))
+            archived_until = newest["date"] or False
+            await cache.aadd(key, archived_until, cls.CACHE_TIMEOUT)
+        return archived_until or None
+
+    @staticmethod
+    def reaches(archived_until, date_from):
+        """Whether a date range starting at date_from (None: unbounded) includes archived transactions"""
+        return archived_until is not None and (date_from is None or date_from <= archived_until)
+
+    # === ARCHIVING ===
+
+    @classmethod
+    def archive(cls, before, batch_size=None, progress=None):
+        """
+        Moves every transaction dated before `before` into the archive; returns how many were moved.
+        progress(moved) is called after every batch.
+        """
+        batch_size = batch_size or cls.BATCH_SIZE
+        moved = 0
+        user_ids = set()
+
+        while True:
+            # Each batch is folded, copied and deleted atomically, so an interrupted run can simply be restarted
+            with db_transaction.atomic():
+                batch = list(Transaction.objects.filter(date__lt=before).order_by()[:batch_size])
+                if not batch:
+                    break
+                cls.add_to_rollups(batch)
+                ArchivedTransaction.objects.bulk_create(
+                    [ArchivedTransaction.from_transaction(transaction) for transaction in batch]
+                )
+                # A move rather than a deletion, so without the tombstones TransactionQuerySet.delete() records
+                moved_rows = Transaction.objects.filter(pk__in=[transaction.pk for transaction in batch])
+                QuerySet.delete(moved_rows)
+
+            moved += len(batch)
+            user_ids.update(transaction.user_id for transaction in batch)
+            if progress is not None:
+                progress(moved)
+
+        cache.delete_many([cls.get_cache_key(user_id) for user_id in user_ids])
+        logger.info(f"Архівовано транзакцій до {before}: {moved}")
+        return moved
+
+    @staticmethod
+    def add_to_rollups(transactions):
+        """Adds the transactions to the monthly rollups, creating the missing ones"""
+        groups = {}
+        for transaction in transactions:
+            key = (
+                transaction.user_id,
+                transaction.table_id,
+                transaction.category_id,
+                transaction.currency,
+                transaction.date.replace(day=1),
+            )
+            total, count, max_amount = groups.get(key, (Decimal(0), 0, transaction.amount))
+            groups[key] = (total + transaction.amount, count + 1, max(max_amount, transaction.amount))
+
+        existing = {
+            (rollup.user_id, rollup.table_id, rollup.category_id, rollup.currency, rollup.month): rollup
+            for rollup in TransactionRollup.objects.filter(
+                user_id__in={key[0] for key in groups}, month__in={key[4] for key in groups}
+            )
+        }
+
+        created, updated = [], []
+        for key, (total, count, max_amount) in groups.items():
+            rollup = existing.get(key)
+            if rollup is None:
+                user_id, table_id, category_id, currency, month = key
+                created.append(
+                    TransactionRollup(
+                        user_id=user_id,
+                        table_id=table_id,
+                        category_id=category_id,
+                        currency=currency,
+                        month=month,
+                        total=total,
+                        transaction_count=count,
+                        max_amount=max_amount,
+                    )
+                )
+            else:
+                rollup.total += total
+                rollup.transaction_count += count
+                rollup.max_amount = max(rollup.max_amount, max_amount)
+                updated.append(rollup)
+
+        TransactionRollup.objects.bulk_create(created)
+        TransactionRollup.objects.bulk_update(updated, ["total", "transaction_count", "max_amount"])
+
+
+class CombinedTransactions:
+    """
+    Hot and archived transactions matching the same filters, as one sequence in list order (newest first).
+
+    Supports count() and slicing, which is all Paginator needs: a page reads the ids of its rows from a UNION of
+    both tables, then loads each side's rows by id. When no date filter applies, totals come from the rollups
+    instead of the archived rows.
+    """
+
+    def __init__(self, hot, archived, rollups=None):
+        self.hot = hot
+        self.archived = archived
+        self.rollups = rollups
+
+    def count(self):
+        if self.rollups is not None:
+            archived = self.rollups.aggregate(count=Sum("transaction_count"))["count"] or 0
+        else:
+            archived = self.archived.count()
+        return self.hot.count() + archived
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        hot_keys = (
+            self.hot.order_by().annotate(archived=Value(False)).values_list("pk", "archived", "date", "created_at")
+        )
+        archived_keys = (
+            self.archived.order_by().annotate(archived=Value(True)).values_list("pk", "archived", "date", "created_at")
+        )
+        keys = [
+            (pk, bool(archived))
+            for pk, archived, _, _ in hot_keys.union(archived_keys, all=True).order_by("-date", "-created_at")[index]
+        ]
+
+        loaded = {
+            False: self.hot.in_bulk([pk for pk, archived in keys if not archived]),
+            True: self.archived.in_bulk([pk for pk, archived in keys if archived]),
+        }
+        # A row deleted between the two queries is skipped
+        return [loaded[archived][pk] for pk, archived in keys if pk in loaded[archived]]
+
+    def currency_totals(self):
+        totals = {
+            row["currency"]: row["total"]
+            for row in self.hot.order_by().values("currency").annotate(total=Sum("amount"))
+        }
+        if self.rollups is not None:
+            archived = self.rollups.order_by().values("currency").annotate(total=Sum("total"))
+        else:
+            archived = self.archived.order_by().values("currency").annotate(total=Sum("amount"))
+        for row in archived:
+            totals[row["currency"]] = totals.get(row["currency"], 0) + row["total"]
+        return totals
+
+
+class MergedTransactions(CombinedTransactions):
+    """
+    CombinedTransactions for a date range with no start, e.g. the unfiltered list.
+
+    A page is merged from the newest rows of each table, read through the (user, date) indexes, instead of a
+    UNION over both. Archived rows are never newer than archived_until, so hot rows dated after it come first
+    and the archive is read only for the part of a page they don't fill: the first pages usually don't read it.
+    """
+
+    def __init__(self, hot, archived, rollups=None, archived_until=None):
+        super().__init__(hot, archived, rollups)
+        self.archived_until = archived_until
+
+    def __getitem__(self, index):
+        if not isinstance(index, slice):
+            return self[index : index + 1][0]
+
+        start, stop = index.start or 0, index.stop
+        hot = list(self.hot.order_by("-date", "-created_at")[:stop])
+        newer = sum(1 for transaction in hot if transaction.date > self.archived_until)
+        if newer >= stop:
+            return hot[start:stop]
+
+        archived = list(self.archived.order_by("-date", "-created_at")[: stop - newer])
+        merged = heapq.merge(
+            hot, archived, key=lambda transaction: (transaction.date, transaction.created_at), reverse=True
+        )
+        return list(islice(merged, start, stop))
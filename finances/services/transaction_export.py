@@ -0,0 +1,190 @@
+import csv
+import re
+import zipfile
+from xml.sax.saxutils import escape
+
+from .currency_converter import CurrencyConverter
+
+# Characters that are not allowed in XML 1.0 documents
+ILLEGAL_XML_CHARS = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f]")
+
+# Spreadsheets read a CSV cell starting with one of these as a formula
+CSV_FORMULA_PREFIXES = ("=", "+", "-", "@", "\t", "\r")
+
+XLSX_CONTENT_TYPES = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">'
+    '<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>'
+    '<Default Extension="xml" ContentType="application/xml"/>'
+    '<Override PartName="/xl/workbook.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>'
+    '<Override PartName="/xl/worksheets/sheet1.xml" '
+    'ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>'
+    "</Types>"
+)
+
+XLSX_ROOT_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" '
+    'Target="xl/workbook.xml"/>'
+    "</Relationships>"
+)
+
+XLSX_WORKBOOK = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" '
+    'xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">'
+    '<sheets><sheet name="Транзакції" sheetId="1" r:id="rId1"/></sheets>'
+    "</workbook>"
+)
+
+XLSX_WORKBOOK_RELS = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">'
+    '<Relationship Id="rId1" '
+    'Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" '
+    'Target="worksheets/sheet1.xml"/>'
+    "</Relationships>"
+)
+
+XLSX_SHEET_START = (
+    '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>'
+    '<worksheet xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main"><sheetData>'
+)
+
+XLSX_SHEET_END = "</sheetData></worksheet>"
+
+
+class Echo:
+    """Pseudo-buffer for csv.writer: returns the written line instead of storing it"""
+
+    def write(self, value):
+        return value
+
+
+class StreamBuffer:
+    """Write-only, non-seekable buffer that hands out everything written since the last pop()"""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, data):
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self):
+        pass
+
+    def pop(self):
+        data = b"".join(self.chunks)
+        self.chunks.clear()
+        return data
+
+
+class TransactionExporter:
+    """Streams a transaction queryset as CSV or XLSX with constant memory usage"""
+
+    CHUNK_SIZE = 2000
+    FORMATS = {
+        "csv": ("text/csv; charset=utf-8", "csv"),
+        "xlsx": ("application/vnd.openxmlformats-officedocument.spreadsheetml.sheet", "xlsx"),
+    }
+    HEADERS = ["Дата", "Таблиця", "Категорія", "Підкатегорія", "Сума", "Валюта", "Опис"]
+    FIELDS = ("date", "table__title", "category__name", "category__parent__name", "amount", "currency", "description")
+
+    def __init__(self, queryset, convert_to=None, archived=None):
+        self.queryset = queryset
+        self.convert_to = convert_to
+        # Archived transactions with the same filters, when the date range reaches the archive
+        self.archived = archived
+
+    @property
+    def headers(self):
+        if self.convert_to:
+            return self.HEADERS + [f"Сума в {self.convert_to}"]
+        return self.HEADERS
+
+    def rows(self):
+        # Header goes out before the query runs, so the client gets the first byte immediately
+        yield self.headers
+
+        rates = {}
+        if self.convert_to:
+            rates = {
+                currency: CurrencyConverter.get_rate(currency, self.convert_to)
+                for currency, _ in self.queryset.model.CURRENCY_CHOICES
+            }
+
+        transactions = self.queryset.values_list(*self.FIELDS)
+        if self.archived is not None:
+            # A UNION can only be sorted by selected columns, so the combined file is ordered by date alone
+            archived = self.archived.values_list(*self.FIELDS).order_by()
+            transactions = transactions.order_by().union(archived, all=True).order_by("-date")
+
+        for date, table, category, parent_category, amount, currency, description in transactions.iterator(
+            chunk_size=self.CHUNK_SIZE
+        ):
+            if parent_category:
+                category, subcategory = parent_category, category
+            else:
+                subcategory = None
+
+            row = [date.isoformat(), table, category or "", subcategory or "", amount, currency, description]
+            if self.convert_to:
+                rate = rates.get(currency)
+                row.append(round(float(amount) * rate, 2) if rate else "")
+            yield row
+
+    def iter_csv(self):
+        writer = csv.writer(Echo())
+        # BOM so that Excel detects UTF-8 in Cyrillic text
+        yield "\ufeff"
+        for row in self.rows():
+            yield writer.writerow([self._csv_cell(value) for value in row])
+
+    def iter_xlsx(self):
+        buffer = StreamBuffer()
+
+        # A non-seekable file makes zipfile write data descriptors, so entries are flushed as they go
+        with zipfile.ZipFile(buffer, "w", compression=zipfile.ZIP_DEFLATED) as archive:
+            archive.writestr("[Content_Types].xml", XLSX_CONTENT_TYPES)
+            archive.writestr("_rels/.rels", XLSX_ROOT_RELS)
+            archive.writestr("xl/workbook.xml", XLSX_WORKBOOK)
+            archive.writestr("xl/_rels/workbook.xml.rels", XLSX_WORKBOOK_RELS)
+
+            with archive.open("xl/worksheets/sheet1.xml", "w", force_zip64=True) as sheet:
+                rows = self.rows()
+                sheet.write((XLSX_SHEET_START + self._xlsx_row(next(rows))).encode())
+                yield buffer.pop()
+
+                lines = []
+                for row in rows:
+                    lines.append(self._xlsx_row(row))
+                    if len(lines) >= self.CHUNK_SIZE:
+                        sheet.write("".join(lines).encode())
+                        lines.clear()
+                        yield buffer.pop()
+
+                sheet.write(("".join(lines) + XLSX_SHEET_END).encode())
+
+        yield buffer.pop()
+
+    @staticmethod
+    def _csv_cell(value):
+        # Text such as "=HYPERLINK(...)" in a description must stay text; the XLSX sheet stores it as a string
+        if isinstance(value, str) and value.startswith(CSV_FORMULA_PREFIXES):
+            return f"'{value}"
+        return value
+
+    @staticmethod
+    def _xlsx_row(row):
+        cells = []
+        for value in row:
+            if isinstance(value, str):
+                text = escape(ILLEGAL_XML_CHARS.sub("", value))
+                cells.append(f'<c t="inlineStr"><is><t xml:space="preserve">{text}</t></is></c>')
+            else:
+                cells.append(f"<c><v>{value}</v></c>")
+        return f"<row>{''.join(cells)}</row>"
@@ -0,0 +1,280 @@
+import csv
+import hashlib
+import io
+import logging
+import re
+from datetime import date, datetime
+from decimal import Decimal, InvalidOperation
+
+from django.db import transaction as db_transaction
+
+from ..models import ArchivedTransaction, Table, Transaction
+from .category_tree import CategoryTree
+
+logger = logging.getLogger(__name__)
+
+OFX_TOKEN = re.compile(r"<(/?)([A-Za-z0-9.]+)>([^<]*)")
+
+
+class ImportRowError(ValueError):
+    """A statement row that cannot be imported"""
+
+
+class ImportReport:
+    """Outcome of one statement import"""
+
+    MAX_ERRORS = 200  # Keep only the first errors, a broken 100k-line file must not blow up the page
+
+    def __init__(self):
+        self.created = 0
+        self.duplicates = 0
+        self.skipped = 0
+        self.error_count = 0
+        self.errors = []
+
+    def add_error(self, line, message):
+        self.error_count += 1
+        if len(self.errors) < self.MAX_ERRORS:
+            self.errors.append({"line": line, "message": message})
+
+    @property
+    def total(self):
+        return self.created + self.duplicates + self.skipped + self.error_count
+
+    def to_dict(self):
+        """JSON-serializable, with the same names the import page reads"""
+        return {
+            "created": self.created,
+            "duplicates": self.duplicates,
+            "skipped": self.skipped,
+            "error_count": self.error_count,
+            "errors": self.errors,
+            "total": self.total,
+        }
+
+
+class TransactionImporter:
+    """Imports a CSV or OFX bank statement into a table in batched bulk inserts"""
+
+    BATCH_SIZE = 500
+    DATE_FORMATS = ("%d.%m.%Y", "%d/%m/%Y", "%Y%m%d")
+    CSV_COLUMNS = {
+        "date": ("date", "дата"),
+        "amount": ("amount", "сума"),
+        "currency": ("currency", "валюта"),
+        "category": ("category", "категорія"),
+        "subcategory": ("subcategory", "підкатегорія"),
+        "description": ("description", "опис", "memo"),
+    }
+    MAX_AMOUNT = Decimal("99999999.99")
+
+    def __init__(self, table, uploaded_file, file_format="csv", default_currency="UAH", progress=None):
+        self.table = table
+        self.uploaded_file = uploaded_file
+        self.file_format = file_format
+        self.default_currency = default_currency
+        # progress(bytes_read, file_size) after every batch
+        self.progress = progress
+        self.currencies = {code for code, _ in Transaction.CURRENCY_CHOICES}
+        self.report = ImportReport()
+
+    def run(self):
+        categories = CategoryTree.get_lookup()
+        occurrences = {}
+        batch = []
+
+        text = io.TextIOWrapper(self.uploaded_file, encoding="utf-8-sig", errors="replace", newline="")
+        rows = self.parse_ofx(text) if self.file_format == "ofx" else self.parse_csv(text)
+
+        # Every batch commits on its own, so no write transaction outlasts SYNC_LAG_SECONDS and delta sync
+        # can't pass over rows that are still uncommitted. A run that fails half-way keeps its committed
+        # batches; the retry skips them by import hash
+        for line, row in rows:
+            try:
+                transaction = self.build_transaction(row, categories)
+            except ImportRowError as e:
+                self.report.add_error(line, str(e))
+                continue
+            if transaction is None:
+                self.report.skipped += 1
+                continue
+
+            # Identical rows inside one statement are legitimate (two coffees a day),
+            # so the n-th occurrence of a row gets its own hash
+            key = row.get("fitid") or "|".join(
+                [str(transaction.date), str(transaction.amount), transaction.currency, transaction.description]
+            )
+            occurrences[key] = occurrences.get(key, 0) + 1
+            transaction.import_hash = hashlib.sha256(f"{key}|{occurrences[key]}".encode()).hexdigest()
+
+            batch.append(transaction)
+            if len(batch) >= self.BATCH_SIZE:
+                self.flush(batch)
+                batch = []
+                if self.progress is not None:
+                    self.progress(self.uploaded_file.tell(), self.uploaded_file.size)
+
+        self.flush(batch)
+
+        text.detach()
+        logger.info(
+            f"Імпорт у таблицю {self.table.pk}: створено {self.report.created}, "
+            f"дублікатів {self.report.duplicates}, помилок {self.report.error_count}"
+        )
+        return self.report
+
+    def flush(self, batch):
+        if not batch:
+            return
+
+        with db_transaction.atomic():
+            # Imports into the same table take turns, so rows found missing here are still missing at the insert
+            # and the counts below are exact (SQLite serializes writers anyway)
+            list(Table.objects.select_for_update().filter(pk=self.table.pk).values_list("pk"))
+
+            hashes = [transaction.import_hash for transaction in batch]
+            existing = set(
+                Transaction.objects.filter(table=self.table, import_hash__in=hashes).values_list(
+                    "import_hash", flat=True
+                )
+            )
+            # Rows of an old statement may already have been archived
+            existing.update(
+                ArchivedTransaction.objects.filter(table=self.table, import_hash__in=hashes).values_list(
+                    "import_hash", flat=True
+                )
+            )
+            new_transactions = [transaction for transaction in batch if transaction.import_hash not in existing]
+
+            created = Transaction.objects.bulk_create(new_transactions)
+        self.report.created += len(created)
+        self.report.duplicates += len(batch) - len(new_transactions)
+
+    def build_transaction(self, row, categories):
+        """The row as an unsaved Transaction, None for income"""
+        transaction_date = self.parse_date(row.get("date", ""))
+        amount = self.parse_amount(row.get("amount", ""))
+        # Statements (CSV and OFX alike) list expenses as negative amounts; the tracker stores them as positive
+        # and has no place for incoming transfers
+        if amount > 0:
+            return None
+        amount = -amount
+
+        currency = (row.get("currency") or self.default_currency).strip().upper()
+        if currency not in self.currencies:
+            raise ImportRowError(f"Непідтримувана валюта '{currency}'")
+
+        category_id = None
+        category = (row.get("category") or "").strip()
+        subcategory = (row.get("subcategory") or "").strip()
+        if subcategory:
+            category_id = categories.get(f"{category} → {subcategory}".lower()) or categories.get(subcategory.lower())
+        elif category:
+            category_id = categories.get(category.lower())
+
+        return Transaction(
+            table=self.table,
+            amount=amount,
+            currency=currency,
+            date=transaction_date,
+            category_id=category_id,
+            description=(row.get("description") or "").strip(),
+        )
+
+    def parse_date(self, value):
+        value = value.strip()
+        try:
+            # Fast path for ISO dates, strptime is several times slower
+            return date.fromisoformat(value)
+        except ValueError:
+            pass
+
+        for date_format in self.DATE_FORMATS:
+            try:
+                return datetime.strptime(value, date_format).date()
+            except ValueError:
+                continue
+        raise ImportRowError(f"Некоректна дата '{value}'")
+
+    def parse_amount(self, value):
+        """Signed amount; "1 234,56", "1,234.56" and "1.234,56" are all 1234.56"""
+        raw = value.strip()
+        value = raw.replace("\u2212", "-")
+        for separator in (" ", "\xa0", "\u202f", "'"):
+            value = value.replace(separator, "")
+        # With both separators the last one is decimal; a repeated one groups thousands; a single comma is decimal
+        if "," in value and "." in value:
+            value = value.replace("," if value.rfind(",") < value.rfind(".") else ".", "")
+        for separator in (",", "."):
+            if value.count(separator) > 1:
+                value = value.replace(separator, "")
+        value = value.replace(",", ".")
+
+        try:
+            amount = Decimal(value).quantize(Decimal("0.01"))
+        except InvalidOperation:
+            raise ImportRowError(f"Некоректна сума '{raw}'")
+
+        if not amount.is_finite() or not amount or abs(amount) > self.MAX_AMOUNT:
+            raise ImportRowError(f"Сума поза допустимими межами: {raw}")
+        return amount
+
+    def parse_csv(self, text):
+        sample = text.read(4096)
+        text.seek(0)
+        try:
+            dialect = csv.Sniffer().sniff(sample, delimiters=",;\t")
+        except csv.Error:
+            dialect = csv.excel
+
+        reader = csv.reader(text, dialect)
+        header = [column.strip().lower() for column in next(reader, [])]
+        columns = {
+            key: header.index(alias)
+            for key, aliases in self.CSV_COLUMNS.items()
+            for alias in aliases
+            if alias in header
+        }
+
+        if "date" not in columns or "amount" not in columns:
+            self.report.add_error(1, "У файлі немає колонок з датою та сумою")
+            return
+
+        for line, values in enumerate(reader, start=2):
+            if not any(values):
+                continue
+            yield line, {key: values[index] if index < len(values) else "" for key, index in columns.items()}
+
+    def parse_ofx(self, text):
+        # Works for both SGML (OFX 1.x, unclosed leaf tags) and XML (OFX 2.x) statements
+        currency = None
+        current = None
+        start_line = 0
+
+        for line, content in enumerate(text, start=1):
+            for closing, tag, value in OFX_TOKEN.findall(content):
+                tag = tag.upper()
+                value = value.strip()
+
+                if tag == "STMTTRN":
+                    if closing and current is not None:
+                        yield from self.ofx_row(start_line, current, currency)
+                        current = None
+                    elif not closing:
+                        current, start_line = {}, line
+                elif closing:
+                    continue
+                elif tag == "CURDEF":
+                    currency = value
+                elif current is not None and value:
+                    current[tag] = value
+
+    def ofx_row(self, line, values, currency):
+        description = " ".join(value for value in (values.get("NAME"), values.get("MEMO")) if value)
+        yield line, {
+            "date": values.get("DTPOSTED", "")[:8],
+            "amount": values.get("TRNAMT", ""),
+            "currency": currency or "",
+            "description": description,
+            "fitid": values.get("FITID"),
+        }
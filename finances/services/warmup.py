@@ -0,0 +1,74 @@
+import logging
+from pathlib import Path
+from time import perf_counter
+
+from django.conf import settings
+from django.db import connections
+from django.template import engines
+from django.urls import get_resolver
+
+from .category_tree import CategoryTree
+from .currency_converter import CurrencyConverter
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    """Fills the caches a new worker would otherwise build on its first requests"""
+
+    @classmethod
+    def get_steps(cls):
+        return [
+            ("urls", cls.load_urls),
+            ("templates", cls.load_templates),
+            ("category_tree", CategoryTree.get_nodes),
+            ("exchange_rates", CurrencyConverter.get_exchange_rates),
+        ]
+
+    @classmethod
+    def run(cls):
+        """Run every step; returns {step: milliseconds}. A failing step is logged and skipped"""
+        report = {}
+        for name, step in cls.get_steps():
+            started = perf_counter()
+            try:
+                step()
+            except Exception as e:
+                logger.warning(f"Прогрів '{name}' не вдався: {e}")
+            report[name] = round((perf_counter() - started) * 1000, 2)
+
+        logger.info(f"Прогрів завершено за {sum(report.values()):.0f} мс: {report}")
+        return report
+
+    @classmethod
+    def run_in_worker(cls):
+        """
+        Warmup for a server worker that has just started (gunicorn post_worker_init, see config/gunicorn.conf.py).
+
+        The connections opened here are closed, so the worker's first request starts with fresh ones.
+        """
+        if not getattr(settings, "WARMUP_ON_STARTUP", False):
+            return None
+        try:
+            return cls.run()
+        finally:
+            connections.close_all()
+
+    @staticmethod
+    def load_urls():
+        # Builds the resolver's reverse lookup tables
+        get_resolver()._populate()
+
+    @staticmethod
+    def load_templates():
+        """Compile the project's templates into the cached template loader"""
+        base_dir = Path(settings.BASE_DIR)
+        count = 0
+        for engine in engines.all():
+            for directory in map(Path, engine.template_dirs):
+                if not directory.is_relative_to(base_dir) or "site-packages" in directory.parts:
+                    continue
+                for path in directory.rglob("*.html"):
+                    engine.get_template(path.relative_to(directory).as_posix())
+                    count += 1
+        return count
@@ -0,0 +1,46 @@
+from django.contrib.auth import get_user_model
+from django.core.signals import setting_changed
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .models import Category, Table, Tombstone, Transaction, transactions_changed
+from .services.category_tree import CategoryTree
+from .services.live_updates import LiveUpdates
+
+
+@receiver(post_save, sender=Category)
+@receiver(post_delete, sender=Category)
+def invalidate_category_tree(sender, **kwargs):
+    # Any change to a category (including admin actions) drops the cached tree
+    CategoryTree.invalidate()
+
+
+def deleted_with_user(origin):
+    # Everything of a deleted user goes at once, there is no one left to sync with
+    model = origin.model if isinstance(origin, QuerySet) else type(origin)
+    return issubclass(model, get_user_model())
+
+
+@receiver(post_delete, sender=Table)
+def record_table_tombstone(sender, instance, origin=None, **kwargs):
+    # The table's transactions go with it; sync clients drop them together with the table
+    if not deleted_with_user(origin):
+        Tombstone.record(Tombstone.TABLE, [(instance.pk, instance.user_id)])
+
+
+@receiver(post_delete, sender=Category)
+def record_category_tombstone(sender, instance, **kwargs):
+    Tombstone.record(Tombstone.CATEGORY, [(instance.pk, None)])
+
+
+@receiver(transactions_changed, sender=Transaction)
+def publish_live_update(sender, action, added=(), removed=(), stale=False, **kwargs):
+    LiveUpdates.transactions_changed(action, added, removed, stale)
+
+
+@receiver(setting_changed)
+def reset_live_updates_broker(setting, **kwargs):
+    # override_settings(LIVE_UPDATES=...) in tests swaps the broker
+    if setting == "LIVE_UPDATES":
+        LiveUpdates._broker = None
@@ -0,0 +1,47 @@
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+
+from users.models import User
+
+from ..models import Table
+from ..services.currency_converter import CurrencyConverter
+
+# Both tiers in memory, so tests neither read nor leave entries in the real shared cache
+TEST_CACHES = {
+    "default": {
+        "BACKEND": "finances.cache.TwoTierCache",
+        "LOCATION": "shared",
+        "KEY_PREFIX": "default",
+        "OPTIONS": {"SYNC_INTERVAL": 0},
+    },
+    "template_fragments": {
+        "BACKEND": "finances.cache.TwoTierCache",
+        "LOCATION": "shared",
+        "KEY_PREFIX": "fragments",
+        "OPTIONS": {"BROADCAST": False},
+    },
+    "shared": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache", "LOCATION": "finances-tests"},
+}
+
+
+@override_settings(CACHES=TEST_CACHES, OPENEXCHANGERATES_API_KEY=None)
+class FinancesTestCase(TestCase):
+    """TestCase with isolated caches and a user with a table"""
+
+    def setUp(self):
+        super().setUp()
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = self.create_user("owner@example.com")
+        self.table = Table.objects.create(user=self.user, title="Основна")
+
+    @staticmethod
+    def set_rates(rates=None):
+        """Exchange rates as the provider would return them, against USD"""
+        if rates is None:
+            rates = {"USD": 1.0, "UAH": 40.0, "EUR": 0.8}
+        caches["default"].set(CurrencyConverter.CACHE_KEY, rates)
+
+    @staticmethod
+    def create_user(email, password="pass-12345"):
+        return User.objects.create_user(email=email, password=password)
@@ -0,0 +1,87 @@
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.models import User
+
+from ..admin import EstimatedCountPaginator
+from ..models import Category, Table, Transaction
+from .base import FinancesTestCase
+
+
+class AdminTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.admin = User.objects.create_superuser(email="admin@example.com", password="pass-12345")
+        self.client.force_login(self.admin)
+        self.category = Category.objects.get(name="Ринок")
+        self.other_table = Table.objects.create(user=self.create_user("other@example.com"), title="Інша")
+
+    def add_transactions(self, count, table=None):
+        Transaction.objects.bulk_create(
+            Transaction(
+                table=table or self.table, amount=Decimal(index + 1), date=date(2026, 3, 1), category=self.category
+            )
+            for index in range(count)
+        )
+
+    def changelist(self, model, **params):
+        response = self.client.get(reverse(f"admin:finances_{model}_changelist"), params)
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_transaction_changelist_queries_do_not_grow(self):
+        self.add_transactions(5)
+        self.changelist("transaction")
+        with CaptureQueriesContext(connection) as few:
+            self.changelist("transaction")
+        self.add_transactions(50, table=self.other_table)
+        with CaptureQueriesContext(connection) as many:
+            self.changelist("transaction")
+        self.assertEqual(len(few), len(many))
+
+    def test_autocomplete_filters(self):
+        self.add_transactions(2)
+        self.add_transactions(3, table=self.other_table)
+        response = self.changelist("transaction", table__id__exact=self.other_table.pk)
+        self.assertEqual(response.context["cl"].result_count, 3)
+        response = self.changelist("transaction", user__id__exact=self.user.pk)
+        self.assertEqual(response.context["cl"].result_count, 2)
+
+        # A malformed value is reported like any other bad lookup
+        response = self.client.get(reverse("admin:finances_transaction_changelist"), {"table__id__exact": "x"})
+        self.assertRedirects(response, reverse("admin:finances_transaction_changelist") + "?e=1")
+
+    def test_category_counts(self):
+        self.add_transactions(4)
+        response = self.changelist("category")
+        category = next(obj for obj in response.context["cl"].result_list if obj.pk == self.category.pk)
+        self.assertEqual(category.transactions_total, 4)
+        parent = next(obj for obj in response.context["cl"].result_list if obj.pk == self.category.parent_id)
+        self.assertEqual(parent.subcategories_total, Category.objects.filter(parent=parent).count())
+
+    def test_table_change_page_links_to_transactions(self):
+        self.add_transactions(3)
+        response = self.client.get(reverse("admin:finances_table_change", args=[self.table.pk]))
+        self.assertContains(response, f"?table__id__exact={self.table.pk}")
+        self.assertContains(response, "3 транзакцій")
+
+
+class EstimatedCountPaginatorTests(FinancesTestCase):
+    def test_small_or_unanalyzed_tables_are_counted(self):
+        Transaction.objects.create(table=self.table, amount=Decimal("1"), date=date(2026, 3, 1))
+        self.assertEqual(EstimatedCountPaginator(Transaction.objects.all(), 10).count, 1)
+
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        self.assertEqual(EstimatedCountPaginator.get_estimate(Transaction._meta.db_table), 1)
+
+    def test_unfiltered_large_table_uses_estimate(self):
+        with mock.patch.object(EstimatedCountPaginator, "get_estimate", return_value=250000):
+            self.assertEqual(EstimatedCountPaginator(Transaction.objects.all(), 10).count, 250000)
+            # Filtered lists are always exact
+            self.assertEqual(EstimatedCountPaginator(Transaction.objects.filter(currency="USD"), 10).count, 0)
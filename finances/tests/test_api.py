@@ -0,0 +1,176 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+from django.conf import settings
+from django.test import Client
+from django.urls import reverse
+
+from users.models import ApiToken
+
+from ..models import Category, Table, Transaction
+from .base import FinancesTestCase
+
+
+class ApiTestCase(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.token, self.key = ApiToken.issue(self.user, "Телефон")
+        # CSRF is checked here as in production
+        self.client = Client(enforce_csrf_checks=True)
+
+    def call(self, method, name, data=None, key=None, **extra):
+        if key is not None:
+            extra["HTTP_AUTHORIZATION"] = f"Bearer {key}"
+        url = name if name.startswith("http") or name.startswith("/") else reverse(f"api_v1:{name}")
+        if method == "get":
+            return self.client.get(url, data, **extra)
+        body = json.dumps(data) if data is not None else ""
+        return getattr(self.client, method)(url, body, content_type="application/json", **extra)
+
+
+class ApiAuthenticationTests(ApiTestCase):
+    def test_anonymous_is_rejected(self):
+        response = self.call("get", "tables")
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(response.json(), {"error": "Потрібна авторизація"})
+
+    def test_bearer_key(self):
+        self.assertEqual(self.call("get", "tables", key=self.key).status_code, 200)
+        self.assertEqual(self.call("get", "tables", key="wrong").status_code, 401)
+        self.assertEqual(
+            self.client.get(reverse("api_v1:tables"), HTTP_AUTHORIZATION=f"Token {self.key}").status_code, 401
+        )
+
+        self.token.refresh_from_db()
+        self.assertIsNotNone(self.token.last_used_at)
+
+    def test_key_of_inactive_user(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.call("get", "tables", key=self.key).status_code, 401)
+
+    def test_bearer_writes_need_no_csrf_token(self):
+        response = self.call("post", "tables", {"title": "Відпустка", "color": "#123456"}, key=self.key)
+        self.assertEqual(response.status_code, 201)
+        self.assertTrue(Table.objects.filter(user=self.user, title="Відпустка").exists())
+
+    def test_session_writes_need_csrf_token(self):
+        self.client.force_login(self.user)
+        data = {"title": "Відпустка", "color": "#123456"}
+        self.assertEqual(self.call("get", "tables").status_code, 200)
+        self.assertEqual(self.call("post", "tables", data).status_code, 403)
+
+        secret = "a" * 32
+        self.client.cookies[settings.CSRF_COOKIE_NAME] = secret
+        self.assertEqual(self.call("post", "tables", data, HTTP_X_CSRFTOKEN=secret).status_code, 201)
+
+
+class TokenApiTests(ApiTestCase):
+    def test_issue_list_and_revoke(self):
+        response = self.call("post", "tokens", {"email": self.user.email, "password": "pass-12345", "name": "Скрипт"})
+        self.assertEqual(response.status_code, 201)
+        key = response.json()["key"]
+        self.assertEqual(self.call("get", "tables", key=key).status_code, 200)
+
+        tokens = self.call("get", "tokens", key=key).json()["results"]
+        self.assertEqual(sorted(token["name"] for token in tokens), ["Скрипт", "Телефон"])
+        self.assertNotIn("key", tokens[0])
+
+        response = self.call("delete", "tokens", {"ids": [response.json()["id"]]}, key=self.key)
+        self.assertEqual(response.json(), {"deleted": 1})
+        self.assertEqual(self.call("get", "tables", key=key).status_code, 401)
+
+    def test_wrong_password(self):
+        response = self.call("post", "tokens", {"email": self.user.email, "password": "nope", "name": "Скрипт"})
+        self.assertEqual(response.status_code, 401)
+        response = self.call("post", "tokens", {"email": self.user.email})
+        self.assertEqual(response.json()["details"], {"fields": ["password", "name"]})
+
+    def test_only_own_keys(self):
+        other_token, _ = ApiToken.issue(self.create_user("other@example.com"), "Чужий")
+        self.assertEqual(self.call("delete", "tokens", {"ids": [other_token.pk]}, key=self.key).json(), {"deleted": 0})
+        self.assertEqual(len(self.call("get", "tokens", key=self.key).json()["results"]), 1)
+
+
+class ResourceApiTests(ApiTestCase):
+    def setUp(self):
+        super().setUp()
+        self.transactions = [
+            Transaction.objects.create(table=self.table, amount=Decimal(n), date=date(2026, 3, n)) for n in range(1, 6)
+        ]
+        self.stranger = Table.objects.create(user=self.create_user("other@example.com"), title="Чужа")
+        self.foreign = Transaction.objects.create(table=self.stranger, amount=Decimal("9"))
+
+    def test_pagination(self):
+        ids = []
+        response = self.call("get", "transactions", {"limit": 2, "fields": "id,amount"}, key=self.key).json()
+        pages = 1
+        ids += [row["id"] for row in response["results"]]
+        while response["next"]:
+            self.assertEqual(set(response["results"][0]), {"id", "amount"})
+            response = self.call("get", response["next"], key=self.key).json()
+            ids += [row["id"] for row in response["results"]]
+            pages += 1
+
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, [transaction.pk for transaction in self.transactions])
+
+    def test_bad_parameters(self):
+        self.assertEqual(self.call("get", "transactions", {"fields": "id,secret"}, key=self.key).status_code, 400)
+        self.assertEqual(self.call("get", "transactions", {"cursor": "!!"}, key=self.key).status_code, 400)
+        self.assertEqual(self.call("get", "transactions", {"limit": "x"}, key=self.key).status_code, 400)
+
+    def test_reads_only_own_rows(self):
+        rows = self.call("get", "transactions", {"limit": 100}, key=self.key).json()["results"]
+        self.assertNotIn(self.foreign.pk, {row["id"] for row in rows})
+        tables = self.call("get", "tables", key=self.key).json()["results"]
+        self.assertEqual([table["id"] for table in tables], [self.table.pk])
+
+    def test_writes_only_own_rows(self):
+        response = self.call("patch", "transactions", [{"id": self.foreign.pk, "amount": "1"}], key=self.key)
+        self.assertEqual(response.status_code, 404)
+
+        response = self.call("delete", "transactions", {"ids": [self.foreign.pk]}, key=self.key)
+        self.assertEqual(response.json(), {"deleted": 0})
+
+        item = {"table": self.stranger.pk, "amount": "1", "currency": "UAH", "date": "2026-03-01"}
+        response = self.call("post", "transactions", [item], key=self.key)
+        self.assertEqual(response.status_code, 400)
+        self.assertTrue(Transaction.objects.filter(pk=self.foreign.pk, amount=Decimal("9")).exists())
+
+    def test_batch_is_all_or_nothing(self):
+        valid = {"table": self.table.pk, "amount": "1", "currency": "UAH", "date": "2026-03-01"}
+        response = self.call("post", "transactions", [valid, {**valid, "amount": "-1"}], key=self.key)
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual([error["index"] for error in response.json()["details"]], [1])
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 5)
+
+        response = self.call("post", "transactions", [valid, valid], key=self.key)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(Transaction.objects.filter(user=self.user).count(), 7)
+
+    def test_batch_update(self):
+        first, second = self.transactions[:2]
+        response = self.call(
+            "patch",
+            "transactions",
+            [{"id": first.pk, "amount": "100"}, {"id": second.pk, "currency": "EUR"}],
+            key=self.key,
+        )
+        self.assertEqual(response.status_code, 200)
+        first.refresh_from_db()
+        second.refresh_from_db()
+        self.assertEqual((first.amount, second.amount, second.currency), (Decimal("100"), Decimal("2"), "EUR"))
+        self.assertGreater(first.updated_at, first.created_at)
+
+    def test_categories_are_read_only_for_users(self):
+        self.assertEqual(self.call("get", "categories", key=self.key).status_code, 200)
+        self.assertEqual(self.call("post", "categories", {"name": "Нова"}, key=self.key).status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        parent = Category.objects.get(name="Продукти")
+        response = self.call("post", "categories", {"name": "Нова", "parent": parent.pk}, key=self.key)
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.json()["results"][0]["depth"], 1)
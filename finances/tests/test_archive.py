@@ -0,0 +1,98 @@
+import io
+from datetime import date
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..models import ArchivedTransaction, Category, Tombstone, Transaction, TransactionRollup
+from ..services.transaction_archive import TransactionArchive
+from .base import FinancesTestCase
+
+
+class TransactionArchiveTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.category = Category.objects.get(name="Ринок")
+        self.old = [
+            self.add("10.50", date(2020, 1, 5), category=self.category),
+            self.add("20.25", date(2020, 1, 20), category=self.category),
+            self.add("5", date(2020, 2, 1), currency="USD"),
+        ]
+        self.recent = self.add("7", date(2026, 3, 1))
+
+    def add(self, amount, day, currency="UAH", category=None):
+        return Transaction.objects.create(
+            table=self.table, amount=Decimal(amount), currency=currency, date=day, category=category
+        )
+
+    def test_moves_old_transactions_into_rollups(self):
+        self.assertIsNone(TransactionArchive.get_archived_until(self.user))
+
+        moved = TransactionArchive.archive(date(2021, 1, 1), batch_size=2)
+        self.assertEqual(moved, 3)
+        self.assertEqual(list(Transaction.objects.values_list("pk", flat=True)), [self.recent.pk])
+        self.assertEqual(sorted(ArchivedTransaction.objects.values_list("pk", flat=True)), [obj.pk for obj in self.old])
+        # A move, not a deletion: sync clients keep their copies
+        self.assertFalse(Tombstone.objects.exists())
+
+        january = TransactionRollup.objects.get(month=date(2020, 1, 1))
+        self.assertEqual(
+            (january.category_id, january.currency, january.total, january.transaction_count, january.max_amount),
+            (self.category.pk, "UAH", Decimal("30.75"), 2, Decimal("20.25")),
+        )
+        self.assertEqual(TransactionRollup.objects.get(month=date(2020, 2, 1)).total, Decimal("5.00"))
+        # The cached "nothing archived" answer was dropped
+        self.assertEqual(TransactionArchive.get_archived_until(self.user), date(2020, 2, 1))
+
+    def test_rollups_accumulate_across_runs(self):
+        TransactionArchive.archive(date(2020, 1, 10))
+        TransactionArchive.archive(date(2021, 1, 1))
+        january = TransactionRollup.objects.get(month=date(2020, 1, 1))
+        self.assertEqual((january.total, january.transaction_count), (Decimal("30.75"), 2))
+
+    def test_list_and_export_include_archive(self):
+        TransactionArchive.archive(date(2021, 1, 1))
+        self.client.force_login(self.user)
+
+        response = self.client.get(reverse("finances:transaction_list"))
+        self.assertEqual(response.context["paginator"].count, 4)
+        rows = list(response.context["transactions"])
+        self.assertEqual([row.pk for row in rows], [self.recent.pk] + [obj.pk for obj in reversed(self.old)])
+        self.assertEqual([row.is_archived for row in rows], [False, True, True, True])
+
+        response = self.client.get(reverse("finances:transaction_list"), {"date_from": "2020-01-10"})
+        self.assertEqual(response.context["paginator"].count, 3)
+
+        content = b"".join(self.client.get(reverse("finances:transaction_export")).streaming_content)
+        self.assertEqual(content.decode("utf-8-sig").count("\n"), 5)
+
+    def test_default_list_page_skips_archive(self):
+        TransactionArchive.archive(date(2021, 1, 1))
+        for index in range(25):
+            self.add(str(index + 1), date(2026, 2, 1))
+        self.client.force_login(self.user)
+        # The newest archived date is cached, as it is between requests
+        TransactionArchive.get_archived_until(self.user)
+
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(reverse("finances:transaction_list"))
+        self.assertEqual(response.context["paginator"].count, 29)
+        self.assertFalse([query for query in queries if "finances_archivedtransaction" in query["sql"]])
+
+        # The last page runs past the recent rows into the archive
+        response = self.client.get(reverse("finances:transaction_list"), {"page": 2})
+        rows = list(response.context["transactions"])
+        self.assertEqual([row.is_archived for row in rows], [False] * 6 + [True] * 3)
+        self.assertEqual([row.pk for row in rows[-3:]], [obj.pk for obj in reversed(self.old)])
+
+    def test_command(self):
+        stdout = io.StringIO()
+        call_command("archive_transactions", before="2021-01-01", dry_run=True, stdout=stdout)
+        self.assertIn(": 3", stdout.getvalue())
+        self.assertEqual(ArchivedTransaction.objects.count(), 0)
+
+        call_command("archive_transactions", before="2021-01-01", stdout=io.StringIO())
+        self.assertEqual(ArchivedTransaction.objects.count(), 3)
@@ -0,0 +1,40 @@
+import io
+import json
+
+from django.core.cache import caches
+from django.core.management import call_command
+
+from ..models import Table, Transaction
+from ..services.currency_converter import CurrencyConverter
+from .base import FinancesTestCase
+
+
+class SeedBenchmarkTests(FinancesTestCase):
+    def test_seeds_exact_counts(self):
+        call_command("seed_benchmark", users=2, tables=2, transactions=50, prefix="seedtest", stdout=io.StringIO())
+        tables = Table.objects.filter(user__email__startswith="seedtest-")
+        self.assertEqual(tables.count(), 4)
+        self.assertEqual(Transaction.objects.filter(table__in=tables).count(), 50)
+
+        # --clear replaces the previous data instead of adding to it
+        call_command("seed_benchmark", users=1, transactions=10, prefix="seedtest", clear=True, stdout=io.StringIO())
+        self.assertEqual(Transaction.objects.filter(table__user__email__startswith="seedtest-").count(), 10)
+
+
+class BenchTests(FinancesTestCase):
+    def run_bench(self, **options):
+        stdout = io.StringIO()
+        call_command("bench", sizes="20", repeat=1, stdout=stdout, stderr=io.StringIO(), **options)
+        return json.loads(stdout.getvalue())
+
+    def test_measures_targets(self):
+        report = self.run_bench(target=["dashboard", "currency_convert"])
+        self.assertEqual([(r["size"], r["target"], r["status"]) for r in report["results"]][0], (20, "dashboard", 200))
+        self.assertEqual(len(report["results"]), 2)
+        self.assertEqual(report["database"], "sqlite")
+
+    def test_leaves_site_cache_alone(self):
+        self.set_rates({"USD": 1.0, "UAH": 40.0})
+        self.run_bench(target=["currency_convert"])
+        # The bench rates went under its own prefix, the site's entry is neither replaced nor deleted
+        self.assertEqual(caches["default"].get(CurrencyConverter.CACHE_KEY), {"USD": 1.0, "UAH": 40.0})
@@ -0,0 +1,82 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Category, Table, Transaction
+from .base import FinancesTestCase
+
+
+class TransactionBulkCreateTests(FinancesTestCase):
+    url = reverse("finances:transaction_bulk_create")
+
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def post(self, rows, extra=2):
+        data = {"form-TOTAL_FORMS": len(rows) + extra, "form-INITIAL_FORMS": 0}
+        for index, row in enumerate(rows):
+            data.update({f"form-{index}-{field}": value for field, value in row.items()})
+        for index in range(len(rows), len(rows) + extra):
+            # Untouched rows keep their initial values
+            data.update({f"form-{index}-currency": "UAH", f"form-{index}-date": timezone.localdate().isoformat()})
+        return self.client.post(self.url, data)
+
+    def row(self, **values):
+        return {"table": self.table.pk, "amount": "10", "currency": "UAH", "date": "2026-03-01", **values}
+
+    def test_rows_are_inserted_at_once(self):
+        category = Category.objects.get(name="Ринок")
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post([self.row(category=category.pk, description="Овочі"), self.row(amount="2.5")])
+
+        self.assertRedirects(response, reverse("finances:transaction_list"), fetch_redirect_response=False)
+        inserts = [q for q in queries if q["sql"].startswith('INSERT INTO "finances_transaction"')]
+        self.assertEqual(len(inserts), 1)
+        self.assertEqual(
+            sorted(Transaction.objects.values_list("amount", "category_id", "user_id")),
+            [(Decimal("2.50"), None, self.user.pk), (Decimal("10.00"), category.pk, self.user.pk)],
+        )
+
+    def test_deleted_rows_are_skipped(self):
+        self.post([self.row(), self.row(amount="3", DELETE="on")])
+        self.assertEqual(list(Transaction.objects.values_list("amount", flat=True)), [Decimal("10.00")])
+
+    def test_other_users_table_is_rejected(self):
+        stranger = Table.objects.create(user=self.create_user("other@example.com"), title="Чужа")
+        response = self.post([self.row(table=stranger.pk)])
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(Transaction.objects.exists())
+
+    def test_at_least_one_row(self):
+        response = self.post([])
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.context["form"].non_form_errors())
+
+
+class TransactionFormTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def test_create_and_edit(self):
+        category = Category.objects.get(name="Ринок")
+        data = {"table": self.table.pk, "amount": "15", "currency": "EUR", "date": "2026-03-01", "description": ""}
+        self.client.post(reverse("finances:transaction_create"), {**data, "category_id": category.pk})
+        transaction = Transaction.objects.get()
+        self.assertEqual((transaction.amount, transaction.category_id), (Decimal("15.00"), category.pk))
+
+        # An unknown category id is dropped rather than stored
+        self.client.post(reverse("finances:transaction_edit", args=[transaction.pk]), {**data, "category_id": "99999"})
+        transaction.refresh_from_db()
+        self.assertIsNone(transaction.category_id)
+
+    def test_other_users_transaction_is_not_found(self):
+        stranger = Table.objects.create(user=self.create_user("other@example.com"), title="Чужа")
+        transaction = Transaction.objects.create(table=stranger, amount=Decimal("1"))
+        self.assertEqual(self.client.get(reverse("finances:transaction_edit", args=[transaction.pk])).status_code, 404)
+        self.client.post(reverse("finances:transaction_delete", args=[transaction.pk]))
+        self.assertTrue(Transaction.objects.filter(pk=transaction.pk).exists())
@@ -0,0 +1,107 @@
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+
+from ..cache import TwoTierCache
+from .base import TEST_CACHES
+
+
+@override_settings(CACHES=TEST_CACHES)
+class TwoTierCacheTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        caches["shared"].clear()
+        # Two workers over the same shared cache
+        self.first = self.make_cache()
+        self.second = self.make_cache()
+
+    @staticmethod
+    def make_cache(prefix="default", **options):
+        return TwoTierCache("shared", {"KEY_PREFIX": prefix, "OPTIONS": {"SYNC_INTERVAL": 0, **options}})
+
+    def keys_in_other_buckets(self, cache, count=2):
+        keys, buckets = [], set()
+        for index in range(1000):
+            key = f"key-{index}"
+            bucket = cache.get_bucket(cache._key(key, None))
+            if bucket not in buckets:
+                keys.append(key)
+                buckets.add(bucket)
+            if len(keys) == count:
+                return keys
+
+    def test_write_reaches_other_worker(self):
+        self.first.set("rates", 1)
+        self.assertEqual(self.second.get("rates"), 1)
+        self.first.set("rates", 2)
+        self.assertEqual(self.second.get("rates"), 2)
+        self.first.delete("rates")
+        self.assertIsNone(self.second.get("rates"))
+
+    def test_reads_served_from_l1(self):
+        self.first.set("rates", 1)
+        self.assertEqual(self.second.get("rates"), 1)
+        # Changed behind the cache's back: L1 keeps answering, nothing told it otherwise
+        caches["shared"].set(self.second._key("rates", None), 99)
+        self.assertEqual(self.second.get("rates"), 1)
+
+    def test_invalidation_is_per_key_group(self):
+        written, untouched = self.keys_in_other_buckets(self.first)
+        self.first.set(written, "old")
+        self.first.set(untouched, "old")
+        self.assertEqual(self.second.get(written), "old")
+        self.assertEqual(self.second.get(untouched), "old")
+
+        caches["shared"].set(self.second._key(untouched, None), "behind")
+        self.first.set(written, "new")
+        self.assertEqual(self.second.get(written), "new")
+        # A write elsewhere does not flush the rest of L1
+        self.assertEqual(self.second.get(untouched), "old")
+
+    def test_sync_interval(self):
+        second = self.make_cache(SYNC_INTERVAL=3600)
+        self.first.set("rates", 1)
+        self.assertEqual(second.get("rates"), 1)
+        self.first.set("rates", 2)
+        self.assertEqual(second.get("rates"), 1)
+
+    def test_incr(self):
+        self.first.set("counter", 1)
+        self.assertEqual(self.second.get("counter"), 1)
+        self.assertEqual(self.first.incr("counter"), 2)
+        self.assertEqual(self.second.get("counter"), 2)
+
+    def test_clear_drops_this_alias_only(self):
+        fragments = self.make_cache("fragments", BROADCAST=False)
+        self.first.set("key", 1)
+        fragments.set("key", "fragment")
+        caches["shared"].set("session", "kept")
+        self.assertEqual(self.second.get("key"), 1)
+
+        self.first.clear()
+        self.assertIsNone(self.first.get("key"))
+        self.assertIsNone(self.second.get("key"))
+        # Sessions and the other aliases live in the same shared cache
+        self.assertEqual(caches["shared"].get("session"), "kept")
+        self.assertEqual(fragments.get("key"), "fragment")
+        self.assertEqual(self.make_cache("fragments", BROADCAST=False).get("key"), "fragment")
+        # Written after the clear, seen everywhere
+        self.first.set("key", 2)
+        self.assertEqual(self.second.get("key"), 2)
+
+    def test_prefixes_keep_aliases_apart(self):
+        fragments = self.make_cache("fragments", BROADCAST=False)
+        self.first.set("key", "default")
+        fragments.set("key", "fragment")
+        self.assertEqual(self.second.get("key"), "default")
+        self.assertEqual(self.make_cache("fragments", BROADCAST=False).get("key"), "fragment")
+
+    def test_version(self):
+        self.first.set("key", 1, version=2)
+        self.assertIsNone(self.second.get("key"))
+        self.assertEqual(self.second.get("key", version=2), 1)
+
+    def test_values_are_copies(self):
+        value = {"USD": 1.0}
+        self.first.set("rates", value)
+        self.first.get("rates")["USD"] = 2.0
+        self.assertEqual(self.first.get("rates"), {"USD": 1.0})
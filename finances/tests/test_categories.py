@@ -0,0 +1,80 @@
+from django.urls import reverse
+
+from ..models import Category
+from ..services.category_tree import CategoryTree
+from .base import FinancesTestCase
+
+
+class CategoryPathTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = Category.objects.create(name="Дім")
+        self.child = Category.objects.create(name="Ремонт", parent=self.root)
+        self.grandchild = Category.objects.create(name="Фарба", parent=self.child)
+
+    def test_path_and_depth(self):
+        self.assertEqual(self.root.path, f"{self.root.pk}/")
+        self.assertEqual(self.grandchild.path, f"{self.root.pk}/{self.child.pk}/{self.grandchild.pk}/")
+        self.assertEqual(self.grandchild.depth, 2)
+        self.assertEqual(self.grandchild.ancestor_ids, [self.root.pk, self.child.pk])
+        self.assertEqual(self.grandchild.get_full_path(), "Дім → Ремонт → Фарба")
+        self.assertCountEqual(self.root.get_descendants(), [self.child, self.grandchild])
+
+    def test_move_rewrites_subtree(self):
+        other = Category.objects.create(name="Авто")
+        self.child.parent = other
+        self.child.save()
+
+        self.grandchild.refresh_from_db()
+        self.assertEqual(self.grandchild.path, f"{other.pk}/{self.child.pk}/{self.grandchild.pk}/")
+        self.assertEqual(self.grandchild.depth, 2)
+        self.assertFalse(self.root.get_descendants().exists())
+
+    def test_cannot_move_under_own_descendant(self):
+        self.root.parent = self.grandchild
+        with self.assertRaises(ValueError):
+            self.root.save()
+
+
+class CategoryTreeTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.root = Category.objects.create(name="Дім")
+        self.child = Category.objects.create(name="Ремонт", parent=self.root)
+        self.grandchild = Category.objects.create(name="Фарба", parent=self.child)
+
+    def get_root(self, hierarchy):
+        return next(item for item in hierarchy if item["id"] == self.root.pk)
+
+    def test_hierarchy_includes_every_level(self):
+        root = self.get_root(CategoryTree.get_hierarchy())
+        self.assertEqual(
+            root["children"],
+            [
+                {"id": self.child.pk, "name": "Ремонт", "level": 1},
+                {"id": self.grandchild.pk, "name": "Фарба", "level": 2},
+            ],
+        )
+
+    def test_hierarchy_sorts_siblings_depth_first(self):
+        Category.objects.create(name="Вода", parent=self.root)
+        names = [child["name"] for child in self.get_root(CategoryTree.get_hierarchy())["children"]]
+        self.assertEqual(names, ["Вода", "Ремонт", "Фарба"])
+
+    def test_hierarchy_and_choices_list_the_same_categories(self):
+        in_hierarchy = set()
+        for root in CategoryTree.get_hierarchy():
+            in_hierarchy |= {root["id"], *(child["id"] for child in root["children"])}
+        in_choices = {pk for _, options in CategoryTree.get_choices() for pk, _ in options}
+        self.assertEqual(in_hierarchy, in_choices)
+        self.assertEqual(in_hierarchy, set(Category.objects.values_list("pk", flat=True)))
+
+    def test_tree_is_rebuilt_after_a_change(self):
+        CategoryTree.get_nodes()
+        Category.objects.create(name="Світло", parent=self.grandchild)
+        self.assertIn("Дім → Ремонт → Фарба → Світло", [node["full_name"] for node in CategoryTree.get_nodes()])
+
+    def test_transaction_form_offers_deep_categories(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("finances:transaction_create"))
+        self.assertContains(response, f'data-id="{self.grandchild.pk}"')
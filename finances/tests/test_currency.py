@@ -0,0 +1,104 @@
+import asyncio
+import threading
+from unittest import mock
+
+import httpx
+import requests
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+
+from ..services.currency_converter import CurrencyConverter
+from .base import FinancesTestCase
+
+RATES = {"USD": 1.0, "UAH": 40.0, "EUR": 0.8}
+
+
+def provider_response(rates=RATES, status=200):
+    response = mock.Mock(status_code=status)
+    response.json.return_value = {"base": "USD", "rates": rates}
+    response.raise_for_status.side_effect = None if status == 200 else requests.HTTPError(f"{status} Error")
+    return response
+
+
+@override_settings(OPENEXCHANGERATES_API_KEY="test-key")
+class CurrencyConverterTests(FinancesTestCase):
+    def test_rates_are_fetched_once(self):
+        with mock.patch("requests.get", return_value=provider_response()) as get:
+            self.assertEqual(CurrencyConverter.get_exchange_rates(), RATES)
+            self.assertEqual(CurrencyConverter.get_exchange_rates(), RATES)
+
+        get.assert_called_once()
+        self.assertIn("app_id=test-key", get.call_args.args[0])
+        self.assertEqual(cache.get(CurrencyConverter.CACHE_KEY), RATES)
+
+    def test_provider_errors(self):
+        failures = {
+            "status": {"return_value": provider_response(status=502)},
+            "network": {"side_effect": requests.ConnectionError("down")},
+        }
+        for failure, patch_kwargs in failures.items():
+            with self.subTest(failure=failure), mock.patch("requests.get", **patch_kwargs):
+                with self.assertLogs("finances.services.currency_converter", "ERROR"):
+                    self.assertIsNone(CurrencyConverter.get_exchange_rates())
+        self.assertIsNone(cache.get(CurrencyConverter.CACHE_KEY))
+
+    @override_settings(OPENEXCHANGERATES_API_KEY=None)
+    def test_no_api_key(self):
+        with mock.patch("requests.get") as get, self.assertLogs("finances.services.currency_converter", "WARNING"):
+            self.assertIsNone(CurrencyConverter.get_exchange_rates())
+        get.assert_not_called()
+
+    def test_async_fetch_shares_one_call(self):
+        calls = []
+
+        async def get(client, url):
+            calls.append(threading.current_thread())
+            await asyncio.sleep(0.05)
+            return httpx.Response(200, json={"rates": RATES}, request=httpx.Request("GET", url))
+
+        async def concurrent_misses():
+            return await asyncio.gather(*(CurrencyConverter.aget_exchange_rates() for _ in range(3)))
+
+        with mock.patch("httpx.AsyncClient.get", get), mock.patch("requests.get") as blocking_get:
+            self.assertEqual(asyncio.run(concurrent_misses()), [RATES] * 3)
+        # One call, made on the event loop's own thread
+        self.assertEqual(calls, [threading.main_thread()])
+        blocking_get.assert_not_called()
+        self.assertEqual(cache.get(CurrencyConverter.CACHE_KEY), RATES)
+
+    def test_async_provider_errors(self):
+        async def get(client, url):
+            raise httpx.ConnectTimeout("timed out")
+
+        with mock.patch("httpx.AsyncClient.get", get):
+            with self.assertLogs("finances.services.currency_converter", "ERROR"):
+                self.assertIsNone(asyncio.run(CurrencyConverter.aget_exchange_rates()))
+        self.assertIsNone(cache.get(CurrencyConverter.CACHE_KEY))
+
+    def test_conversion(self):
+        self.set_rates(RATES)
+        self.assertEqual(CurrencyConverter.convert_amount("100", "USD", "UAH"), 4000.0)
+        self.assertEqual(CurrencyConverter.convert_amount("80", "EUR", "USD"), 100.0)
+        self.assertEqual(CurrencyConverter.get_rate("EUR", "UAH"), 50.0)
+        self.assertEqual(CurrencyConverter.get_rate("UAH", "UAH"), 1.0)
+        with self.assertLogs("finances.services.currency_converter", "ERROR"):
+            self.assertIsNone(CurrencyConverter.convert_amount("1", "GBP", "UAH"))
+
+
+class AsyncPagesTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_rates(RATES)
+        self.client.force_login(self.user)
+
+    def test_dashboard_and_analytics_render(self):
+        for name in ("finances:dashboard", "finances:analytics"):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 200)
+
+    def test_login_required(self):
+        self.client.logout()
+        for name in ("finances:dashboard", "finances:analytics"):
+            with self.subTest(name=name):
+                self.assertEqual(self.client.get(reverse(name)).status_code, 302)
@@ -0,0 +1,80 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from ..models import Table, Transaction, TransactionRollup
+from .base import FinancesTestCase
+
+
+class DashboardTotalsTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_rates({"USD": 1.0, "UAH": 40.0, "EUR": 0.8})
+        self.client.force_login(self.user)
+        today = timezone.localdate()
+        self.this_month = today.replace(day=1)
+        self.last_month = (self.this_month - timedelta(days=1)).replace(day=1)
+        self.second = Table.objects.create(user=self.user, title="Друга")
+
+    def add(self, amount, currency="UAH", day=None, table=None):
+        return Transaction.objects.create(
+            table=table or self.table, amount=Decimal(amount), currency=currency, date=day or self.this_month
+        )
+
+    def get_context(self):
+        response = self.client.get(reverse("finances:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        return response.context
+
+    def test_totals(self):
+        self.add("100")
+        self.add("10", currency="USD", table=self.second)
+        self.add("200", day=self.last_month)
+        self.add("1000", day=self.last_month - timedelta(days=40))
+        # Archived history counts through its monthly rollups
+        TransactionRollup.objects.create(
+            user=self.user,
+            table=self.table,
+            currency="EUR",
+            month=self.last_month,
+            total=Decimal("8"),
+            transaction_count=3,
+            max_amount=Decimal("5"),
+        )
+        stranger = Table.objects.create(user=self.create_user("other@example.com"), title="Чужа")
+        self.add("5000", table=stranger)
+
+        context = self.get_context()
+        self.assertEqual(context["this_month_expenses"], 500.0)
+        self.assertEqual(context["last_month_expenses"], 600.0)
+        self.assertEqual(context["total_expenses"], 2100.0)
+        self.assertEqual(context["transaction_count"], 7)
+        self.assertEqual(context["month_change"], round((500 - 600) / 600 * 100, 1))
+        tables = {table.pk: (table.total_expenses, table.transaction_count) for table in context["tables"]}
+        self.assertEqual(tables, {self.table.pk: (1700.0, 6), self.second.pk: (400.0, 1)})
+        self.assertEqual(len(context["recent_transactions"]), 4)
+
+    def test_without_rates_foreign_currencies_are_left_out(self):
+        self.set_rates({})
+        self.add("100")
+        self.add("10", currency="USD")
+        self.assertEqual(self.get_context()["total_expenses"], 100.0)
+
+    def test_query_count_does_not_grow_with_transactions(self):
+        self.add("1")
+
+        def count_queries():
+            with CaptureQueriesContext(connection) as queries:
+                self.get_context()
+            return len(queries)
+
+        # The first request also loads the user into the cache
+        self.get_context()
+        few = count_queries()
+        for day in range(60):
+            self.add("1", day=self.this_month - timedelta(days=day))
+        self.assertEqual(count_queries(), few)
@@ -0,0 +1,76 @@
+import csv
+import io
+import zipfile
+from datetime import date
+from decimal import Decimal
+
+from django.urls import reverse
+
+from ..models import Category, Table, Transaction
+from .base import FinancesTestCase
+
+
+class TransactionExportTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        self.category = Category.objects.create(name="Кава", parent=Category.objects.get(name="Продукти"))
+        Transaction.objects.create(
+            table=self.table, amount=Decimal("12.50"), currency="USD", date=date(2026, 3, 1), category=self.category
+        )
+        Transaction.objects.create(
+            table=self.table, amount=Decimal("100"), currency="UAH", date=date(2026, 3, 2), description="Обід"
+        )
+        stranger = Table.objects.create(user=self.create_user("other@example.com"), title="Чужа")
+        Transaction.objects.create(table=stranger, amount=Decimal("7"), date=date(2026, 3, 3))
+
+    def export(self, **params):
+        response = self.client.get(reverse("finances:transaction_export"), params)
+        self.assertEqual(response.status_code, 200)
+        return response, b"".join(response.streaming_content)
+
+    def read_csv(self, **params):
+        _, content = self.export(**params)
+        return list(csv.reader(io.StringIO(content.decode("utf-8-sig"))))
+
+    def test_csv_has_only_own_transactions(self):
+        header, *rows = self.read_csv()
+        self.assertEqual(header[0], "Дата")
+        self.assertEqual(
+            rows,
+            [
+                ["2026-03-02", "Основна", "", "", "100.00", "UAH", "Обід"],
+                ["2026-03-01", "Основна", "Продукти", "Кава", "12.50", "USD", ""],
+            ],
+        )
+
+    def test_csv_applies_list_filters(self):
+        rows = self.read_csv(currency="USD")[1:]
+        self.assertEqual([row[5] for row in rows], ["USD"])
+
+    def test_csv_converts_amounts(self):
+        self.set_rates()
+        header, *rows = self.read_csv(convert_to="UAH")
+        self.assertEqual(header[-1], "Сума в UAH")
+        self.assertEqual([row[-1] for row in rows], ["100.0", "500.0"])
+
+    def test_csv_neutralizes_formulas(self):
+        Transaction.objects.create(
+            table=self.table, amount=Decimal("1"), date=date(2026, 3, 4), description='=HYPERLINK("http://x")'
+        )
+        Transaction.objects.create(table=self.table, amount=Decimal("-5"), date=date(2026, 3, 5))
+        Table.objects.filter(pk=self.table.pk).update(title="@SUM(A1)")
+        rows = self.read_csv()[1:]
+        self.assertEqual(rows[1][6], '\'=HYPERLINK("http://x")')
+        self.assertEqual({row[1] for row in rows}, {"'@SUM(A1)"})
+        # Only text is prefixed: a negative amount stays a number
+        self.assertEqual(rows[0][4], "-5.00")
+
+    def test_xlsx_is_a_workbook(self):
+        response, content = self.export(format="xlsx")
+        self.assertIn(".xlsx", response["Content-Disposition"])
+        with zipfile.ZipFile(io.BytesIO(content)) as archive:
+            self.assertIsNone(archive.testzip())
+            sheet = archive.read("xl/worksheets/sheet1.xml").decode()
+        self.assertEqual(sheet.count("<row>"), 3)
+        self.assertIn('<t xml:space="preserve">Обід</t>', sheet)
@@ -0,0 +1,56 @@
+from datetime import date
+from decimal import Decimal
+
+from django import forms
+from django.core.exceptions import ValidationError
+from django.db import connection
+from django.db.models import Max, Sum
+from django.test import SimpleTestCase
+
+from ..fields import MoneyField
+from ..models import Transaction
+from .base import FinancesTestCase
+
+
+class MoneyFieldTests(SimpleTestCase):
+    def test_conversion(self):
+        field = MoneyField(max_digits=10)
+        self.assertEqual(field.get_prep_value(Decimal("12.34")), 1234)
+        self.assertEqual(field.get_prep_value(0.1), 10)
+        self.assertEqual(field.get_prep_value("0.005"), 1)
+        self.assertEqual(field.from_db_value(-1234, None, connection), Decimal("-12.34"))
+        self.assertIsNone(field.get_prep_value(None))
+        with self.assertRaises(ValidationError):
+            field.to_python("abc")
+
+    def test_validation_and_form_field(self):
+        field = MoneyField(max_digits=5)
+        with self.assertRaises(ValidationError):
+            field.clean(Decimal("1000.00"), None)
+        form_field = field.formfield()
+        self.assertIsInstance(form_field, forms.DecimalField)
+        self.assertEqual((form_field.max_digits, form_field.decimal_places), (5, 2))
+
+    def test_deconstruct(self):
+        _, path, _, kwargs = MoneyField(max_digits=10, decimal_places=3).deconstruct()
+        self.assertEqual(path, "finances.fields.MoneyField")
+        self.assertEqual(kwargs, {"max_digits": 10, "decimal_places": 3})
+
+
+class MoneyFieldDatabaseTests(FinancesTestCase):
+    def test_stored_as_minor_units(self):
+        transaction = Transaction.objects.create(table=self.table, amount=Decimal("12.34"), date=date(2026, 3, 1))
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT amount FROM finances_transaction WHERE id = %s", [transaction.pk])
+            self.assertEqual(cursor.fetchone()[0], 1234)
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.amount, Decimal("12.34"))
+        self.assertTrue(Transaction.objects.filter(amount=Decimal("12.34")).exists())
+
+    def test_sums_are_exact(self):
+        Transaction.objects.bulk_create(
+            Transaction(table=self.table, amount=Decimal("0.10"), date=date(2026, 3, 1)) for _ in range(1000)
+        )
+        Transaction.objects.create(table=self.table, amount=Decimal("0.20"), date=date(2026, 3, 1))
+        totals = Transaction.objects.aggregate(total=Sum("amount"), largest=Max("amount"))
+        self.assertEqual(totals, {"total": Decimal("100.20"), "largest": Decimal("0.20")})
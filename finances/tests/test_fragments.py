@@ -0,0 +1,59 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.cache import caches
+from django.urls import reverse
+
+from ..models import Category, Transaction
+from .base import FinancesTestCase
+
+
+class TransactionRowFragmentTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.set_rates()
+        self.client.force_login(self.user)
+        self.category = Category.objects.get(name="Ринок")
+        self.transaction = Transaction.objects.create(
+            table=self.table, amount=Decimal("10"), date=date(2026, 3, 1), category=self.category, description="Яблука"
+        )
+
+    def render(self):
+        response = self.client.get(reverse("finances:transaction_list"))
+        self.assertEqual(response.status_code, 200)
+        return response.content.decode()
+
+    def test_row_is_cached_until_the_transaction_changes(self):
+        self.assertIn("Яблука", self.render())
+
+        # Not through save(): updated_at stays, so the cached row is served
+        Transaction.objects.filter(pk=self.transaction.pk).update(description="Груші")
+        self.assertIn("Яблука", self.render())
+
+        self.transaction.refresh_from_db()
+        self.transaction.save()
+        content = self.render()
+        self.assertIn("Груші", content)
+        self.assertNotIn("Яблука", content)
+
+    def test_category_rename_replaces_rows(self):
+        self.assertIn("Ринок", self.render())
+        self.category.name = "Базар"
+        self.category.save()
+        content = self.render()
+        self.assertIn("Базар", content)
+        self.assertNotIn("Ринок", content)
+
+    def test_table_rename_replaces_rows(self):
+        self.render()
+        self.table.title = "Сімейна"
+        self.table.save()
+        content = self.render()
+        self.assertIn("Сімейна", content)
+        self.assertNotIn("Основна", content)
+
+    def test_rows_go_to_the_fragments_cache(self):
+        self.render()
+        keys = list(caches["shared"]._cache)
+        self.assertTrue(any(":fragments:" in key and "template.cache.transaction_row." in key for key in keys))
+        self.assertFalse(any(":default:" in key and "template.cache." in key for key in keys))
@@ -0,0 +1,131 @@
+from datetime import date
+from decimal import Decimal
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+
+from ..models import ArchivedTransaction, Category, Transaction
+from ..services.transaction_import import ImportRowError, TransactionImporter
+from .base import FinancesTestCase
+
+OFX_STATEMENT = """OFXHEADER:100
+<OFX><BANKMSGSRSV1><STMTTRNRS><STMTRS><CURDEF>USD
+<BANKTRANLIST>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260301120000<TRNAMT>-12.50<FITID>A1<NAME>Coffee</STMTTRN>
+<STMTTRN><TRNTYPE>CREDIT<DTPOSTED>20260302<TRNAMT>1000.00<FITID>A2<NAME>Salary</STMTTRN>
+<STMTTRN><TRNTYPE>DEBIT<DTPOSTED>20260303<TRNAMT>-1,234.56<FITID>A3<NAME>Rent<MEMO>March</STMTTRN>
+</BANKTRANLIST></STMTRS></STMTTRNRS></BANKMSGSRSV1></OFX>
+"""
+
+
+class TransactionImporterTests(FinancesTestCase):
+    def run_import(self, content, file_format="csv", **kwargs):
+        statement = SimpleUploadedFile(f"statement.{file_format}", content.encode())
+        return TransactionImporter(self.table, statement, file_format=file_format, **kwargs).run()
+
+    def test_csv_import(self):
+        report = self.run_import(
+            "Дата;Сума;Валюта;Категорія;Підкатегорія;Опис\n"
+            "01.03.2026;-100,50;UAH;Продукти;Ринок;Овочі\n"
+            "2026-03-02;-20;EUR;Ринок;;\n"
+            "03/03/2026;-5;;Невідома;;Кава\n"
+        )
+
+        self.assertEqual(report.to_dict()["created"], 3)
+        transactions = list(Transaction.objects.order_by("date"))
+        self.assertEqual([t.amount for t in transactions], [Decimal("100.50"), Decimal("20.00"), Decimal("5.00")])
+        self.assertEqual([t.currency for t in transactions], ["UAH", "EUR", "UAH"])
+        market = Category.objects.get(name="Ринок")
+        self.assertEqual([t.category_id for t in transactions], [market.pk, market.pk, None])
+        self.assertEqual({t.user_id for t in transactions}, {self.user.pk})
+
+    def test_reimport_reports_duplicates(self):
+        content = "date,amount,description\n2026-03-01,-5,Кава\n2026-03-01,-5,Кава\n"
+        first = self.run_import(content)
+        second = self.run_import(content)
+
+        # Two identical rows of one statement are two purchases
+        self.assertEqual((first.created, first.duplicates), (2, 0))
+        self.assertEqual((second.created, second.duplicates), (0, 2))
+        self.assertEqual(Transaction.objects.count(), 2)
+
+    def test_archived_rows_count_as_duplicates(self):
+        content = "date,amount\n2020-01-01,-5\n"
+        self.run_import(content)
+        transaction = Transaction.objects.get()
+        ArchivedTransaction.from_transaction(transaction).save()
+        Transaction.objects.all().delete()
+
+        report = self.run_import(content)
+        self.assertEqual((report.created, report.duplicates), (0, 1))
+
+    def test_counts_match_inserted_rows_across_batches(self):
+        self.run_import("date,amount\n2026-03-01,-1\n2026-03-02,-2\n")
+        importer = TransactionImporter(
+            self.table,
+            SimpleUploadedFile(
+                "s.csv", b"date,amount\n" + b"".join(b"2026-03-%02d,-%d\n" % (n, n) for n in range(1, 8))
+            ),
+        )
+        importer.BATCH_SIZE = 3
+        report = importer.run()
+
+        self.assertEqual((report.created, report.duplicates, report.total), (5, 2, 7))
+        self.assertEqual(Transaction.objects.count(), report.created + 2)
+
+    def test_batches_commit_separately(self):
+        content = "date,amount\n" + "".join(f"2026-03-{day:02d},-{day}\n" for day in range(1, 8))
+
+        def fail_after_first_batch(done, total):
+            raise RuntimeError("обробник зупинено")
+
+        importer = TransactionImporter(
+            self.table, SimpleUploadedFile("s.csv", content.encode()), progress=fail_after_first_batch
+        )
+        importer.BATCH_SIZE = 3
+        with self.assertRaises(RuntimeError):
+            importer.run()
+        # The first batch stays; the retry adds the rest and reports the kept rows as duplicates
+        self.assertEqual(Transaction.objects.count(), 3)
+
+        report = self.run_import(content)
+        self.assertEqual((report.created, report.duplicates), (4, 3))
+
+    def test_income_is_skipped_in_csv_and_ofx(self):
+        csv_report = self.run_import("date,amount\n2026-03-01,-5\n2026-03-02,250\n")
+        ofx_report = self.run_import(OFX_STATEMENT, file_format="ofx")
+
+        self.assertEqual((csv_report.created, csv_report.skipped), (1, 1))
+        self.assertEqual((ofx_report.created, ofx_report.skipped), (2, 1))
+        rent = Transaction.objects.get(description="Rent March")
+        self.assertEqual((rent.amount, rent.currency, rent.date), (Decimal("1234.56"), "USD", date(2026, 3, 3)))
+
+    def test_row_errors_are_reported(self):
+        report = self.run_import(
+            "date,amount,currency\n31.02.2026,-5,UAH\n2026-03-01,abc,UAH\n2026-03-01,-5,GBP\n2026-03-01,0,UAH\n"
+        )
+        self.assertEqual(report.created, 0)
+        self.assertEqual([error["line"] for error in report.errors], [2, 3, 4, 5])
+
+    def test_missing_columns(self):
+        report = self.run_import("when,how much\n2026-03-01,-5\n")
+        self.assertEqual(report.errors, [{"line": 1, "message": "У файлі немає колонок з датою та сумою"}])
+
+    def test_parse_amount(self):
+        importer = TransactionImporter(self.table, None)
+        cases = {
+            "-12,50": "-12.50",
+            "1 234,56": "1234.56",
+            "1\xa0234,56": "1234.56",
+            "-1,234.56": "-1234.56",
+            "1.234,56": "1234.56",
+            "1,234,567": "1234567.00",
+            "1.234.567,8": "1234567.80",
+            "−42": "-42.00",
+        }
+        for value, expected in cases.items():
+            with self.subTest(value=value):
+                self.assertEqual(importer.parse_amount(value), Decimal(expected))
+
+        for value in ("", "abc", "NaN", "1e12", "0,00"):
+            with self.subTest(value=value), self.assertRaises(ImportRowError):
+                importer.parse_amount(value)
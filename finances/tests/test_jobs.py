@@ -0,0 +1,201 @@
+import io
+import tempfile
+from datetime import timedelta
+from unittest import mock
+
+from django.contrib.admin.helpers import ACTION_CHECKBOX_NAME
+from django.core.cache import caches
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from users.models import User
+
+from ..models import Job, Transaction
+from ..services.jobs import JobFailed, JobQueue
+from .base import FinancesTestCase
+
+STATEMENT = b"date,amount\n2026-03-01,-5\n2026-03-02,-7\n"
+
+
+class JobsTestCase(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        files_dir = self.enterContext(tempfile.TemporaryDirectory())
+        self.enterContext(override_settings(JOB_FILES_DIR=files_dir))
+        caches[JobQueue.CACHE_ALIAS].clear()
+
+    def stored_files(self):
+        _, files = JobQueue.file_storage.listdir("imports")
+        return files
+
+
+class TransactionImportJobTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+
+    def upload(self):
+        return self.client.post(
+            reverse("finances:transaction_import"),
+            {"table": self.table.pk, "currency": "UAH", "file": SimpleUploadedFile("statement.csv", STATEMENT)},
+        )
+
+    def run_jobs(self):
+        while (job := JobQueue.claim("test")) is not None:
+            JobQueue.execute(job)
+
+    def test_upload_is_imported_and_its_file_deleted(self):
+        response = self.upload()
+        job = Job.objects.get()
+        self.assertRedirects(response, f"{reverse('finances:transaction_import')}?job={job.pk}")
+        self.assertEqual(len(self.stored_files()), 1)
+
+        self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_double_submit_keeps_one_file(self):
+        self.upload()
+        response = self.upload()
+        job = Job.objects.get()
+        self.assertRedirects(response, f"{reverse('finances:transaction_import')}?job={job.pk}")
+        self.assertEqual(self.stored_files(), [job.payload["file"].split("/")[-1]])
+
+    def test_failed_import_can_be_retried_from_admin(self):
+        self.upload()
+        with mock.patch("finances.jobs.TransactionImporter.run", side_effect=JobFailed("Збій")):
+            self.run_jobs()
+        job = Job.objects.get()
+        self.assertEqual(job.status, Job.FAILED)
+        self.assertEqual(len(self.stored_files()), 1)
+
+        self.client.force_login(User.objects.create_superuser(email="admin@example.com", password="pass-12345"))
+        self.client.post(
+            reverse("admin:finances_job_changelist"), {"action": "retry_jobs", ACTION_CHECKBOX_NAME: [job.pk]}
+        )
+        self.run_jobs()
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.SUCCEEDED)
+        self.assertEqual(Transaction.objects.count(), 2)
+        self.assertEqual(self.stored_files(), [])
+
+    def test_reupload_after_import_leaves_no_file(self):
+        self.upload()
+        self.run_jobs()
+        self.assertEqual(self.stored_files(), [])
+
+        # Saved under the finished job's file name, which is free again
+        response = self.upload()
+        job = Job.objects.get()
+        self.assertRedirects(response, f"{reverse('finances:transaction_import')}?job={job.pk}")
+        self.assertEqual(self.stored_files(), [])
+        self.assertEqual(Transaction.objects.count(), 2)
+
+
+class JobQueueTests(JobsTestCase):
+    def setUp(self):
+        super().setUp()
+        self.calls = []
+        self.enterContext(mock.patch.dict(JobQueue.handlers))
+        JobQueue.register("test", cleanup=lambda job: self.calls.append(("cleanup", job.pk)))(self.handle)
+
+    def handle(self, job):
+        self.calls.append(("run", job.pk))
+        error = job.payload.get("error")
+        if error == "fatal":
+            raise JobFailed("Непоправна помилка")
+        if error:
+            raise RuntimeError(error)
+        return {"ok": True}
+
+    def test_enqueue_is_idempotent(self):
+        job, created = JobQueue.enqueue("test", idempotency_key="key")
+        self.assertTrue(created)
+        self.assertEqual(JobQueue.enqueue("test", idempotency_key="key"), (job, False))
+        self.assertTrue(JobQueue.enqueue("test")[1])
+        self.assertEqual(Job.objects.count(), 2)
+        with self.assertRaises(ValueError):
+            JobQueue.enqueue("unknown")
+
+    def test_claim_order_and_success(self):
+        low, _ = JobQueue.enqueue("test")
+        high, _ = JobQueue.enqueue("test", priority=5)
+        JobQueue.enqueue("test", priority=10, delay=timedelta(hours=1))
+
+        job = JobQueue.claim("worker")
+        self.assertEqual((job.pk, job.status, job.attempts, job.worker), (high.pk, Job.RUNNING, 1, "worker"))
+        JobQueue.execute(job)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.result), (Job.SUCCEEDED, {"ok": True}))
+        self.assertEqual(JobQueue.get_status(job)["result"], {"ok": True})
+        self.assertEqual(self.calls, [("run", high.pk), ("cleanup", high.pk)])
+
+        self.assertEqual(JobQueue.claim("worker").pk, low.pk)
+        # The delayed job is not due yet
+        self.assertIsNone(JobQueue.claim("worker"))
+
+    def test_retry_with_backoff(self):
+        job, _ = JobQueue.enqueue("test", {"error": "збій"}, max_attempts=2)
+        JobQueue.execute(JobQueue.claim("worker"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.QUEUED)
+        self.assertGreater(job.run_after, timezone.now() + timedelta(seconds=JobQueue.RETRY_DELAY - 5))
+        self.assertIn("RuntimeError", job.error)
+
+        Job.objects.update(run_after=timezone.now())
+        JobQueue.execute(JobQueue.claim("worker"))
+        job.refresh_from_db()
+        self.assertEqual(job.status, Job.FAILED)
+        # A failed job is cleaned up only when pruned
+        self.assertEqual(self.calls, [("run", job.pk), ("run", job.pk)])
+
+    def test_job_failed_is_not_retried(self):
+        job, _ = JobQueue.enqueue("test", {"error": "fatal"})
+        JobQueue.execute(JobQueue.claim("worker"))
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (Job.FAILED, 1))
+        self.assertEqual(JobQueue.get_status(job)["error"], "Непоправна помилка")
+
+    @override_settings(JOB_LEASE_SECONDS=60)
+    def test_recover_lost(self):
+        lost, _ = JobQueue.enqueue("test", max_attempts=1)
+        alive, _ = JobQueue.enqueue("test")
+        for _ in range(2):
+            JobQueue.claim("worker")
+        Job.objects.update(started_at=timezone.now() - timedelta(minutes=5))
+        JobQueue.beat(alive.pk)
+
+        self.assertEqual(JobQueue.recover_lost(), 1)
+        lost.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual((lost.status, alive.status), (Job.FAILED, Job.RUNNING))
+        self.assertEqual(self.calls, [])
+
+    def test_prune(self):
+        old, _ = JobQueue.enqueue("test", idempotency_key="key")
+        old_failed, _ = JobQueue.enqueue("test")
+        recent, _ = JobQueue.enqueue("test")
+        queued, _ = JobQueue.enqueue("test")
+        month_ago = timezone.now() - timedelta(days=30)
+        Job.objects.filter(pk=old.pk).update(status=Job.SUCCEEDED, finished_at=month_ago)
+        Job.objects.filter(pk=old_failed.pk).update(status=Job.FAILED, finished_at=month_ago)
+        Job.objects.filter(pk=recent.pk).update(status=Job.FAILED, finished_at=timezone.now())
+
+        self.assertEqual(JobQueue.prune(days=7), 2)
+        self.assertEqual(sorted(Job.objects.values_list("pk", flat=True)), [recent.pk, queued.pk])
+        # Succeeded jobs were cleaned up when they finished
+        self.assertEqual(self.calls, [("cleanup", old_failed.pk)])
+        # The key is free again
+        self.assertTrue(JobQueue.enqueue("test", idempotency_key="key")[1])
+
+    def test_archive_command_enqueues_once(self):
+        for expected in ("додано до черги", "вже є, стан: У черзі"):
+            stdout = io.StringIO()
+            call_command("archive_transactions", before="2021-01-01", enqueue=True, stdout=stdout)
+            self.assertIn(expected, stdout.getvalue())
+        self.assertEqual(Job.objects.filter(kind="archive_transactions").count(), 1)
@@ -0,0 +1,201 @@
+import asyncio
+import json
+import threading
+from datetime import date
+from decimal import Decimal
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.db import transaction as db_transaction
+from django.test import AsyncClient, SimpleTestCase, override_settings
+from django.urls import reverse
+
+from ..models import Category, Transaction
+from ..services.live_updates import CacheBroker, InProcessBroker, LiveUpdates
+from .base import TEST_CACHES, FinancesTestCase
+
+
+class RecordingBroker:
+    def __init__(self, subscribers=True):
+        self.subscribers = subscribers
+        self.events = []
+
+    def has_subscribers(self, user_id):
+        return self.subscribers
+
+    def publish(self, user_id, event):
+        self.events.append((user_id, event))
+
+
+class LiveUpdatesPublishingTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.broker = RecordingBroker()
+        self.enterContext(mock.patch.object(LiveUpdates, "_broker", self.broker))
+        self.category = Category.objects.get(name="Ринок")
+
+    def create(self, amount="10", **kwargs):
+        return Transaction.objects.create(
+            table=self.table,
+            amount=Decimal(amount).quantize(Decimal("0.01")),
+            date=date(2026, 3, 1),
+            category=self.category,
+            **kwargs,
+        )
+
+    def deltas(self):
+        return [
+            (delta["category"], Decimal(delta["amount"]), delta["count"])
+            for _, event in self.broker.events
+            for delta in event["deltas"]
+        ]
+
+    def test_events_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction = self.create()
+            self.assertEqual(self.broker.events, [])
+
+        user_id, event = self.broker.events[0]
+        self.assertEqual(user_id, self.user.pk)
+        self.assertEqual((event["action"], event["ids"], event["stale"]), ("created", [transaction.pk], False))
+        # Subcategories count towards their parent
+        self.assertEqual(
+            event["deltas"],
+            [
+                {
+                    "table": self.table.pk,
+                    "table_title": "Основна",
+                    "category": "Продукти",
+                    "currency": "UAH",
+                    "date": "2026-03-01",
+                    "amount": "10.00",
+                    "count": 1,
+                }
+            ],
+        )
+
+    def test_edit_and_delete(self):
+        transaction = self.create()
+        with self.captureOnCommitCallbacks(execute=True):
+            transaction.amount = Decimal("15")
+            transaction.save()
+            transaction.description = "Лише опис"
+            transaction.save()
+            transaction.delete()
+
+        self.assertEqual([event["action"] for _, event in self.broker.events], ["updated", "updated", "deleted"])
+        # An edit is the new amount minus the old one; a description change moves no totals
+        self.assertEqual(self.deltas(), [("Продукти", 5, 0), ("Продукти", -15, -1)])
+
+    def test_bulk_writes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.bulk_create(
+                [Transaction(table=self.table, amount=Decimal(amount), date=date(2026, 3, 1)) for amount in (1, 2)]
+            )
+            Transaction.objects.filter(table=self.table).delete()
+        self.assertEqual(self.deltas(), [(None, 3, 2), (None, -3, -2)])
+
+        self.broker.events.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            Transaction.objects.bulk_create(
+                [Transaction(table=self.table, amount=Decimal("1"), date=date(2026, 3, 1))], ignore_conflicts=True
+            )
+        self.assertTrue(self.broker.events[0][1]["stale"])
+
+    def test_nothing_published(self):
+        # A rolled back write
+        with self.captureOnCommitCallbacks(execute=True):
+            with self.assertRaises(RuntimeError), db_transaction.atomic():
+                self.create()
+                raise RuntimeError
+        # A user without open pages
+        self.broker.subscribers = False
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create()
+        self.assertEqual(self.broker.events, [])
+
+    def test_format(self):
+        self.set_rates()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create("2", currency="USD")
+        message = async_to_sync(LiveUpdates.aformat)(self.broker.events[0][1])
+        self.assertTrue(message.startswith("event: transactions\ndata: "))
+        delta = json.loads(message.split("data: ", 1)[1])["deltas"][0]
+        self.assertEqual((delta["amount_uah"], delta["month_label"]), (80.0, "Mar 2026"))
+
+
+class LiveEventsViewTests(FinancesTestCase):
+    def test_not_served_under_wsgi(self):
+        self.client.force_login(self.user)
+        for name in ("finances:dashboard", "finances:analytics"):
+            self.assertContains(self.client.get(reverse(name)), '"events_url": null')
+
+        # Read to the end synchronously, as a WSGI server does; an endless stream would never return
+        reader = threading.Thread(target=lambda: self.read_events(self.client), daemon=True)
+        reader.start()
+        reader.join(timeout=5)
+        self.assertFalse(reader.is_alive())
+        self.assertEqual(self.events_response.status_code, 204)
+        self.assertEqual(self.events_content, b"")
+
+    def read_events(self, client):
+        self.events_response = client.get(reverse("finances:live_events"))
+        self.events_content = b"".join(self.events_response)
+
+    def test_streamed_under_asgi(self):
+        async def scenario():
+            client = AsyncClient()
+            await client.aforce_login(self.user)
+            page = await client.get(reverse("finances:dashboard"))
+            response = await client.get(reverse("finances:live_events"))
+            stream = response.streaming_content
+            first = await anext(stream)
+            await stream.aclose()
+            return page, response, first
+
+        page, response, first = async_to_sync(scenario)()
+        self.assertContains(page, f'"events_url": "{reverse("finances:live_events")}"')
+        self.assertEqual(response["Content-Type"], "text/event-stream")
+        self.assertEqual(first, f"retry: {LiveUpdates.RETRY}\n\n".encode())
+        # Closing the stream ended the subscription
+        self.assertFalse(LiveUpdates.broker.has_subscribers(self.user.pk))
+
+
+@override_settings(CACHES=TEST_CACHES)
+class BrokerTests(SimpleTestCase):
+    def test_in_process(self):
+        broker = InProcessBroker()
+
+        async def scenario():
+            subscription = broker.subscribe(1)
+            self.assertTrue(broker.has_subscribers(1))
+            broker.publish(1, {"n": 1})
+            broker.publish(2, {"n": 2})
+            first = await subscription.get(timeout=1)
+            nothing = await subscription.get(timeout=0.01)
+            subscription.close()
+            return first, nothing
+
+        self.assertEqual(async_to_sync(scenario)(), ({"n": 1}, None))
+        self.assertFalse(broker.has_subscribers(1))
+
+    def test_cache(self):
+        from django.core.cache import caches
+
+        caches["shared"].clear()
+        broker = CacheBroker({"CACHE": "shared", "POLL_INTERVAL": 0.01})
+        self.assertFalse(broker.has_subscribers(1))
+
+        async def scenario():
+            broker.publish(1, {"n": 0})
+            subscription = broker.subscribe(1)
+            # Events from before the subscription are not replayed
+            self.assertIsNone(await subscription.get(timeout=0.05))
+            broker.publish(1, {"n": 1})
+            broker.publish(1, {"n": 2})
+            events = [await subscription.get(timeout=1), await subscription.get(timeout=1)]
+            subscription.close()
+            return events
+
+        self.assertEqual(asyncio.run(scenario()), [{"n": 1}, {"n": 2}])
+        self.assertTrue(broker.has_subscribers(1))
@@ -0,0 +1,69 @@
+from django.test import override_settings
+from django.urls import reverse
+
+from ..services.metrics import Metrics
+from .base import FinancesTestCase
+
+DASHBOARD = "finances.views.dashboard"
+
+
+class RequestMetricsTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        Metrics.reset()
+        self.addCleanup(Metrics.reset)
+        self.set_rates()
+        self.client.force_login(self.user)
+
+    def test_requests_are_recorded_per_view(self):
+        self.client.get(reverse("finances:dashboard"))
+        self.client.get(reverse("finances:dashboard"))
+        self.client.get("/no-such-page/")
+
+        self.assertEqual(Metrics._counters[("requests_total", DASHBOARD, "200")], 2)
+        self.assertEqual(Metrics._counters[("requests_total", "unresolved", "404")], 1)
+        self.assertEqual(Metrics._histograms[("request_duration_seconds", DASHBOARD)].count, 2)
+        # The rates come from the cache, the query wrapper sees the view's SQL
+        self.assertEqual(Metrics._counters[("cache_hits_total", DASHBOARD, None)], 2)
+        self.assertGreater(Metrics._histograms[("db_queries", DASHBOARD)].sum, 0)
+
+    def test_query_budget(self):
+        with override_settings(METRICS_QUERY_BUDGETS={DASHBOARD: 0}):
+            with self.assertLogs("finances.services.metrics", "WARNING") as logs:
+                self.client.get(reverse("finances:dashboard"))
+        self.assertIn(f"{DASHBOARD}:", logs.output[0])
+        self.assertEqual(Metrics._counters[("query_budget_exceeded_total", DASHBOARD, None)], 1)
+
+        with override_settings(METRICS_QUERY_BUDGETS={DASHBOARD: 1000}), self.assertNoLogs(
+            "finances.services.metrics", "WARNING"
+        ):
+            self.client.get(reverse("finances:dashboard"))
+
+    def test_render(self):
+        self.client.get(reverse("finances:dashboard"))
+        text = Metrics.render()
+        self.assertIn("# TYPE finances_requests_total counter", text)
+        self.assertIn(f'finances_requests_total{{view="{DASHBOARD}",status="200"}} 1', text)
+        self.assertIn(f'finances_request_duration_seconds_count{{view="{DASHBOARD}"}} 1', text)
+        self.assertIn(f'finances_db_queries{{view="{DASHBOARD}",quantile="0.95"}}', text)
+
+    def test_format_labels_escapes_values(self):
+        self.assertEqual(Metrics.format_labels({"view": 'a"b\\c\n'}), '{view="a\\"b\\\\c\\n"}')
+
+
+class MetricsEndpointTests(FinancesTestCase):
+    def test_allowed_address(self):
+        response = self.client.get(reverse("finances:metrics"), REMOTE_ADDR="127.0.0.1")
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response["Content-Type"].startswith("text/plain; version=0.0.4"))
+
+    def test_other_addresses_need_staff(self):
+        url = reverse("finances:metrics")
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.0.0.5").status_code, 403)
+
+        self.client.force_login(self.user)
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.0.0.5").status_code, 403)
+
+        self.user.is_staff = True
+        self.user.save()
+        self.assertEqual(self.client.get(url, REMOTE_ADDR="10.0.0.5").status_code, 200)
@@ -0,0 +1,53 @@
+from datetime import date
+from decimal import Decimal
+
+from ..models import Table, Tombstone, Transaction
+from .base import FinancesTestCase
+
+
+class TransactionOwnerTests(FinancesTestCase):
+    def test_save_copies_owner_from_table(self):
+        transaction = Transaction.objects.create(table=self.table, amount=Decimal("1"), date=date(2026, 3, 1))
+        self.assertEqual(transaction.user_id, self.user.pk)
+
+        other = Table.objects.create(user=self.create_user("other@example.com"), title="Інша")
+        transaction.table = other
+        transaction.save(update_fields=["table"])
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.user_id, other.user_id)
+
+    def test_bulk_create_looks_owners_up_once(self):
+        other = Table.objects.create(user=self.create_user("other@example.com"), title="Інша")
+        transactions = [
+            Transaction(table_id=table.pk, amount=Decimal("1"), date=date(2026, 3, 1))
+            for table in (self.table, other, self.table)
+        ]
+        with self.assertNumQueries(2):
+            Transaction.objects.bulk_create(transactions)
+        self.assertEqual(
+            list(Transaction.objects.order_by("pk").values_list("user_id", flat=True)),
+            [self.user.pk, other.user_id, self.user.pk],
+        )
+
+    def test_table_owner_change_moves_transactions(self):
+        transaction = Transaction.objects.create(table=self.table, amount=Decimal("1"), date=date(2026, 3, 1))
+        new_owner = self.create_user("new@example.com")
+
+        table = Table.objects.get(pk=self.table.pk)
+        table.user = new_owner
+        table.save()
+
+        transaction.refresh_from_db()
+        self.assertEqual(transaction.user_id, new_owner.pk)
+        self.assertEqual(list(Transaction.objects.owned_by(self.user)), [])
+        # The previous owner's sync learns that the table is gone
+        self.assertTrue(
+            Tombstone.objects.filter(kind=Tombstone.TABLE, object_id=self.table.pk, user=self.user).exists()
+        )
+
+    def test_saving_a_table_without_owner_change_leaves_transactions(self):
+        Transaction.objects.create(table=self.table, amount=Decimal("1"), date=date(2026, 3, 1))
+        table = Table.objects.get(pk=self.table.pk)
+        table.title = "Нова назва"
+        with self.assertNumQueries(1):
+            table.save()
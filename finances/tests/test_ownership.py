@@ -0,0 +1,54 @@
+from datetime import date
+from decimal import Decimal
+
+from django.urls import reverse
+
+from ..models import Table, Transaction
+from .base import FinancesTestCase
+
+
+class OwnedObjectViewTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.transaction = Transaction.objects.create(table=self.table, amount=Decimal("10"), date=date(2026, 3, 1))
+        self.stranger = self.create_user("other@example.com")
+        self.foreign_table = Table.objects.create(user=self.stranger, title="Чужа")
+        self.foreign_transaction = Transaction.objects.create(
+            table=self.foreign_table, amount=Decimal("7"), date=date(2026, 3, 1)
+        )
+        self.client.force_login(self.user)
+
+    def test_foreign_objects_are_not_found(self):
+        for name, obj in (
+            ("table_edit", self.foreign_table),
+            ("table_delete", self.foreign_table),
+            ("transaction_edit", self.foreign_transaction),
+            ("transaction_delete", self.foreign_transaction),
+        ):
+            url = reverse(f"finances:{name}", args=[obj.pk])
+            self.assertEqual(self.client.get(url).status_code, 404, name)
+            self.assertEqual(self.client.post(url).status_code, 404, name)
+        self.assertTrue(Table.objects.filter(pk=self.foreign_table.pk).exists())
+        self.assertTrue(Transaction.objects.filter(pk=self.foreign_transaction.pk).exists())
+
+    def test_own_transaction_is_deleted(self):
+        response = self.client.post(reverse("finances:transaction_delete", args=[self.transaction.pk]))
+        self.assertRedirects(response, reverse("finances:transaction_list"))
+        self.assertFalse(Transaction.objects.filter(pk=self.transaction.pk).exists())
+
+    def test_transaction_cannot_move_to_foreign_table(self):
+        response = self.client.post(
+            reverse("finances:transaction_edit", args=[self.transaction.pk]),
+            {"table": self.foreign_table.pk, "amount": "10", "currency": "UAH", "date": "2026-03-01"},
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("table", response.context["form"].errors)
+        self.transaction.refresh_from_db()
+        self.assertEqual(self.transaction.table_id, self.table.pk)
+
+    def test_lists_show_own_rows_only(self):
+        self.assertEqual(list(Table.objects.owned_by(self.user)), [self.table])
+        response = self.client.get(reverse("finances:table_list"))
+        self.assertEqual(list(response.context["object_list"]), [self.table])
+        response = self.client.get(reverse("finances:transaction_list"))
+        self.assertEqual([transaction.pk for transaction in response.context["transactions"]], [self.transaction.pk])
@@ -0,0 +1,63 @@
+import tempfile
+
+from django.test import override_settings
+from django.urls import reverse
+
+from ..services.profiling import RequestProfiler
+from .base import FinancesTestCase
+
+
+class ProfilingTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.enterContext(override_settings(PROFILING_DIR=directory.name))
+        self.set_rates()
+        self.user.is_staff = True
+        self.user.save()
+        self.client.force_login(self.user)
+
+    def test_staff_request_is_profiled(self):
+        response = self.client.get(reverse("finances:dashboard"), HTTP_X_PROFILE="1")
+        self.assertEqual(response.status_code, 200)
+        url = response["X-Profile-Url"]
+        profile_id = url.rstrip("/").rsplit("/", 1)[-1]
+
+        profile = RequestProfiler.load(profile_id)
+        self.assertEqual(profile["view"], "finances.views.dashboard")
+        self.assertTrue(profile["functions"])
+        self.assertEqual(len(profile["queries"]), sum(group["count"] for group in profile["query_groups"]))
+
+        self.assertEqual(self.client.get(url).status_code, 200)
+        self.assertEqual(
+            [p["id"] for p in self.client.get(reverse("finances:profile_list")).context["profiles"]], [profile_id]
+        )
+
+    def test_only_staff_and_only_on_request(self):
+        self.assertNotIn("X-Profile-Url", self.client.get(reverse("finances:dashboard")))
+
+        self.user.is_staff = False
+        self.user.save()
+        response = self.client.get(reverse("finances:dashboard"), {"_profile": "1"})
+        self.assertNotIn("X-Profile-Url", response)
+        self.assertEqual(RequestProfiler.list_profiles(), [])
+
+    def test_one_profile_at_a_time(self):
+        other = RequestProfiler(None)
+        self.assertTrue(other.start())
+        try:
+            # A second profiler can't run alongside, the request is served without one
+            response = self.client.get(reverse("finances:dashboard"), HTTP_X_PROFILE="1")
+        finally:
+            other.stop()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response["X-Profile-Skipped"], "busy")
+        self.assertNotIn("X-Profile-Url", response)
+
+        response = self.client.get(reverse("finances:dashboard"), HTTP_X_PROFILE="1")
+        self.assertIn("X-Profile-Url", response)
+
+    def test_invalid_profile_id(self):
+        self.assertIsNone(RequestProfiler.load("../settings"))
+        self.assertEqual(self.client.get(reverse("finances:profile_detail", args=["missing"])).status_code, 404)
@@ -0,0 +1,93 @@
+from unittest import mock
+
+from asgiref.sync import async_to_sync
+from django.contrib.sessions.middleware import SessionMiddleware
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+from django.views import View
+
+from ..models import Transaction
+from ..routers import (
+    ReplicaReadMixin,
+    ReplicaRouter,
+    ReplicaRoutingMiddleware,
+    pinned_to_primary,
+    replica_reads,
+    use_replica,
+)
+
+
+def read_alias_view(request):
+    return HttpResponse(ReplicaRouter.get_read_alias())
+
+
+class ReplicaRouterTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(mock.patch.object(ReplicaRouter, "is_enabled", return_value=True))
+        self.router = ReplicaRouter()
+
+    def test_reads_go_to_replica_only_when_opted_in(self):
+        self.assertEqual(self.router.db_for_read(Transaction), "default")
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Transaction), "replica")
+            with pinned_to_primary():
+                self.assertEqual(self.router.db_for_read(Transaction), "default")
+            # Writes never follow the reads
+            self.assertEqual(self.router.db_for_write(Transaction), "default")
+        self.assertEqual(self.router.db_for_read(Transaction), "default")
+
+    def test_disabled_without_replica_database(self):
+        with mock.patch.object(ReplicaRouter, "is_enabled", return_value=False), replica_reads():
+            self.assertEqual(self.router.db_for_read(Transaction), "default")
+
+    def test_no_migrations_on_replica(self):
+        self.assertTrue(self.router.allow_migrate("default", "finances"))
+        self.assertFalse(self.router.allow_migrate("replica", "finances"))
+
+    def test_view_opt_in(self):
+        class ReplicaView(ReplicaReadMixin, View):
+            def get(self, request):
+                return read_alias_view(request)
+
+        request = RequestFactory().get("/")
+        self.assertEqual(use_replica(read_alias_view)(request).content, b"replica")
+        self.assertEqual(ReplicaView.as_view()(request).content, b"replica")
+
+        async def async_view(request):
+            return read_alias_view(request)
+
+        self.assertEqual(async_to_sync(use_replica(async_view))(request).content, b"replica")
+
+
+@override_settings(REPLICA_STICKY_SECONDS=15)
+class ReplicaRoutingMiddlewareTests(SimpleTestCase):
+    def setUp(self):
+        super().setUp()
+        self.enterContext(mock.patch.object(ReplicaRouter, "is_enabled", return_value=True))
+        self.middleware = ReplicaRoutingMiddleware(use_replica(read_alias_view))
+        self.session = None
+
+    def request(self, method, now):
+        request = getattr(RequestFactory(), method)("/")
+        SessionMiddleware(lambda request: None).process_request(request)
+        if self.session is not None:
+            request.session.update(self.session)
+        request.session["user"] = "owner"
+        with mock.patch("finances.routers.time.time", return_value=now):
+            response = self.middleware(request)
+        self.session = dict(request.session)
+        return response.content.decode()
+
+    def test_reads_your_writes(self):
+        self.assertEqual(self.request("get", now=1000), "replica")
+        # The write itself and reads for the next REPLICA_STICKY_SECONDS use the primary
+        self.request("post", now=1000)
+        self.assertEqual(self.request("get", now=1010), "default")
+        self.assertEqual(self.request("get", now=1016), "replica")
+
+    def test_logout_does_not_pin(self):
+        request = RequestFactory().post("/")
+        SessionMiddleware(lambda request: None).process_request(request)
+        self.middleware(request)
+        self.assertNotIn(ReplicaRouter.SESSION_KEY, request.session)
@@ -0,0 +1,71 @@
+import io
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, override_settings
+
+from ..services.sqlite_tuning import SQLiteTuning
+
+
+class SQLiteTuningTests(SimpleTestCase):
+    def open_connection(self):
+        """A fresh connection to a file database, configured through connection_created"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        wrapper = DatabaseWrapper(
+            {**connection.settings_dict, "NAME": str(Path(directory.name) / "tuning.sqlite3")}, alias="tuning"
+        )
+        self.addCleanup(wrapper.close)
+        wrapper.ensure_connection()
+        return wrapper
+
+    def pragma(self, wrapper, name):
+        with wrapper.cursor() as cursor:
+            cursor.execute(f"PRAGMA {name}")
+            return cursor.fetchone()[0]
+
+    @override_settings(SQLITE_PRAGMAS={"journal_mode": "WAL", "cache_size": -2000, "busy_timeout": 1234})
+    def test_pragmas_applied_to_new_connections(self):
+        wrapper = self.open_connection()
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "wal")
+        self.assertEqual(self.pragma(wrapper, "cache_size"), -2000)
+        self.assertEqual(self.pragma(wrapper, "busy_timeout"), 1234)
+
+    @override_settings(SQLITE_PRAGMAS={})
+    def test_no_pragmas(self):
+        wrapper = self.open_connection()
+        self.assertEqual(self.pragma(wrapper, "journal_mode"), "delete")
+
+    def test_rejects_pragma_names(self):
+        cursor = mock.Mock()
+        with self.assertRaises(ValueError):
+            SQLiteTuning.apply_pragmas(cursor, {"cache_size = 1; DROP TABLE x; --": 1})
+        cursor.execute.assert_not_called()
+
+    @override_settings(SQLITE_OPTIMIZE_INTERVAL=60)
+    def test_optimize_interval(self):
+        with mock.patch.object(SQLiteTuning, "_last_optimize", None), mock.patch(
+            "finances.services.sqlite_tuning.monotonic", side_effect=[100, 130, 161, 170]
+        ):
+            # The first connection only starts the clock
+            self.assertEqual([SQLiteTuning.optimize_due() for _ in range(4)], [False, False, True, False])
+
+    @override_settings(SQLITE_OPTIMIZE_INTERVAL=0)
+    def test_optimize_disabled(self):
+        self.assertFalse(SQLiteTuning.optimize_due())
+
+
+class SQLiteMaintenanceTests(SimpleTestCase):
+    databases = {"default"}
+
+    def test_runs_all_steps(self):
+        stdout = io.StringIO()
+        call_command("sqlite_maintenance", stdout=stdout)
+        output = stdout.getvalue()
+        for statement in ("ANALYZE", "PRAGMA optimize", "PRAGMA wal_checkpoint(TRUNCATE)"):
+            self.assertIn(f"{statement}:", output)
+        self.assertIn("journal_mode=", output)
@@ -0,0 +1,98 @@
+import gzip
+import json
+import shutil
+import sys
+import tempfile
+from pathlib import Path
+from unittest import mock
+
+from django.http import HttpResponseNotFound
+from django.templatetags.static import static
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from ..middleware import StaticFilesMiddleware
+from ..storage import CompressedManifestStaticFilesStorage
+
+
+class StaticFilesTestCase(SimpleTestCase):
+    def setUp(self):
+        self.root = Path(tempfile.mkdtemp())
+        self.addCleanup(shutil.rmtree, self.root)
+
+    def write(self, name, content):
+        path = self.root / name
+        path.write_text(content)
+        return path
+
+
+class CompressedStorageTests(StaticFilesTestCase):
+    def test_compresses_only_files_worth_it(self):
+        self.write("app.css", "body { color: red; }\n" * 100)
+        self.write("tiny.js", "let a = 1;")
+        self.write("logo.png", "x" * 1000)
+        storage = CompressedManifestStaticFilesStorage(location=self.root)
+
+        with mock.patch.dict(sys.modules, {"brotli": None}), self.assertLogs("finances.storage", "WARNING"):
+            storage.compress_files(
+                sorted(name for name in ["app.css", "tiny.js", "logo.png"] if storage.is_compressible(name))
+            )
+
+        self.assertEqual(gzip.decompress((self.root / "app.css.gz").read_bytes()), (self.root / "app.css").read_bytes())
+        self.assertFalse((self.root / "tiny.js.gz").exists())
+        self.assertFalse((self.root / "logo.png.gz").exists())
+
+    def test_static_without_manifest_uses_unhashed_name(self):
+        with override_settings(STATIC_ROOT=self.root):
+            self.assertEqual(static("css/base.css"), "/static/css/base.css")
+
+
+class StaticFilesMiddlewareTests(StaticFilesTestCase):
+    def setUp(self):
+        super().setUp()
+        css = "body { color: red; }\n" * 100
+        for name in ("app.css", "app.0123456789ab.css"):
+            self.write(name, css)
+            (self.root / f"{name}.gz").write_bytes(gzip.compress(css.encode()))
+        self.write(
+            "staticfiles.json", json.dumps({"paths": {"app.css": "app.0123456789ab.css"}, "version": "1.1", "hash": ""})
+        )
+        settings_override = override_settings(STATIC_ROOT=self.root, SERVE_STATIC=True)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_serves_precompressed_copy(self):
+        response = self.client.get("/static/app.css", HTTP_ACCEPT_ENCODING="gzip, deflate")
+        self.assertEqual(response["Content-Encoding"], "gzip")
+        self.assertEqual(response["Vary"], "Accept-Encoding")
+        self.assertEqual(gzip.decompress(b"".join(response.streaming_content)), (self.root / "app.css").read_bytes())
+
+    def test_refused_encoding_gets_original(self):
+        response = self.client.get("/static/app.css", HTTP_ACCEPT_ENCODING="gzip;q=0")
+        self.assertNotIn("Content-Encoding", response)
+
+    def test_hashed_names_are_immutable(self):
+        hashed = self.client.get("/static/app.0123456789ab.css")
+        plain = self.client.get("/static/app.css")
+        self.assertIn("immutable", hashed["Cache-Control"])
+        self.assertNotIn("immutable", plain["Cache-Control"])
+
+    def test_unknown_files_fall_through(self):
+        for path in ("/static/missing.css", "/static/../settings.py", "/static/"):
+            with self.subTest(path=path):
+                self.assertEqual(self.client.get(path).status_code, 404)
+
+    def test_files_are_listed_once(self):
+        middleware = StaticFilesMiddleware(lambda request: HttpResponseNotFound())
+        factory = RequestFactory()
+        self.assertEqual(middleware(factory.get("/static/app.css")).status_code, 200)
+        names = set(middleware.files)
+        self.assertIn("app.css.gz", names)
+
+        # Misses are not remembered, and STATIC_ROOT is not read again
+        self.write("late.css", "body {}")
+        with mock.patch("os.walk") as walk:
+            for index in range(3):
+                self.assertEqual(middleware(factory.get(f"/static/random-{index}.css")).status_code, 404)
+            self.assertEqual(middleware(factory.get("/static/late.css")).status_code, 404)
+        walk.assert_not_called()
+        self.assertEqual(set(middleware.files), names)
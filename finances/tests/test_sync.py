@@ -0,0 +1,114 @@
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from datetime import timezone as dt_timezone
+from decimal import Decimal
+from unittest import mock
+
+from django.core import signing
+from django.test import override_settings
+from django.urls import reverse
+
+from ..api.views import SyncApiView
+from ..models import Category, Transaction
+from .base import FinancesTestCase
+
+START = datetime(2026, 3, 1, 12, 0, tzinfo=dt_timezone.utc)
+
+
+@contextmanager
+def clock(moment):
+    """Both the sync snapshot and auto_now stamps read this time"""
+    with mock.patch("django.utils.timezone.now", return_value=moment):
+        yield
+
+
+@override_settings(SYNC_LAG_SECONDS=30)
+class SyncApiTests(FinancesTestCase):
+    def setUp(self):
+        super().setUp()
+        self.client.force_login(self.user)
+        # Everything, the categories from the migrations included, was last written at START
+        Category.objects.update(updated_at=START)
+        with clock(START):
+            self.table.save()
+            self.transactions = [
+                Transaction.objects.create(table=self.table, amount=Decimal(index + 1), date=START.date())
+                for index in range(5)
+            ]
+
+    def sync(self, moment, cursor=None, limit=None):
+        params = {key: value for key, value in (("cursor", cursor), ("limit", limit)) if value is not None}
+        with clock(moment):
+            response = self.client.get(reverse("api_v1:sync"), params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()
+
+    def sync_all(self, moment, cursor=None, limit=None):
+        """Follows has_more; returns the merged pages and the cursor to keep"""
+        pages = []
+        while True:
+            page = self.sync(moment, cursor, limit)
+            pages.append(page)
+            cursor = page["cursor"]
+            if not page["has_more"]:
+                break
+        merged = {key: [row["id"] for page in pages for row in page[key]] for key in ("tables", "transactions")}
+        merged["deleted"] = [pk for page in pages for pk in page["deleted"]["transactions"]]
+        return merged, cursor, pages
+
+    def test_full_sync_in_pages(self):
+        merged, _, pages = self.sync_all(START + timedelta(hours=1), limit=2)
+        self.assertGreater(len(pages), 3)
+        self.assertEqual(merged["transactions"], [transaction.pk for transaction in self.transactions])
+        self.assertEqual(merged["tables"], [self.table.pk])
+        self.assertEqual(len([row for page in pages for row in page["categories"]]), Category.objects.count())
+
+    def test_changes_and_deletions_since_cursor(self):
+        _, cursor, _ = self.sync_all(START + timedelta(hours=1))
+
+        changed, deleted = self.transactions[1], self.transactions[3]
+        deleted_pk = deleted.pk
+        with clock(START + timedelta(hours=2)):
+            changed.description = "Оновлено"
+            changed.save()
+            deleted.delete()
+
+        merged, cursor, pages = self.sync_all(START + timedelta(hours=3), cursor)
+        self.assertEqual(merged["transactions"], [changed.pk])
+        self.assertEqual(merged["deleted"], [deleted_pk])
+        self.assertEqual(pages[0]["transactions"][0]["description"], "Оновлено")
+
+        merged, _, _ = self.sync_all(START + timedelta(hours=4), cursor)
+        self.assertEqual(merged, {"tables": [], "transactions": [], "deleted": []})
+
+    def test_write_overlapping_a_sync_is_not_skipped(self):
+        synced_at = START + timedelta(hours=1)
+        _, cursor, _ = self.sync_all(synced_at)
+
+        # A batch stamped before the sync ran whose transaction committed only after it
+        with clock(synced_at - timedelta(seconds=10)):
+            late = Transaction.objects.create(table=self.table, amount=Decimal("9"), date=START.date())
+
+        merged, _, _ = self.sync_all(synced_at + timedelta(minutes=5), cursor)
+        self.assertEqual(merged["transactions"], [late.pk])
+
+    def test_snapshot_stops_before_the_lag(self):
+        synced_at = START + timedelta(seconds=10)
+        merged, cursor, _ = self.sync_all(synced_at)
+        # Rows stamped within SYNC_LAG_SECONDS of the request wait for the next sync
+        self.assertEqual(merged["transactions"], [])
+        merged, _, _ = self.sync_all(synced_at + timedelta(minutes=1), cursor)
+        self.assertEqual(len(merged["transactions"]), 5)
+
+    def test_expired_cursor_resets(self):
+        state = {"user": self.user.pk, "since": START.isoformat(), "until": None, "stream": 0, "after": None}
+        cursor = signing.dumps(state, salt=SyncApiView.CURSOR_SALT, compress=True)
+        page = self.sync(START + timedelta(days=365), cursor)
+        self.assertTrue(page["reset"])
+        self.assertEqual(len(page["transactions"]), 5)
+
+    def test_cursor_of_another_user_is_rejected(self):
+        _, cursor, _ = self.sync_all(START + timedelta(hours=1))
+        self.client.force_login(self.create_user("other@example.com"))
+        response = self.client.get(reverse("api_v1:sync"), {"cursor": cursor})
+        self.assertEqual(response.status_code, 400)
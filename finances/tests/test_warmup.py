@@ -0,0 +1,58 @@
+import importlib
+import io
+from unittest import mock
+
+from django.core.management import call_command
+from django.test import SimpleTestCase, override_settings
+
+from ..services.category_tree import CategoryTree
+from ..services.warmup import Warmup
+from .base import FinancesTestCase
+
+
+class WarmupTests(FinancesTestCase):
+    def test_run_fills_caches(self):
+        self.set_rates()
+        with mock.patch.object(CategoryTree, "get_nodes", wraps=CategoryTree.get_nodes) as get_nodes:
+            report = Warmup.run()
+        self.assertEqual(list(report), ["urls", "templates", "category_tree", "exchange_rates"])
+        get_nodes.assert_called_once()
+        self.assertGreater(Warmup.load_templates(), 0)
+
+    def test_failing_step_is_skipped(self):
+        def broken():
+            raise RuntimeError("немає зв'язку")
+
+        with mock.patch.object(Warmup, "get_steps", return_value=[("broken", broken), ("urls", Warmup.load_urls)]):
+            with self.assertLogs("finances.services.warmup", "WARNING") as logs:
+                report = Warmup.run()
+        self.assertEqual(list(report), ["broken", "urls"])
+        self.assertIn("немає зв'язку", logs.output[0])
+
+    def test_command(self):
+        stdout = io.StringIO()
+        with mock.patch.object(Warmup, "run", return_value={"urls": 1.5}):
+            call_command("warmup", stdout=stdout)
+        self.assertIn("urls", stdout.getvalue())
+
+
+class WorkerWarmupTests(SimpleTestCase):
+    def test_closes_connections(self):
+        with mock.patch.object(Warmup, "run", return_value={}) as run, mock.patch(
+            "finances.services.warmup.connections.close_all"
+        ) as close_all:
+            Warmup.run_in_worker()
+        run.assert_called_once()
+        close_all.assert_called_once()
+
+    @override_settings(WARMUP_ON_STARTUP=False)
+    def test_disabled(self):
+        with mock.patch.object(Warmup, "run") as run:
+            self.assertIsNone(Warmup.run_in_worker())
+        run.assert_not_called()
+
+    def test_not_run_at_import(self):
+        with mock.patch.object(Warmup, "run") as run:
+            for module in ("config.wsgi", "config.asgi"):
+                importlib.reload(importlib.import_module(module))
+        run.assert_not_called()
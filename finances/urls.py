@@ -6,14 +6,22 @@ app_name = "finances"
 
 urlpatterns = [
     path("dashboard/", views.dashboard, name="dashboard"),
+    path("events/", views.live_events, name="live_events"),
     path("tables/", views.TableListView.as_view(), name="table_list"),
     path("tables/create/", views.TableCreateView.as_view(), name="table_create"),
     path("tables/<int:pk>/edit/", views.TableUpdateView.as_view(), name="table_edit"),
     path("tables/<int:pk>/delete/", views.TableDeleteView.as_view(), name="table_delete"),
     path("transactions/", views.TransactionListView.as_view(), name="transaction_list"),
+    path("transactions/export/", views.TransactionExportView.as_view(), name="transaction_export"),
+    path("transactions/import/", views.TransactionImportView.as_view(), name="transaction_import"),
     path("transactions/create/", views.TransactionCreateView.as_view(), name="transaction_create"),
+    path("transactions/create/bulk/", views.TransactionBulkCreateView.as_view(), name="transaction_bulk_create"),
     path("transactions/<int:pk>/edit/", views.TransactionUpdateView.as_view(), name="transaction_edit"),
     path("transactions/<int:pk>/delete/", views.TransactionDeleteView.as_view(), name="transaction_delete"),
+    path("jobs/<int:pk>/", views.JobStatusView.as_view(), name="job_status"),
     path("currency-converter/", views.currency_converter, name="currency_converter"),
     path("analytics/", views.AnalyticsView.as_view(), name="analytics"),
+    path("metrics", views.metrics, name="metrics"),
+    path("profiles/", views.profile_list, name="profile_list"),
+    path("profiles/<str:profile_id>/", views.profile_detail, name="profile_detail"),
 ]
@@ -1,19 +1,61 @@
+import asyncio
+import hashlib
 import json
 from datetime import datetime, timedelta
 
+from django.conf import settings
 from django.contrib import messages
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth.mixins import LoginRequiredMixin, UserPassesTestMixin
-from django.db.models import Q, Sum
-from django.http import JsonResponse
-from django.shortcuts import render
-from django.urls import reverse_lazy
+from django.contrib.auth.mixins import LoginRequiredMixin
+from django.core.cache import cache
+from django.db.models import Case, Count, F, Max, Sum, Value, When
+from django.http import FileResponse, Http404, HttpResponse, HttpResponseForbidden, JsonResponse, StreamingHttpResponse
+from django.shortcuts import redirect, render
+from django.urls import reverse, reverse_lazy
 from django.utils import timezone
-from django.views.generic import CreateView, DeleteView, ListView, TemplateView, UpdateView
+from django.views.generic import CreateView, DeleteView, FormView, ListView, TemplateView, UpdateView, View
 
-from .forms import TableForm, TransactionFilterForm, TransactionForm
-from .models import Category, Table, Transaction
+from .forms import TableForm, TransactionFilterForm, TransactionForm, TransactionFormSet, TransactionImportForm
+from .models import ArchivedTransaction, Job, Table, Transaction, TransactionRollup
+from .routers import ReplicaReadMixin, ReplicaRouter, use_replica
+from .services.category_tree import CategoryTree
 from .services.currency_converter import CurrencyConverter
+from .services.jobs import JobQueue
+from .services.live_updates import LiveUpdates
+from .services.metrics import Metrics
+from .services.profiling import RequestProfiler
+from .services.transaction_archive import CombinedTransactions, MergedTransactions, TransactionArchive
+from .services.transaction_export import TransactionExporter
+
+
+class AsyncLoginRequiredMixin(LoginRequiredMixin):
+    """LoginRequiredMixin for class-based views with async handlers"""
+
+    async def dispatch(self, request, *args, **kwargs):
+        # Load the user without blocking and keep it, so rendering never touches the database lazily
+        request.user = await request.auser()
+        if not request.user.is_authenticated:
+            return self.handle_no_permission()
+        return await super(LoginRequiredMixin, self).dispatch(request, *args, **kwargs)
+
+
+class OwnedObjectMixin:
+    """
+    Single-object views over the current user's rows only: another user's id is a 404, and the object is
+    fetched with one query per request however many times get_object() is called.
+    """
+
+    def get_queryset(self):
+        return super().get_queryset().owned_by(self.request.user)
+
+    def get_object(self, queryset=None):
+        if queryset is not None:
+            return super().get_object(queryset)
+        if not hasattr(self, "_owned_object"):
+            self._owned_object = super().get_object()
+        return self._owned_object
+
 
 # === TABLE VIEWS ===
 
@@ -27,7 +69,7 @@ class TableListView(LoginRequiredMixin, ListView):
 
     def get_queryset(self):
         # Return only tables belonging to current user
-        return Table.objects.filter(user=self.request.user)
+        return Table.objects.owned_by(self.request.user)
 
 
 class TableCreateView(LoginRequiredMixin, CreateView):
@@ -45,7 +87,7 @@ class TableCreateView(LoginRequiredMixin, CreateView):
         return super().form_valid(form)
 
 
-class TableUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class TableUpdateView(LoginRequiredMixin, OwnedObjectMixin, UpdateView):
     """Update existing table"""
 
     model = Table
@@ -53,28 +95,18 @@ class TableUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
     template_name = "finances/table_form.html"
     success_url = reverse_lazy("finances:table_list")
 
-    def test_func(self):
-        # Check if user owns the table
-        table = self.get_object()
-        return self.request.user == table.user
-
     def form_valid(self, form):
         messages.success(self.request, "Таблицю успішно оновлено!")
         return super().form_valid(form)
 
 
-class TableDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class TableDeleteView(LoginRequiredMixin, OwnedObjectMixin, DeleteView):
     """Delete table"""
 
     model = Table
     template_name = "finances/table_confirm_delete.html"
     success_url = reverse_lazy("finances:table_list")
 
-    def test_func(self):
-        # Check if user owns the table
-        table = self.get_object()
-        return self.request.user == table.user
-
     def delete(self, request, *args, **kwargs):
         messages.success(request, "Таблицю успішно видалено!")
         return super().delete(request, *args, **kwargs)
@@ -94,33 +126,29 @@ class TransactionListView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         # Get transactions for current user with related data
         user = self.request.user
-        queryset = Transaction.objects.filter(table__user=user).select_related("table", "category", "category__parent")
+        related = ("table", "category", "category__parent")
+        queryset = Transaction.objects.owned_by(user).select_related(*related)
 
         # Apply filters from form
-        form = TransactionFilterForm(self.request.GET)
-        if form.is_valid():
-            search = form.cleaned_data.get("search")
-            date_from = form.cleaned_data.get("date_from")
-            date_to = form.cleaned_data.get("date_to")
-            category = form.cleaned_data.get("category")
-            subcategory = form.cleaned_data.get("subcategory")
-            currency = form.cleaned_data.get("currency")
-
-            if search:
-                queryset = queryset.filter(table__title__icontains=search)
-            if date_from:
-                queryset = queryset.filter(date__gte=date_from)
-            if date_to:
-                queryset = queryset.filter(date__lte=date_to)
-            if subcategory:
-                queryset = queryset.filter(category=subcategory)
-            elif category:
-                # Include both category and its subcategories
-                queryset = queryset.filter(Q(category=category) | Q(category__parent=category))
-            if currency:
-                queryset = queryset.filter(currency=currency)
-
-        return queryset.order_by("-date", "-created_at")
+        filter_form = TransactionFilterForm(self.request.GET)
+        queryset = filter_form.filter_queryset(queryset).order_by("-date", "-created_at")
+
+        # Old history is in the archive table, read only when the date filter reaches into it
+        date_from, date_to = filter_form.get_date_range()
+        archived_until = TransactionArchive.get_archived_until(user)
+        if not TransactionArchive.reaches(archived_until, date_from):
+            return queryset
+
+        archived = filter_form.filter_queryset(ArchivedTransaction.objects.owned_by(user).select_related(*related))
+        if date_from is not None:
+            return CombinedTransactions(queryset, archived)
+
+        rollups = None
+        if date_to is None:
+            # Totals over the whole archive come from the monthly rollups
+            rollups = filter_form.filter_queryset(TransactionRollup.objects.owned_by(user))
+        # Newest first from each table: pages that recent transactions fill don't touch the archive
+        return MergedTransactions(queryset, archived, rollups, archived_until)
 
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
@@ -128,45 +156,25 @@ class TransactionListView(LoginRequiredMixin, ListView):
         # Add filter form to context
         context["filter_form"] = TransactionFilterForm(self.request.GET)
 
-        # Prepare category hierarchy for template
-        main_categories = Category.objects.filter(parent__isnull=True)
-        categories_hierarchy = []
+        # Flat category list for the filter selects; the rendered markup is cached per tree version
+        context["categories"] = CategoryTree.get_nodes()
+        context["category_tree_version"] = CategoryTree.get_version()
 
-        for main_cat in main_categories:
-            children = main_cat.children.all()
-            categories_hierarchy.append(
-                {"name": main_cat.name, "children": [{"name": child.name, "id": child.id} for child in children]}
-            )
-
-        context["categories_hierarchy"] = categories_hierarchy
-
-        # Calculate transaction statistics
-        queryset = self.get_queryset()
-        context["total_count"] = queryset.count()
+        # Calculate transaction statistics; the paginator has already counted the rows
+        queryset = self.object_list
+        context["total_count"] = context["paginator"].count
 
         # Calculate totals per currency
-        totals = queryset.values("currency").annotate(total=Sum("amount"))
-        context["currency_totals"] = {item["currency"]: item["total"] for item in totals}
+        if isinstance(queryset, CombinedTransactions):
+            context["currency_totals"] = queryset.currency_totals()
+        else:
+            # Without order_by() the sort columns would be added to GROUP BY
+            totals = queryset.order_by().values("currency").annotate(total=Sum("amount"))
+            context["currency_totals"] = {item["currency"]: item["total"] for item in totals}
 
-        # Prepare transaction data for JavaScript
+        # Per-transaction amounts for the statistics badges
         context["transaction_amounts"] = [
-            {
-                "amount": transaction.amount,
-                "currency": transaction.currency,
-                "id": transaction.id,
-                "category": (
-                    {
-                        "name": transaction.category.name if transaction.category else "Без категорії",
-                        "parent_name": (
-                            transaction.category.parent.name
-                            if transaction.category and transaction.category.parent
-                            else None
-                        ),
-                    }
-                    if transaction.category
-                    else None
-                ),
-            }
+            {"amount": transaction.amount, "currency": transaction.currency, "id": transaction.id}
             for transaction in context["transactions"]
         ]
 
@@ -182,15 +190,16 @@ class TransactionListView(LoginRequiredMixin, ListView):
             context["target_currency"] = convert_to
             context["converted_transaction_amounts"] = []
             total_converted = 0
+            # One rate lookup per currency rather than one per row
+            rates = {}
 
             for transaction in context["transactions"]:
                 amount = float(transaction.amount)
                 currency = transaction.currency
 
-                if currency == convert_to:
-                    converted_amount = amount
-                else:
-                    converted_amount = CurrencyConverter.convert_amount(amount, currency, convert_to) or amount
+                if currency not in rates:
+                    rates[currency] = CurrencyConverter.get_rate(currency, convert_to)
+                converted_amount = amount * rates[currency] if rates[currency] else amount
 
                 context["converted_transaction_amounts"].append(
                     {
@@ -230,6 +239,109 @@ class TransactionListView(LoginRequiredMixin, ListView):
         return converted
 
 
+class TransactionExportView(LoginRequiredMixin, ReplicaReadMixin, View):
+    """Stream filtered transactions as a CSV or XLSX file"""
+
+    def get(self, request, *args, **kwargs):
+        export_format = request.GET.get("format", "csv")
+        if export_format not in TransactionExporter.FORMATS:
+            export_format = "csv"
+
+        convert_to = request.GET.get("convert_to")
+        if convert_to not in ["UAH", "USD", "EUR"]:
+            convert_to = None
+
+        # Same filters as the transaction list; the alias is pinned now, rows are read after the view returns
+        alias = ReplicaRouter.get_read_alias()
+        filter_form = TransactionFilterForm(request.GET)
+        queryset = Transaction.objects.using(alias).owned_by(request.user)
+        queryset = filter_form.filter_queryset(queryset).order_by("-date", "-created_at")
+
+        archived = None
+        date_from, _ = filter_form.get_date_range()
+        if TransactionArchive.reaches(TransactionArchive.get_archived_until(request.user), date_from):
+            archived = filter_form.filter_queryset(ArchivedTransaction.objects.using(alias).owned_by(request.user))
+
+        exporter = TransactionExporter(queryset, convert_to=convert_to, archived=archived)
+        content_type, extension = TransactionExporter.FORMATS[export_format]
+        stream = exporter.iter_xlsx() if export_format == "xlsx" else exporter.iter_csv()
+
+        response = StreamingHttpResponse(stream, content_type=content_type)
+        filename = f"transactions-{timezone.localdate():%Y-%m-%d}.{extension}"
+        response["Content-Disposition"] = f'attachment; filename="{filename}"'
+        return response
+
+
+class TransactionImportView(LoginRequiredMixin, FormView):
+    """
+    Import transactions from a CSV or OFX bank statement. The statement is imported by a background job;
+    the page then shows its progress (?job=<id>) and, once done, the report.
+    """
+
+    form_class = TransactionImportForm
+    template_name = "finances/transaction_import.html"
+
+    def get_form_kwargs(self):
+        # Pass user to form for table filtering
+        kwargs = super().get_form_kwargs()
+        kwargs["user"] = self.request.user
+        return kwargs
+
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        job_id = self.request.GET.get("job")
+        if job_id and job_id.isdigit():
+            job = Job.objects.filter(pk=job_id, user=self.request.user, kind="import_transactions").first()
+            if job is not None:
+                context["job"] = JobQueue.get_status(job)
+                # Render the report on the import page, so row errors stay visible
+                context["report"] = job.result if job.status == Job.SUCCEEDED else None
+        return context
+
+    def form_valid(self, form):
+        table = form.cleaned_data["table"]
+        statement = form.cleaned_data["file"]
+        digest = hashlib.sha256()
+        for chunk in statement.chunks():
+            digest.update(chunk)
+
+        # The same statement sent twice the same day (a double submit, a reload) is imported once
+        idempotency_key = (
+            f"import_transactions:{table.pk}:{form.cleaned_data['currency']}:{timezone.localdate()}:"
+            f"{digest.hexdigest()}"
+        )
+        file_name = JobQueue.file_storage.save(f"imports/{digest.hexdigest()}", statement)
+        job, created = JobQueue.enqueue(
+            "import_transactions",
+            {
+                "table_id": table.pk,
+                "file": file_name,
+                "file_format": form.cleaned_data["file_format"],
+                "currency": form.cleaned_data["currency"],
+            },
+            user=self.request.user,
+            # Someone is waiting for it
+            priority=10,
+            idempotency_key=idempotency_key,
+        )
+        if not created:
+            # The existing job has its copy, or finished and deleted it, in which case ours took the same name
+            JobQueue.file_storage.delete(file_name)
+
+        messages.info(self.request, "Виписку додано до черги імпорту")
+        return redirect(f"{reverse('finances:transaction_import')}?job={job.pk}")
+
+
+class JobStatusView(LoginRequiredMixin, View):
+    """State of one of the user's background jobs, polled by the pages that started it"""
+
+    def get(self, request, pk, *args, **kwargs):
+        job = Job.objects.filter(pk=pk, user=request.user).first()
+        if job is None:
+            raise Http404
+        return JsonResponse(JobQueue.get_status(job))
+
+
 class TransactionCreateView(LoginRequiredMixin, CreateView):
     """Create new transaction"""
 
@@ -246,27 +358,8 @@ class TransactionCreateView(LoginRequiredMixin, CreateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        # Prepare category hierarchy for dropdown
-        main_categories = Category.objects.filter(parent__isnull=True)
-        categories_hierarchy = []
-
-        for main_cat in main_categories:
-            children = main_cat.children.all()
-            categories_hierarchy.append(
-                {
-                    "id": main_cat.id,
-                    "name": main_cat.name,
-                    "children": [
-                        {
-                            "id": child.id,
-                            "name": child.name,
-                        }
-                        for child in children
-                    ],
-                }
-            )
-
-        context["categories_hierarchy"] = categories_hierarchy
+        # Category hierarchy for dropdown, from the cached tree
+        context["categories_hierarchy"] = CategoryTree.get_hierarchy()
         return context
 
     def form_valid(self, form):
@@ -277,18 +370,32 @@ class TransactionCreateView(LoginRequiredMixin, CreateView):
         return reverse_lazy("finances:transaction_list")
 
 
-class TransactionUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView):
+class TransactionBulkCreateView(LoginRequiredMixin, FormView):
+    """Create several transactions at once with a single bulk insert"""
+
+    form_class = TransactionFormSet
+    template_name = "finances/transaction_bulk_form.html"
+    success_url = reverse_lazy("finances:transaction_list")
+
+    def get_form_kwargs(self):
+        # Pass user to formset for table filtering
+        kwargs = super().get_form_kwargs()
+        kwargs["user"] = self.request.user
+        return kwargs
+
+    def form_valid(self, form):
+        transactions = form.save()
+        messages.success(self.request, f"Додано транзакцій: {len(transactions)}")
+        return super().form_valid(form)
+
+
+class TransactionUpdateView(LoginRequiredMixin, OwnedObjectMixin, UpdateView):
     """Update existing transaction"""
 
     model = Transaction
     form_class = TransactionForm
     template_name = "finances/transaction_form.html"
 
-    def test_func(self):
-        # Check if user owns the transaction's table
-        transaction = self.get_object()
-        return self.request.user == transaction.table.user
-
     def get_form_kwargs(self):
         kwargs = super().get_form_kwargs()
         kwargs["user"] = self.request.user
@@ -297,27 +404,7 @@ class TransactionUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
     def get_context_data(self, **kwargs):
         # Same as create view for category hierarchy
         context = super().get_context_data(**kwargs)
-
-        main_categories = Category.objects.filter(parent__isnull=True)
-        categories_hierarchy = []
-
-        for main_cat in main_categories:
-            children = main_cat.children.all()
-            categories_hierarchy.append(
-                {
-                    "id": main_cat.id,
-                    "name": main_cat.name,
-                    "children": [
-                        {
-                            "id": child.id,
-                            "name": child.name,
-                        }
-                        for child in children
-                    ],
-                }
-            )
-
-        context["categories_hierarchy"] = categories_hierarchy
+        context["categories_hierarchy"] = CategoryTree.get_hierarchy()
         return context
 
     def form_valid(self, form):
@@ -328,18 +415,15 @@ class TransactionUpdateView(LoginRequiredMixin, UserPassesTestMixin, UpdateView)
         return reverse_lazy("finances:transaction_list")
 
 
-class TransactionDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView):
+class TransactionDeleteView(LoginRequiredMixin, OwnedObjectMixin, DeleteView):
     """Delete transaction"""
 
     model = Transaction
+    # The confirmation page shows the table
+    queryset = Transaction.objects.select_related("table")
     template_name = "finances/transaction_confirm_delete.html"
     success_url = reverse_lazy("finances:transaction_list")
 
-    def test_func(self):
-        # Check if user owns the transaction's table
-        transaction = self.get_object()
-        return self.request.user == transaction.table.user
-
     def delete(self, request, *args, **kwargs):
         messages.success(request, "Транзакцію успішно видалено!")
         return super().delete(request, *args, **kwargs)
@@ -348,42 +432,135 @@ class TransactionDeleteView(LoginRequiredMixin, UserPassesTestMixin, DeleteView)
 # === DASHBOARD VIEW ===
 
 
+async def alist(queryset):
+    """Evaluate a queryset through the async ORM"""
+    return [obj async for obj in queryset.aiterator()]
+
+
 @login_required
-def dashboard(request):
+@use_replica
+async def dashboard(request):
     """Main dashboard with recent transactions and totals"""
-    user = request.user
+    # Keep the already loaded user, so rendering never touches the database lazily
+    user = request.user = await request.auser()
 
-    # Get recent transactions
-    recent_transactions = Transaction.objects.filter(table__user=user).select_related(
-        "table", "category", "category__parent"
-    )[:5]
+    transactions = Transaction.objects.owned_by(user)
 
-    # Calculate total expenses converted to UAH
-    all_transactions = Transaction.objects.filter(table__user=user)
-    total_in_uah = 0
+    today = timezone.localdate()
+    month_start = today.replace(day=1)
+    last_month_start = (month_start - timedelta(days=1)).replace(day=1)
+
+    def period(date_field):
+        return Case(
+            When(**{f"{date_field}__gte": month_start}, then=Value("this_month")),
+            When(**{f"{date_field}__gte": last_month_start}, then=Value("last_month")),
+            default=Value("older"),
+        )
+
+    # One grouped query gives every total on the page: at most tables x currencies x 3 rows,
+    # however many transactions there are
+    grouped_totals = (
+        transactions.annotate(period=period("date"))
+        .values("table_id", "currency", "period")
+        .annotate(total=Sum("amount"), count=Count("id"))
+        .order_by()
+    )
+    # Archived transactions are counted through their monthly rollups, in the same shape
+    grouped_rollups = (
+        TransactionRollup.objects.owned_by(user)
+        .annotate(period=period("month"))
+        .values("table_id", "currency", "period")
+        .annotate(total=Sum("total"), count=Sum("transaction_count"))
+        .order_by()
+    )
 
-    for transaction in all_transactions:
-        amount = float(transaction.amount)
-        currency = transaction.currency
+    # Independent queries and the rate fetch run concurrently
+    recent_transactions, totals, rollup_totals, tables, rates = await asyncio.gather(
+        alist(transactions.select_related("table", "category", "category__parent")[:5]),
+        alist(grouped_totals),
+        alist(grouped_rollups),
+        alist(Table.objects.owned_by(user)),
+        CurrencyConverter.aget_exchange_rates(),
+    )
 
-        if currency == "UAH":
-            total_in_uah += amount
+    # Convert the grouped totals to UAH and roll them up per table and per month
+    total_in_uah = 0
+    transaction_count = 0
+    period_totals = {"this_month": 0, "last_month": 0, "older": 0}
+    table_totals = {}
+
+    for row in totals + rollup_totals:
+        if row["currency"] == "UAH":
+            amount = float(row["total"])
+        elif rates:
+            amount = CurrencyConverter.convert_with_rates(row["total"], row["currency"], "UAH", rates) or 0
         else:
-            converted = CurrencyConverter.convert_amount(amount, currency, "UAH")
-            if converted:
-                total_in_uah += converted
+            amount = 0
+
+        total_in_uah += amount
+        transaction_count += row["count"]
+        period_totals[row["period"]] += amount
 
-    total_expenses = round(total_in_uah, 2)
+        table_total = table_totals.setdefault(row["table_id"], {"total": 0, "count": 0})
+        table_total["total"] += amount
+        table_total["count"] += row["count"]
+
+    for table in tables:
+        table_total = table_totals.get(table.pk, {"total": 0, "count": 0})
+        table.total_expenses = round(table_total["total"], 2)
+        table.transaction_count = table_total["count"]
+
+    this_month_expenses = round(period_totals["this_month"], 2)
+    last_month_expenses = round(period_totals["last_month"], 2)
+    month_change = None
+    if last_month_expenses:
+        month_change = round((this_month_expenses - last_month_expenses) / last_month_expenses * 100, 1)
 
     context = {
         "recent_transactions": recent_transactions,
-        "total_expenses": total_expenses,
-        "tables": Table.objects.filter(user=user),
+        "total_expenses": round(total_in_uah, 2),
+        "transaction_count": transaction_count,
+        "this_month_expenses": this_month_expenses,
+        "last_month_expenses": last_month_expenses,
+        "month_change": month_change,
+        "month_start": month_start,
+        "last_month_start": last_month_start,
+        "tables": tables,
+        "live_updates": LiveUpdates.can_stream(request),
     }
 
     return render(request, "finances/dashboard.html", context)
 
 
+@login_required
+async def live_events(request):
+    """
+    Server-sent events with the user's transaction changes, for open dashboard and analytics pages.
+    Each connection holds a coroutine, not a thread, as long as the page is open, so it is only served under ASGI.
+    """
+    if not LiveUpdates.can_stream(request):
+        # 204 tells EventSource not to reconnect; the pages don't link here under WSGI anyway
+        return HttpResponse(status=204)
+    user = await request.auser()
+    subscription = LiveUpdates.subscribe(user.pk)
+
+    async def stream():
+        try:
+            yield f"retry: {LiveUpdates.RETRY}\n\n"
+            while True:
+                event = await subscription.get(timeout=LiveUpdates.KEEPALIVE)
+                yield await LiveUpdates.aformat(event) if event else ": keepalive\n\n"
+        finally:
+            # Also when the client disconnects and the server cancels the stream
+            subscription.close()
+
+    response = StreamingHttpResponse(stream(), content_type="text/event-stream")
+    response["Cache-Control"] = "no-cache"
+    # Stops nginx from buffering the stream
+    response["X-Accel-Buffering"] = "no"
+    return response
+
+
 # === CURRENCY CONVERTER VIEW ===
 
 
@@ -425,68 +602,129 @@ def currency_converter(request):
     )
 
 
-class AnalyticsView(LoginRequiredMixin, TemplateView):
+class AnalyticsView(AsyncLoginRequiredMixin, ReplicaReadMixin, TemplateView):
     """Financial analytics and statistics view"""
 
     template_name = "finances/analytics.html"
+    CACHE_TIMEOUT = 600
 
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
+    async def get(self, request, *args, **kwargs):
+        context = await self.aget_context_data(**kwargs)
+        context["live_updates"] = LiveUpdates.can_stream(request)
+        return self.render_to_response(context)
+
+    async def aget_context_data(self, **kwargs):
+        context = self.get_context_data(**kwargs)
 
         # Get period filter
         period = self.request.GET.get("period", "30")
 
         # Get transactions for current user
-        transactions = Transaction.objects.filter(table__user=self.request.user).select_related("table", "category")
+        user = self.request.user
+        transactions = Transaction.objects.owned_by(user)
 
         # Apply period filter if not 'all'
+        start_date = None
         if period != "all":
             days = int(period)
-            start_date = timezone.now() - timedelta(days=days)
+            start_date = timezone.localdate() - timedelta(days=days)
             transactions = transactions.filter(date__gte=start_date)
 
+        # Archived history is only read when the period reaches into it
+        archived_until = await TransactionArchive.aget_archived_until(user)
+        reaches_archive = TransactionArchive.reaches(archived_until, start_date)
+
+        # Any insert, edit or delete changes the count or the latest updated_at, so a cached result
+        # is only reused while the underlying data is unchanged; one aggregate is far cheaper than the rows
+        fingerprint, category_version = await asyncio.gather(
+            transactions.aaggregate(count=Count("id"), last_update=Max("updated_at")),
+            CategoryTree.aget_version(),
+        )
+        last_update = fingerprint["last_update"].timestamp() if fingerprint["last_update"] else 0
+        cache_key = (
+            f"analytics:{user.pk}:{period}:{timezone.localdate()}:"
+            f"{fingerprint['count']}:{last_update}:{category_version}:{archived_until}"
+        )
+
+        statistics = await cache.aget(cache_key)
+        Metrics.track("cache_hits" if statistics is not None else "cache_misses")
+        if statistics is None:
+            # Only the columns the statistics need; the rows and the rates are fetched concurrently
+            fields = ("currency", "table__title", "category__name", "category__parent__name")
+            queries = [alist(transactions.values("amount", "date", *fields)), CurrencyConverter.aget_exchange_rates()]
+            if reaches_archive and start_date is None:
+                # The whole archive: its monthly rollups, one row per table, category, currency and month
+                rollups = TransactionRollup.objects.owned_by(user).values(
+                    "max_amount", *fields, amount=F("total"), date=F("month"), count=F("transaction_count")
+                )
+                queries.append(alist(rollups))
+            elif reaches_archive:
+                archived = ArchivedTransaction.objects.owned_by(user).filter(date__gte=start_date)
+                queries.append(alist(archived.values("amount", "date", *fields)))
+
+            rows, rates, *archived_rows = await asyncio.gather(*queries)
+            statistics = self.get_statistics(rows + (archived_rows[0] if archived_rows else []), rates)
+            # The key is derived from the data, so its value never changes: add() needs no invalidation broadcast
+            await cache.aadd(cache_key, statistics, self.CACHE_TIMEOUT)
+
+        context["period"] = period
+        context["start_date"] = start_date
+        # The same key identifies the rendered summary fragments
+        context["analytics_cache_key"] = cache_key
+        context.update(statistics)
+        return context
+
+    def get_statistics(self, rows, rates):
+        """
+        Totals and chart data for the given transaction rows. A row may also stand for several transactions
+        (archive rollups): then it has "count" and "max_amount" besides the summed "amount".
+        """
         # Convert all amounts to UAH for consistent analysis
         converted_data = []
         total_amount_uah = 0
         max_amount_uah = 0
 
-        for t in transactions:
-            amount_uah = CurrencyConverter.convert_amount(t.amount, t.currency, "UAH") or float(t.amount)
+        for row in rows:
+            amount, currency = row["amount"], row["currency"]
+            converted = rates and CurrencyConverter.convert_with_rates(amount, currency, "UAH", rates)
+            amount_uah = converted or float(amount)
+            row_max_uah = amount_uah
+            if "max_amount" in row:
+                converted = rates and CurrencyConverter.convert_with_rates(row["max_amount"], currency, "UAH", rates)
+                row_max_uah = converted or float(row["max_amount"])
 
             converted_data.append(
                 {
-                    "transaction": t,
+                    "amount": amount,
                     "amount_uah": amount_uah,
-                    "category": t.category,
-                    "table": t.table,
-                    "currency": t.currency,
-                    "date": t.date,
+                    "count": row.get("count", 1),
+                    # Use parent category for grouping
+                    "category": row["category__parent__name"] or row["category__name"],
+                    "table": row["table__title"],
+                    "currency": currency,
+                    "date": row["date"],
                 }
             )
 
             total_amount_uah += amount_uah
-            max_amount_uah = max(max_amount_uah, amount_uah)
+            max_amount_uah = max(max_amount_uah, row_max_uah)
 
         # Calculate basic statistics
-        count = len(converted_data)
+        count = sum(data["count"] for data in converted_data)
         average_amount_uah = total_amount_uah / count if count > 0 else 0
 
         # Category statistics
         category_stats_dict = {}
         for data in converted_data:
-            category = data["category"]
-            if not category:
+            cat_name = data["category"]
+            if not cat_name:
                 continue
 
-            # Use parent category for grouping
-            parent_cat = category.parent if category.parent else category
-            cat_name = parent_cat.name
-
             if cat_name not in category_stats_dict:
                 category_stats_dict[cat_name] = {"total": 0, "count": 0}
 
             category_stats_dict[cat_name]["total"] += data["amount_uah"]
-            category_stats_dict[cat_name]["count"] += 1
+            category_stats_dict[cat_name]["count"] += data["count"]
 
         # Prepare category data for chart
         category_stats = []
@@ -525,7 +763,7 @@ class AnalyticsView(LoginRequiredMixin, TemplateView):
         currency_stats = {}
         for data in converted_data:
             currency = data["currency"]
-            currency_stats[currency] = currency_stats.get(currency, 0) + float(data["transaction"].amount)
+            currency_stats[currency] = currency_stats.get(currency, 0) + float(data["amount"])
 
         currency_labels = [dict(Transaction.CURRENCY_CHOICES).get(k, k) for k in currency_stats.keys()]
         currency_data = [round(v, 2) for v in currency_stats.values()]
@@ -533,31 +771,60 @@ class AnalyticsView(LoginRequiredMixin, TemplateView):
         # Table statistics
         table_stats = {}
         for data in converted_data:
-            table_name = data["table"].title
+            table_name = data["table"]
             table_stats[table_name] = table_stats.get(table_name, 0) + data["amount_uah"]
 
         table_labels = list(table_stats.keys())
         table_data = [round(v, 2) for v in table_stats.values()]
 
-        # Add all data to context
-        context.update(
-            {
-                "period": period,
-                "total_amount": round(total_amount_uah, 2),
-                "average_amount": round(average_amount_uah, 2),
-                "max_amount": round(max_amount_uah, 2),
-                "category_count": len(category_stats),
-                "category_stats": category_stats,
-                "category_labels": json.dumps(category_labels),
-                "category_data": json.dumps(category_data),
-                "monthly_labels": json.dumps(monthly_labels),
-                "monthly_data": json.dumps(monthly_data),
-                "currency_labels": json.dumps(currency_labels),
-                "currency_data": json.dumps(currency_data),
-                "table_labels": json.dumps(table_labels),
-                "table_data": json.dumps(table_data),
-                "transaction_count": count,
-            }
-        )
+        return {
+            "total_amount": round(total_amount_uah, 2),
+            "average_amount": round(average_amount_uah, 2),
+            "max_amount": round(max_amount_uah, 2),
+            "category_count": len(category_stats),
+            "category_stats": category_stats,
+            "category_labels": json.dumps(category_labels),
+            "category_data": json.dumps(category_data),
+            "monthly_labels": json.dumps(monthly_labels),
+            "monthly_data": json.dumps(monthly_data),
+            "currency_labels": json.dumps(currency_labels),
+            "currency_data": json.dumps(currency_data),
+            "table_labels": json.dumps(table_labels),
+            "table_data": json.dumps(table_data),
+            "transaction_count": count,
+        }
 
-        return context
+
+# === METRICS VIEW ===
+
+
+def metrics(request):
+    """Prometheus scrape endpoint; internal, open to staff and the configured addresses only"""
+    allowed_ips = getattr(settings, "METRICS_ALLOWED_IPS", ["127.0.0.1"])
+    if request.META.get("REMOTE_ADDR") not in allowed_ips and not request.user.is_staff:
+        return HttpResponseForbidden()
+    return HttpResponse(Metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
+
+
+# === PROFILING VIEWS ===
+
+
+@staff_member_required
+def profile_list(request):
+    """Recently saved request profiles"""
+    return render(request, "finances/profile_list.html", {"profiles": RequestProfiler.list_profiles()})
+
+
+@staff_member_required
+def profile_detail(request, profile_id):
+    """Summary of one request profile; ?download returns the raw .prof file"""
+    if "download" in request.GET:
+        prof_path = RequestProfiler.get_prof_path(profile_id)
+        if prof_path is None:
+            raise Http404
+        return FileResponse(open(prof_path, "rb"), as_attachment=True, filename=prof_path.name)
+
+    profile = RequestProfiler.load(profile_id)
+    if profile is None:
+        raise Http404
+    return render(request, "finances/profile_detail.html", {"profile": profile})
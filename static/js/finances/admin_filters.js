@@ -0,0 +1,17 @@
+// Autocomplete list filters (finances.admin.AutocompleteFilter): reload the changelist with the chosen object
+'use strict';
+(function ($) {
+    $(document).on('change', 'select[data-filter-parameter]', function () {
+        const params = new URLSearchParams(window.location.search);
+        const name = this.dataset.filterParameter;
+
+        if (this.value) {
+            params.set(name, this.value);
+        } else {
+            params.delete(name);
+        }
+        // The page number is meaningless for a different filter
+        params.delete('p');
+        window.location.search = params.toString();
+    });
+})(django.jQuery);
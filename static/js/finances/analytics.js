@@ -259,4 +259,55 @@ document.addEventListener('DOMContentLoaded', function() {
     window.addEventListener('resize', adjustLegendForMobile);
     // Initial adjustment on page load
     adjustLegendForMobile();
+
+    // Live updates: changes made while the page is open are added to the totals and charts in place
+    let totalAmount = chartData.total_amount || 0;
+    let transactionCount = chartData.transaction_count || 0;
+
+    function addToChart(chartId, label, value) {
+        const chart = Chart.getChart(chartId);
+        if (!chart || !label) {
+            return;
+        }
+        const labels = chart.data.labels;
+        const dataset = chart.data.datasets[0];
+        let index = labels.indexOf(label);
+        if (index === -1) {
+            index = labels.length;
+            if (chartId === 'monthlyChart') {
+                // Months stay in chronological order
+                const time = Date.parse('1 ' + label);
+                while (index > 0 && Date.parse('1 ' + labels[index - 1]) > time) {
+                    index--;
+                }
+            }
+            labels.splice(index, 0, label);
+            dataset.data.splice(index, 0, 0);
+            if (chartId !== 'currencyChart' && chartId !== 'monthlyChart') {
+                dataset.backgroundColor = colors.slice(0, labels.length);
+            }
+        }
+        dataset.data[index] = Math.round((dataset.data[index] + value) * 100) / 100;
+        chart.update();
+    }
+
+    connectLiveUpdates(chartData.events_url, function(deltas) {
+        deltas.forEach(function(delta) {
+            // Outside the selected period
+            if (chartData.start_date && delta.date < chartData.start_date) {
+                return;
+            }
+            totalAmount += delta.amount_uah;
+            transactionCount += delta.count;
+            addToChart('categoryChart', delta.category, delta.amount_uah);
+            addToChart('monthlyChart', delta.month_label, delta.amount_uah);
+            addToChart('currencyChart', delta.currency_label, parseFloat(delta.amount));
+            addToChart('tableChart', delta.table_title, delta.amount_uah);
+        });
+
+        const average = transactionCount ? totalAmount / transactionCount : 0;
+        document.querySelectorAll('[data-live="total"]').forEach(el => el.textContent = formatAmount(totalAmount) + ' ₴');
+        document.querySelectorAll('[data-live="average"]').forEach(el => el.textContent = formatAmount(average) + ' ₴');
+        document.querySelectorAll('[data-live="count"]').forEach(el => el.textContent = transactionCount);
+    });
 });
\ No newline at end of file
@@ -0,0 +1,45 @@
+document.addEventListener('DOMContentLoaded', function() {
+    const configElement = document.getElementById('live-config');
+    if (!configElement) {
+        return;
+    }
+    const config = JSON.parse(configElement.textContent);
+
+    function add(element, delta, suffix) {
+        if (!element) {
+            return;
+        }
+        const isCount = suffix === '';
+        const value = parseFloat(element.dataset.value || '0') + delta;
+        element.dataset.value = isCount ? value : formatAmount(value);
+        element.textContent = (isCount ? value : formatAmount(value)) + suffix;
+    }
+
+    function updateMonthChange() {
+        const thisMonth = parseFloat(document.querySelector('[data-live="this_month"]').dataset.value);
+        const lastMonth = parseFloat(document.querySelector('[data-live="last_month"]').dataset.value);
+        const element = document.querySelector('[data-live="month_change"]');
+        if (!lastMonth) {
+            element.textContent = '';
+            return;
+        }
+        const change = Math.round((thisMonth - lastMonth) / lastMonth * 1000) / 10;
+        element.textContent = '(' + (change > 0 ? '+' : '') + change + '%)';
+    }
+
+    connectLiveUpdates(config.events_url, function(deltas) {
+        deltas.forEach(function(delta) {
+            const month = delta.date.slice(0, 7);
+            add(document.querySelector('[data-live="total"]'), delta.amount_uah, ' грн');
+            add(document.querySelector('[data-live="count"]'), delta.count, '');
+            if (month === config.this_month) {
+                add(document.querySelector('[data-live="this_month"]'), delta.amount_uah, ' грн');
+            } else if (month === config.last_month) {
+                add(document.querySelector('[data-live="last_month"]'), delta.amount_uah, ' грн');
+            }
+            add(document.querySelector('[data-live-table="' + delta.table + '"]'), delta.amount_uah, ' грн');
+            add(document.querySelector('[data-live-table-count="' + delta.table + '"]'), delta.count, '');
+        });
+        updateMonthChange();
+    });
+});
@@ -0,0 +1,28 @@
+// Polls the state of a background job and reloads the page once it is finished, to show the result
+document.addEventListener('DOMContentLoaded', function() {
+    const jobElement = document.getElementById('import-job');
+    if (!jobElement) {
+        return;
+    }
+    const progressBar = jobElement.querySelector('.progress-bar');
+
+    function poll() {
+        fetch(jobElement.dataset.statusUrl, { headers: { 'Accept': 'application/json' } })
+            .then(response => response.json())
+            .then(function(job) {
+                if (job.finished) {
+                    window.location.reload();
+                    return;
+                }
+                const percent = job.progress ? job.progress.percent : 0;
+                progressBar.style.width = percent + '%';
+                progressBar.textContent = percent + '%';
+                setTimeout(poll, 1000);
+            })
+            .catch(function() {
+                setTimeout(poll, 5000);
+            });
+    }
+
+    setTimeout(poll, 1000);
+});
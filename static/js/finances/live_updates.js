@@ -0,0 +1,34 @@
+// Live updates from the server (server-sent events): calls onDeltas(deltas) for every change of the user's
+// transactions, and reloads the page when a change can't be applied in place or events may have been missed
+function connectLiveUpdates(eventsUrl, onDeltas) {
+    if (!window.EventSource || !eventsUrl) {
+        return;
+    }
+
+    const source = new EventSource(eventsUrl);
+    let disconnected = false;
+
+    source.addEventListener('error', function() {
+        // The browser reconnects by itself; events sent in between are lost
+        disconnected = true;
+    });
+
+    source.addEventListener('open', function() {
+        if (disconnected) {
+            window.location.reload();
+        }
+    });
+
+    source.addEventListener('transactions', function(e) {
+        const event = JSON.parse(e.data);
+        if (event.stale) {
+            window.location.reload();
+        } else if (event.deltas.length) {
+            onDeltas(event.deltas);
+        }
+    });
+}
+
+function formatAmount(value) {
+    return value.toFixed(2);
+}
@@ -0,0 +1,74 @@
+import uuid
+
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import cache
+
+
+class CachedModelBackend(ModelBackend):
+    """
+    ModelBackend that caches the logged-in user row, so authenticated requests skip the users query.
+
+    The default cache keeps a per-process copy and shares it between workers. Entries are keyed by a per-user
+    generation, which users.signals replaces when the user is saved (password, email, flags) or their
+    groups/permissions change. Permissions are still checked against the database, the cached copy only
+    replaces the row lookup.
+    """
+
+    CACHE_KEY = "auth_user"
+    GENERATION_KEY = "auth_user_generation"
+    CACHE_TIMEOUT = 300
+
+    @classmethod
+    def get_cache_key(cls, user_id, generation):
+        return f"{cls.CACHE_KEY}:{user_id}:{generation}"
+
+    @classmethod
+    def get_generation_key(cls, user_id):
+        return f"{cls.GENERATION_KEY}:{user_id}"
+
+    @classmethod
+    def invalidate(cls, user_id):
+        # A new generation rather than a delete: a row read before the change and cached after it lands under
+        # the old generation's key, which is no longer read
+        cache.set(cls.get_generation_key(user_id), uuid.uuid4().hex, None)
+
+    @classmethod
+    def get_generation(cls, user_id):
+        key = cls.get_generation_key(user_id)
+        generation = cache.get(key)
+        if generation is None:
+            # Another worker may be adding one at the same time; everybody goes on with the one that was stored
+            cache.add(key, uuid.uuid4().hex, None)
+            generation = cache.get(key)
+        return generation
+
+    @classmethod
+    async def aget_generation(cls, user_id):
+        key = cls.get_generation_key(user_id)
+        generation = await cache.aget(key)
+        if generation is None:
+            await cache.aadd(key, uuid.uuid4().hex, None)
+            generation = await cache.aget(key)
+        return generation
+
+    def get_user(self, user_id):
+        # The generation is read before the row, so the row is cached under the generation it belongs to
+        key = self.get_cache_key(user_id, self.get_generation(user_id))
+        user = cache.get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is None:
+                return None
+            # add() rather than set(): the key was absent, so other workers need no invalidation broadcast
+            cache.add(key, user, self.CACHE_TIMEOUT)
+        return user
+
+    async def aget_user(self, user_id):
+        key = self.get_cache_key(user_id, await self.aget_generation(user_id))
+        user = await cache.aget(key)
+        if user is None:
+            user = await super().aget_user(user_id)
+            if user is None:
+                return None
+            await cache.aadd(key, user, self.CACHE_TIMEOUT)
+        return user
@@ -1,5 +1,10 @@
+import hashlib
+import secrets
+from datetime import timedelta
+
 from django.contrib.auth.models import AbstractUser, BaseUserManager
 from django.db import models
+from django.utils import timezone
 
 
 class UserManager(BaseUserManager):
@@ -36,3 +41,45 @@ class User(AbstractUser):
     REQUIRED_FIELDS = []
 
     objects = UserManager()
+
+
+class ApiToken(models.Model):
+    """Key of an API client, sent as "Authorization: Bearer <key>"; only its SHA-256 is stored"""
+
+    # last_used_at is written at most this often, not on every request
+    LAST_USED_PRECISION = timedelta(minutes=5)
+
+    user = models.ForeignKey(User, on_delete=models.CASCADE, related_name="api_tokens", verbose_name="Користувач")
+    name = models.CharField(max_length=100, verbose_name="Назва")
+    key_hash = models.CharField(max_length=64, unique=True, editable=False, verbose_name="Хеш ключа")
+    created_at = models.DateTimeField(auto_now_add=True, verbose_name="Дата створення")
+    last_used_at = models.DateTimeField(null=True, blank=True, verbose_name="Останнє використання")
+
+    class Meta:
+        verbose_name = "Ключ API"
+        verbose_name_plural = "Ключі API"
+        ordering = ["-created_at"]
+
+    def __str__(self):
+        return f"{self.name} ({self.user.email})"
+
+    @staticmethod
+    def hash_key(key):
+        return hashlib.sha256(key.encode()).hexdigest()
+
+    @classmethod
+    def issue(cls, user, name):
+        """A new token and its key; the key can't be recovered later"""
+        key = secrets.token_urlsafe(32)
+        return cls.objects.create(user=user, name=name, key_hash=cls.hash_key(key)), key
+
+    @classmethod
+    def authenticate(cls, key):
+        """The token of an active user with this key, or None"""
+        token = cls.objects.select_related("user").filter(key_hash=cls.hash_key(key), user__is_active=True).first()
+        if token is not None:
+            now = timezone.now()
+            if token.last_used_at is None or now - token.last_used_at > cls.LAST_USED_PRECISION:
+                cls.objects.filter(pk=token.pk).update(last_used_at=now)
+                token.last_used_at = now
+        return token
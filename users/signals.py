@@ -0,0 +1,28 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from .backends import CachedModelBackend
+from .models import User
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, **kwargs):
+    # Covers password, email, is_active/is_staff/is_superuser and last_login updates
+    CachedModelBackend.invalidate(instance.pk)
+
+
+@receiver(m2m_changed, sender=User.groups.through)
+@receiver(m2m_changed, sender=User.user_permissions.through)
+def invalidate_cached_user_permissions(sender, instance, action, reverse, pk_set, **kwargs):
+    if not reverse:
+        if action.startswith("post_"):
+            CachedModelBackend.invalidate(instance.pk)
+    elif action in ("post_add", "post_remove"):
+        # Changed from the group/permission side: pk_set holds user ids
+        for user_id in pk_set:
+            CachedModelBackend.invalidate(user_id)
+    elif action == "pre_clear":
+        # After the clear there is no way to tell which users were affected
+        for user_id in instance.user_set.values_list("pk", flat=True):
+            CachedModelBackend.invalidate(user_id)
@@ -1,3 +1,107 @@
-from django.test import TestCase
+from datetime import timedelta
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import async_to_sync
+from django.contrib.auth.backends import ModelBackend
+from django.contrib.auth.models import Group, Permission
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from finances.tests.base import TEST_CACHES
+
+from .backends import CachedModelBackend
+from .models import ApiToken, User
+
+
+@override_settings(CACHES=TEST_CACHES)
+class ApiTokenTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(email="owner@example.com", password="pass-12345")
+
+    def test_only_the_hash_is_stored(self):
+        token, key = ApiToken.issue(self.user, "Телефон")
+        self.assertNotIn(key, token.key_hash)
+        self.assertEqual(ApiToken.authenticate(key), token)
+        self.assertIsNone(ApiToken.authenticate(key[:-1]))
+
+    def test_last_used_is_written_sparingly(self):
+        token, key = ApiToken.issue(self.user, "Телефон")
+        with self.assertNumQueries(2):
+            ApiToken.authenticate(key)
+        with self.assertNumQueries(1):
+            ApiToken.authenticate(key)
+
+        ApiToken.objects.filter(pk=token.pk).update(last_used_at=timezone.now() - timedelta(hours=1))
+        with self.assertNumQueries(2):
+            ApiToken.authenticate(key)
+
+
+@override_settings(CACHES=TEST_CACHES, OPENEXCHANGERATES_API_KEY=None)
+class CachedModelBackendTests(TestCase):
+    def setUp(self):
+        for alias in TEST_CACHES:
+            caches[alias].clear()
+        self.user = User.objects.create_user(email="owner@example.com", password="pass-12345")
+        self.backend = CachedModelBackend()
+
+    def test_user_row_is_cached(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        self.assertIsNone(self.backend.get_user(0))
+
+    def test_async_user_lookup(self):
+        self.assertEqual(async_to_sync(self.backend.aget_user)(self.user.pk), self.user)
+        with self.assertNumQueries(0):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+
+    def test_saving_the_user_drops_the_copy(self):
+        self.backend.get_user(self.user.pk)
+        self.user.first_name = "Олена"
+        self.user.save()
+        self.assertEqual(self.backend.get_user(self.user.pk).first_name, "Олена")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+        self.user.delete()
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_change_during_lookup_is_not_cached(self):
+        # The row is read, then the user is deactivated before the read row reaches the cache
+        def get_user_then_deactivate(backend, user_id):
+            user = get_user(backend, user_id)
+            changed = User.objects.get(pk=user_id)
+            changed.is_active = False
+            changed.save()
+            return user
+
+        get_user = ModelBackend.get_user
+        with mock.patch.object(ModelBackend, "get_user", get_user_then_deactivate):
+            self.assertEqual(self.backend.get_user(self.user.pk), self.user)
+        self.assertIsNone(self.backend.get_user(self.user.pk))
+
+    def test_group_and_permission_changes_drop_the_copy(self):
+        group = Group.objects.create(name="Бухгалтерія")
+        for change in (
+            lambda: self.user.groups.add(group),
+            lambda: group.user_set.clear(),
+            lambda: self.user.user_permissions.add(Permission.objects.first()),
+        ):
+            self.backend.get_user(self.user.pk)
+            change()
+            with self.assertNumQueries(1):
+                self.backend.get_user(self.user.pk)
+
+    def test_password_change_logs_out_other_sessions(self):
+        self.client.login(email="owner@example.com", password="pass-12345")
+        self.assertEqual(self.client.get(reverse("finances:dashboard")).status_code, 200)
+
+        self.user.set_password("new-pass-12345")
+        self.user.save()
+        # The cached row with the old password hash would keep the session valid
+        self.assertEqual(self.client.get(reverse("finances:dashboard")).status_code, 302)